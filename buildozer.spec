@@ -13,7 +13,7 @@ package.domain = org.kivy
 source.dir = test_app
 
 # (list) Source files to include (let empty to include all the files)
-source.include_exts = py,png,jpg,kv,atlas,html,css,otf,txt,jinja,yaml,yml
+source.include_exts = py,png,jpg,kv,atlas,html,css,otf,txt,jinja,yaml,yml,gz
 
 # (list) List of inclusions using pattern matching
 #source.include_patterns = assets/*,images/*.png
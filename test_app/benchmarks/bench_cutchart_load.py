@@ -0,0 +1,76 @@
+"""Compares the cold load time of the plain and the compressed cutchart.
+
+A cold load parses the cutchart and builds the columnar cache, a warm
+load maps the existing cache. The plain cutchart is decompressed from the
+shipped one. Run from the app directory::
+
+    python -m benchmarks.bench_cutchart_load [--repeat N]
+"""
+
+import argparse
+import gzip
+import os
+import shutil
+import tempfile
+import time
+
+from iotnode.cut_chart import CutChart
+from iotnode.cut_chart_fetcher import CutchartFetchInputParam
+
+
+def get_cutchart_files(tmp_dir: str):
+    """Returns the plain and the compressed cutchart paths, the plain one
+    being decompressed to the temporary directory.
+    """
+    dir_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "iotnode")
+    compressed = os.path.join(dir_path, CutchartFetchInputParam.FILE_NAME)
+    plain = os.path.join(tmp_dir, os.path.splitext(CutchartFetchInputParam.FILE_NAME)[0])
+    with gzip.open(compressed, "rb") as src, open(plain, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    return [plain, compressed]
+
+
+def load(filename: str, cache_dir: str) -> float:
+    """Returns the time to load the cutchart and build its indexes."""
+    start = time.perf_counter()
+    cutchart = CutChart(filename, cache_dir)
+    cutchart.preload()
+    elapsed = time.perf_counter() - start
+    cutchart.close()
+    return elapsed
+
+
+def bench(filename: str, repeat: int):
+    """Returns the best cold and warm load times of the cutchart."""
+    cold, warm = [], []
+    for _ in range(repeat):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cold.append(load(filename, cache_dir))
+            warm.append(load(filename, cache_dir))
+        finally:
+            shutil.rmtree(cache_dir)
+    return min(cold), min(warm)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print("{:<20} {:>10} {:>10} {:>10}".format("file", "size KB", "cold ms", "warm ms"))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for filename in get_cutchart_files(tmp_dir):
+            cold, warm = bench(filename, args.repeat)
+            print(
+                "{:<20} {:>10.1f} {:>10.1f} {:>10.1f}".format(
+                    os.path.basename(filename),
+                    os.path.getsize(filename) / 1024,
+                    cold * 1000,
+                    warm * 1000,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Measures the process value formatting rate, in samples per second.
+
+The process values are formatted on every poll for every screen. The
+samples replay a poll stream where a few read data values change at each
+poll, as on a machine cutting. After each sample, the process values
+shown by the screen are read. Run from the app directory::
+
+    python -m benchmarks.bench_psvalue [--number N] [--baseline REV] [--screen NAME]
+
+The formatter without converter caches is measured too, and with
+--baseline the psvalue module of the git revision, for comparison.
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import timeit
+
+from iotnode import psvalue
+from iotnode.memo_cache import ConverterCaches
+from iotnode.sample_data import VALID_READ_DATA
+
+# Read data values changing while cutting
+CHANGING_VALUES = {
+    "cur": (50, 70, 100, 130),
+    "av": (0, 120, 128, 135),
+    "app": (650, 655, 660),
+    "pip": (800, 805, 810),
+    "sip": (400, 402),
+    "dccm": (8, 9, 10, 11),
+    "ptr": (0, 1, 2),
+}
+
+
+def get_samples(count: int, changes: int, seed: int = 0) -> list:
+    """Returns the read data samples, each with a few values changed."""
+    rand = random.Random(seed)
+    samples = []
+    # Gas flows mapped for all the currents
+    sample = dict(VALID_READ_DATA, cur=50, pg=1, sf=5)
+    for _ in range(count):
+        sample = dict(sample)
+        for key in rand.sample(sorted(CHANGING_VALUES), changes):
+            sample[key] = rand.choice(CHANGING_VALUES[key])
+        samples.append(sample)
+    return samples
+
+
+def load_baseline(rev: str):
+    """Returns the psvalue module of the git revision."""
+    source = subprocess.run(
+        ["git", "show", "{}:./iotnode/psvalue.py".format(rev)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as file:
+        file.write(source)
+    spec = importlib.util.spec_from_file_location("baseline_psvalue", file.name)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        os.unlink(file.name)
+    return module
+
+
+def bench(create_formatter, samples: list, screen: str, number: int) -> float:
+    """Returns the best formatting rate of the samples, in samples per
+    second.
+    """
+    formatter = create_formatter()
+    keys = psvalue.SCREEN_KEYS.get(screen, tuple(formatter.data))
+
+    def get_screen_data():
+        # The revisions before the views format all the process values
+        if hasattr(formatter, "screen_view"):
+            return formatter.screen_view(screen)
+        return formatter.data
+
+    def run():
+        for sample in samples:
+            formatter.process_data(sample)
+            data = get_screen_data()
+            for key in keys:
+                data.get(key)
+
+    times = timeit.repeat(run, number=number, repeat=5)
+    return len(samples) * number / min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20)
+    parser.add_argument("--baseline", help="git revision to compare with")
+    parser.add_argument("--screen", default="cutting_screen")
+    args = parser.parse_args()
+
+    formatters = [
+        ("no cache", lambda: psvalue.ProcessValueFormatter(ConverterCaches(0))),
+        ("current", psvalue.ProcessValueFormatter),
+    ]
+    if args.baseline:
+        formatters.insert(0, (args.baseline, load_baseline(args.baseline).ProcessValueFormatter))
+
+    cases = [
+        ("identical", get_samples(100, 0)),
+        ("2 changes", get_samples(100, 2)),
+        ("5 changes", get_samples(100, 5)),
+    ]
+    print("{:<12}".format("samples") + "".join("{:>16}".format(name) for name, _ in formatters))
+    for case, samples in cases:
+        rates = [bench(create, samples, args.screen, args.number) for _, create in formatters]
+        print("{:<12}".format(case) + "".join("{:>16.0f}".format(rate) for rate in rates))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Compares the per sample cost of the jsonschema and the compiled validators.
+
+Each read data sample is validated on every poll, so its cost is paid at
+the poll rate. Run from the app directory::
+
+    python -m benchmarks.bench_validation [--number N]
+"""
+
+import argparse
+import timeit
+
+import jsonschema
+
+from iotnode.rpc import IotNodeInterface
+from iotnode.schema_compiler import CompiledValidator
+from iotnode.sample_data import VALID_READ_DATA
+from iotnode.test_schema_compiler import VALID_NETWORKS, get_valid_config
+from iotnode.configuration import Configuration
+
+
+def get_cases():
+    """Returns the name, schema, sample and format checker of each case."""
+    return [
+        ("read data", IotNodeInterface.READ_DATA_SCHEMA, VALID_READ_DATA, None),
+        ("networks", IotNodeInterface.NETWORKS_SCHEMA, VALID_NETWORKS, None),
+        (
+            "configuration",
+            Configuration.SCHEMA_v6,
+            get_valid_config(),
+            jsonschema.FormatChecker(),
+        ),
+    ]
+
+
+def bench(validate, sample, number: int) -> float:
+    """Returns the best time of a validation, in microseconds."""
+    times = timeit.repeat(lambda: validate(sample), number=number, repeat=5)
+    return min(times) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    print("{:<15} {:>14} {:>14} {:>8}".format("schema", "jsonschema us", "compiled us", "speedup"))
+    for name, schema, sample, format_checker in get_cases():
+        generic = jsonschema.Draft7Validator(schema, format_checker=format_checker)
+        compiled = CompiledValidator(schema, format_checker=format_checker)
+        generic_us = bench(generic.validate, sample, args.number)
+        compiled_us = bench(compiled.validate, sample, args.number)
+        print(
+            "{:<15} {:>14.1f} {:>14.1f} {:>7.1f}x".format(
+                name, generic_us, compiled_us, generic_us / compiled_us
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Reconnect delays and circuit breaker of the node connection.
+
+After a failed connection, the next attempt is delayed exponentially, up
+to a cap, with a random part so that the tablets of a shop do not retry in
+lockstep after its access point reboots. After repeated failures, the
+circuit breaker opens, and no connection is attempted until its open
+period is over. A single trial connection is then allowed, closing the
+circuit on success, and opening it again on failure.
+"""
+
+import random
+import time
+from typing import Callable
+
+
+class Backoff:
+    """Capped exponential backoff with jitter.
+
+    Half of each delay is fixed and half is random, so the delays still
+    grow while being spread out.
+
+    Args:
+        base: delay after the first failure, in seconds
+        cap: largest delay, in seconds
+        factor: growth of the delay after each failure
+        rand: random number generator in [0, 1)
+    """
+
+    def __init__(
+        self,
+        base: float,
+        cap: float,
+        factor: float = 2.0,
+        rand: Callable[[], float] = random.random,
+    ) -> None:
+        self._base = base
+        self._cap = cap
+        self._factor = factor
+        self._rand = rand
+        self.attempts = 0
+
+    def next_delay(self) -> float:
+        """Returns the delay before the next attempt, in seconds."""
+        delay = min(self._cap, self._base * self._factor ** self.attempts)
+        self.attempts += 1
+        return delay / 2 + self._rand() * delay / 2
+
+    def reset(self) -> None:
+        """Restarts from the base delay, after a successful attempt."""
+        self.attempts = 0
+
+
+class CircuitBreaker:
+    """Stops the connection attempts after repeated failures.
+
+    Args:
+        failure_threshold: consecutive failures opening the circuit
+        open_period: time the circuit stays open, in seconds
+        clock: monotonic clock, in seconds
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        open_period: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._failure_threshold = failure_threshold
+        self._open_period = open_period
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self.remaining() > 0:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self) -> bool:
+        """Returns True if a connection may be attempted."""
+        return self.state != self.OPEN
+
+    def remaining(self) -> float:
+        """Returns the time left before a trial connection, in seconds."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self._open_period - self._clock())
+
+    def on_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+
+    def on_failure(self) -> None:
+        self._failures += 1
+        if self._opened_at is not None or self._failures >= self._failure_threshold:
+            self._opened_at = self._clock()
+
+    def reset(self) -> None:
+        """Closes the circuit."""
+        self.on_success()
@@ -0,0 +1,63 @@
+"""Adaptive chunk size of the param transfers.
+
+The chunk size follows the additive increase, multiplicative decrease
+(AIMD) scheme: it grows by a fixed step after every fast, successful
+request, and is cut down by a factor after every failed request. Nodes on
+good links quickly move to large chunks, while weak links settle on
+small, reliable ones. Chunks rejected by the node for their size also
+lower the largest size tried again.
+"""
+
+
+class ChunkSizeController:
+    """Adapts the chunk size to the measured round trips and errors.
+
+    Args:
+        size: initial chunk size
+        min_size: smallest chunk size
+        max_size: largest chunk size
+        increase: step added to the size after a fast request
+        decrease: factor applied to the size after a failed request
+        slow_rtt: round trip time in seconds, above which the size is not
+            increased
+    """
+
+    def __init__(
+        self,
+        size: int,
+        min_size: int = 1,
+        max_size: int = 128,
+        increase: int = 5,
+        decrease: float = 0.5,
+        slow_rtt: float = 1.0,
+    ) -> None:
+        self._min_size = min_size
+        self._max_size = max_size
+        self._increase = increase
+        self._decrease = decrease
+        self._slow_rtt = slow_rtt
+        self.size = self._clamp(size)
+
+    def _clamp(self, size: int) -> int:
+        return max(self._min_size, min(self._max_size, int(size)))
+
+    def on_success(self, rtt: float) -> None:
+        """Updates the size after a successful request.
+
+        Args:
+            rtt: round trip time of the request in seconds
+        """
+        if rtt < self._slow_rtt:
+            self.size = self._clamp(self.size + self._increase)
+
+    def on_error(self, chunk_size: int, too_large: bool = False) -> None:
+        """Updates the size after a timeout, or a failed request.
+
+        Args:
+            chunk_size: size of the failed chunk
+            too_large: the chunk was rejected for its size, the size is
+                not grown back to it
+        """
+        if too_large:
+            self._max_size = max(self._min_size, chunk_size - 1)
+        self.size = self._clamp(min(self.size, chunk_size) * self._decrease)
@@ -17,6 +17,7 @@ from enum import Enum
 
 import jsonschema
 
+from .schema_compiler import CompiledValidator
 from .utils import VResult, validate_ip
 
 
@@ -126,22 +127,56 @@ class Machines:
             "torch_style": {"type": "string", "enum": ["21", "22"]},
         },
     }
+    SCHEMA_v6 = {
+        "type": "object",
+        "required": ["name", "ip", "port", "hose_length", "torch_style"],
+        "additionalProperties": False,
+        "properties": {
+            "name": {"type": "string", "minLength": 4, "maxLength": 20},
+            # FIXME: I am not sure if we want to restrict this to IPv4
+            # A hostname should also be valid. And may be IPv6 later on.
+            # Hose length value was in meters
+            "ip": {"type": "string", "anyOf": [{"format": "ipv4"}, {"format": "ipv6"}]},
+            "port": {"type": "integer", "minimum": 1, "maximum": 65535},
+            "hose_length": {
+                "type": "string",
+                "enum": [
+                    "3.0 m",
+                    "4.6 m",
+                    "7.6 m",
+                    "10.6 m",
+                    "15.2 m",
+                    "23 m",
+                    "30.5 m",
+                    "38.0 m",
+                    "45.6 m",
+                    "53.3 m",
+                ],
+            },
+            "torch_style": {"type": "string", "enum": ["21", "22"]},
+            # Chunk size of param transfers, learned for the machine
+            "chunk_size": {"type": "integer", "minimum": 1},
+        },
+    }
 
-    V1_VALIDATOR = jsonschema.Draft7Validator(
+    V1_VALIDATOR = CompiledValidator(
         SCHEMA_v1, format_checker=jsonschema.FormatChecker()
     )
-    V2_VALIDATOR = jsonschema.Draft7Validator(
+    V2_VALIDATOR = CompiledValidator(
         SCHEMA_v2, format_checker=jsonschema.FormatChecker()
     )
-    V3_VALIDATOR = jsonschema.Draft7Validator(
+    V3_VALIDATOR = CompiledValidator(
         SCHEMA_v3, format_checker=jsonschema.FormatChecker()
     )
-    V4_VALIDATOR = jsonschema.Draft7Validator(
+    V4_VALIDATOR = CompiledValidator(
         SCHEMA_v4, format_checker=jsonschema.FormatChecker()
     )
-    V5_VALIDATOR = jsonschema.Draft7Validator(
+    V5_VALIDATOR = CompiledValidator(
         SCHEMA_v5, format_checker=jsonschema.FormatChecker()
     )
+    V6_VALIDATOR = CompiledValidator(
+        SCHEMA_v6, format_checker=jsonschema.FormatChecker()
+    )
 
     def __init__(self):
         self._machines = OrderedDict()
@@ -152,7 +187,7 @@ class Machines:
         Raises:
             jsonschema.exception.ValidationError: if validation fails.
         """
-        self.V5_VALIDATOR.validate(machine)
+        self.V6_VALIDATOR.validate(machine)
 
     def add(self, machine: dict):
         """Adds machine to machine list.
@@ -229,7 +264,7 @@ class Machines:
 class Configuration:
     """Loads, validates and stores the configuration."""
 
-    LATEST_VERSION = 5
+    LATEST_VERSION = 6
 
     HOSE_LENGTH_MET2IMP = {
         "3.0 m": "10 ft",
@@ -310,29 +345,44 @@ class Configuration:
             "unit type": {"type": "string", "enum": ["IMPERIAL", "METRIC"]},
         },
     }
+    SCHEMA_v6 = {
+        "type": "object",
+        "required": ["poll period", "machines", "version", "unit type"],
+        "additionalProperties": False,
+        "properties": {
+            "version": {"type": "integer"},
+            "poll period": {"type": "integer"},
+            "machines": {"type": "array", "items": Machines.SCHEMA_v6},
+            "unit type": {"type": "string", "enum": ["IMPERIAL", "METRIC"]},
+        },
+    }
 
-    V1_VALIDATOR = jsonschema.Draft7Validator(
+    V1_VALIDATOR = CompiledValidator(
         SCHEMA_v1, format_checker=jsonschema.FormatChecker()
     )
-    V2_VALIDATOR = jsonschema.Draft7Validator(
+    V2_VALIDATOR = CompiledValidator(
         SCHEMA_v2, format_checker=jsonschema.FormatChecker()
     )
-    V3_VALIDATOR = jsonschema.Draft7Validator(
+    V3_VALIDATOR = CompiledValidator(
         SCHEMA_v3, format_checker=jsonschema.FormatChecker()
     )
-    V4_VALIDATOR = jsonschema.Draft7Validator(
+    V4_VALIDATOR = CompiledValidator(
         SCHEMA_v4, format_checker=jsonschema.FormatChecker()
     )
-    V5_VALIDATOR = jsonschema.Draft7Validator(
+    V5_VALIDATOR = CompiledValidator(
         SCHEMA_v5, format_checker=jsonschema.FormatChecker()
     )
+    V6_VALIDATOR = CompiledValidator(
+        SCHEMA_v6, format_checker=jsonschema.FormatChecker()
+    )
 
     def __init__(self):
         self.poll_period = 500
         self.machines = Machines()
         self.curr_machine = ""
         self.current_unit_type = UnitType.METRIC
-        self._version = 5
+        # The v6 machine chunk size is optional, v5 machines need no upgrade
+        self._version = self.LATEST_VERSION
 
     def _load_machines(self, machines: List[dict]) -> None:
         for machine in machines:
@@ -359,7 +409,7 @@ class Configuration:
     def _validate_config(self, config: dict) -> int:
         """Returns the config version."""
         try:
-            self.V5_VALIDATOR.validate(config)
+            self.V6_VALIDATOR.validate(config)
         except jsonschema.exceptions.ValidationError as exc:
             err_path = "/".join(str(i) for i in exc.absolute_path)
             raise ConfigLoadError(f"JSON validation failed at {err_path}")
@@ -466,6 +516,27 @@ class Configuration:
             return ""
         return curr_machine["torch_style"]
 
+    def get_chunk_size(self, default: int) -> int:
+        """Returns the chunk size of param transfers, learned for the
+        current machine.
+
+        Returns:
+           If no machine is selected, or no size is learned yet, returns
+           the default.
+        """
+        curr_machine = self.machines.get(self.curr_machine)
+        if not curr_machine:
+            return default
+        return curr_machine.get("chunk_size", default)
+
+    def set_chunk_size(self, chunk_size: int) -> None:
+        """Stores the chunk size learned for the current machine."""
+        curr_machine = self.machines.get(self.curr_machine)
+        if not curr_machine:
+            return
+        machine = dict(curr_machine, chunk_size=chunk_size)
+        self.machines.update(machine)
+
     @staticmethod
     def _validate_machine_name(name: str) -> VResult:
         if len(name) < 4:
@@ -1,11 +1,19 @@
 """Provides API to read and filter rows from the cutchart stored in a CSV
 file.
+
+The CSV file is compiled to a columnar cache on first use, and the
+queries are served from a memory-mapped view of the cache, see
+:mod:`iotnode.cut_chart_cache`.
 """
 
 # pylint: disable=import-error
-from typing import NamedTuple, List, Tuple
+import threading
+from typing import Dict, NamedTuple, List, Optional, Tuple
 from collections import OrderedDict
-import csv
+
+from .cut_chart_cache import ColumnarTable, load_table
+from .cut_chart_params import ParamMatrix
+from .cut_chart_ranges import ParamIdFilter
 
 
 class Error(Exception):
@@ -44,6 +52,8 @@ class CutChart:
 
     Args:
         filename: absolute filepath of cutchart csv
+        cache_dir: directory to store the compiled cutchart, defaults to
+            the CSV directory
     """
 
     PARAM_COL_IDX = {
@@ -62,24 +72,95 @@ class CutChart:
     PARAM_ID_COL_NO = 2
     PARAM_START_COL_NO = 36
     MARKING_PARAM_ID_OFFSET = 0x200
+    # Inclusive param id ranges, not sent to the node
     PARAM_ID_SKIP_RANGES = ((14592, 14612),)
+    # Inclusive param id ranges sent to the node, all if empty
+    PARAM_ID_INCLUDE_RANGES = ()
 
-    def __init__(self, filename):
+    def __init__(self, filename, cache_dir: Optional[str] = None):
         self._filename = filename
+        self._cache_dir = cache_dir
+        self._table = None
+        # The cutchart may be preloaded by a background thread
+        self._table_lock = threading.Lock()
+        self._revision = None
+        self._revision_read = False
+        self._clear_indexes()
         self.params_in_sorted_col_index = OrderedDict(
             sorted(CutChart.PARAM_COL_IDX.items(), key=lambda item: item[1])
         )
-        self.cutchart_revision = self._get_cutchart_revision()
+
+    @property
+    def cutchart_revision(self) -> Optional[str]:
+        """Revision of the cutchart, None if the file can't be read.
+
+        The cutchart is loaded on first access.
+        """
+        if not self._revision_read:
+            self._revision = self._get_cutchart_revision()
+            self._revision_read = True
+        return self._revision
+
+    def _get_table(self) -> ColumnarTable:
+        """Returns the compiled cutchart, loading it on first use.
+
+        Raises:
+            OSError: Error accessing the cutchart file.
+        """
+        with self._table_lock:
+            if self._table is None:
+                self._table = load_table(self._filename, self._cache_dir)
+            return self._table
+
+    def _clear_indexes(self) -> None:
+        # Process id to (row, marking row) offsets
+        self._process_index: Optional[Dict[str, Tuple[int, Optional[int]]]] = None
+        # Parameter values of cutting and marking rows
+        self._param_matrix: Optional[ParamMatrix] = None
+        # Input params of the cutting rows
+        self._process_list: Optional[List[InputParams]] = None
+        # Cutting and marking param ids, per filter flag
+        self._param_id_lists: Dict[bool, Tuple[List[int], List[int]]] = {}
+
+    def resident_size(self) -> int:
+        """Returns the approximate memory used by the cutchart, in bytes."""
+        if self._table is None:
+            return 0
+        size = self._table.nbytes
+        if self._param_matrix is not None:
+            size += self._param_matrix.nbytes
+        return size
+
+    def close(self) -> None:
+        """Releases the cutchart, and the indexes built from it."""
+        self._clear_indexes()
+        with self._table_lock:
+            if self._table is None:
+                return
+            self._table.close()
+            self._table = None
 
     def _get_cutchart_revision(self):
         try:
-            with open(self._filename) as csvfile:
-                data = csv.reader(csvfile)
-                for row in data:
-                    if row[0] == "h" and row[1] == "Rev":
-                        return "{}.{}.{}".format(row[3], row[4], row[5])
+            table = self._get_table()
         except OSError as exc:
             print(exc)
+            return None
+
+        for idx in table.find_all(0, "h"):
+            if table.cell(idx, 1) == "Rev":
+                row = table.row(idx)
+                return "{}.{}.{}".format(row[3], row[4], row[5])
+
+    def preload(self) -> None:
+        """Loads the cutchart and builds all the indexes used by the queries
+
+        Raises:
+            OSError: Error accessing the cutchart file.
+        """
+        self.load_process_list()
+        self._get_process_index()
+        self.get_param_matrix()
 
     def load_process_list(self) -> List[InputParams]:
         """Loads and filters cutting row values
@@ -88,18 +169,19 @@ class CutChart:
             Records of cut chart data
         """
 
-        def get_req_col(row):
-            input_params = []
-            for idx in self.params_in_sorted_col_index.values():
-                input_params.append(row[idx])
-            return InputParams(*input_params)
+        table = self._get_table()
+        if self._process_list is not None:
+            return list(self._process_list)
+
+        col_idx = list(self.params_in_sorted_col_index.values())
 
-        def is_cutting_row(row):
-            return row[CutChart.FILTER_COL] == "C"
+        def get_req_col(row_idx):
+            return InputParams(*(table.cell(row_idx, idx) for idx in col_idx))
 
-        with open(self._filename, "r") as file:
-            filtered_row = filter(is_cutting_row, csv.reader(file))
-            return list(map(get_req_col, filtered_row))
+        cutting_rows = table.find_all(CutChart.FILTER_COL, "C")
+        process_list = list(map(get_req_col, cutting_rows))
+        self._process_list = process_list
+        return list(process_list)
 
     def query_with_process_param(
         self, process_list: List[InputParams], **kwargs
@@ -132,6 +214,32 @@ class CutChart:
 
         return list(filter(match, process_list))
 
+    def _get_process_index(self) -> Dict[str, Tuple[int, Optional[int]]]:
+        """Returns the process id index of the cutchart.
+
+        The index maps every process id and marking process id to the
+        offset of its row, and the offset of the marking row referred by
+        it. It is built on first use, and kept till the cutchart is closed.
+        """
+        table = self._get_table()
+        if self._process_index is not None:
+            return self._process_index
+
+        processid_index = CutChart.PARAM_COL_IDX["process_id"]
+        marking_processid_index = CutChart.PARAM_COL_IDX["marking_process_id"]
+
+        row_by_id: Dict[str, int] = {}
+        for row_idx, sid in enumerate(table.column(processid_index)):
+            row_by_id.setdefault(table.string(sid), row_idx)
+
+        index = {}
+        for process_id, row_idx in row_by_id.items():
+            marking_id = table.cell(row_idx, marking_processid_index)
+            index[process_id] = (row_idx, row_by_id.get(marking_id))
+
+        self._process_index = index
+        return index
+
     def query_with_process_id(self, process_id: str):
         """Gets cutting and marking parameters based on process id
 
@@ -142,23 +250,14 @@ class CutChart:
             Cutting and Marking parameters for given process id
         """
 
-        processid_index = CutChart.PARAM_COL_IDX["process_id"]
-        marking_processid_index = CutChart.PARAM_COL_IDX["marking_process_id"]
-
-        def is_process_id_match(row):
-            if row[processid_index] == process_id:
-                return True
-            return False
-
-        with open(self._filename, "r") as file:
-            cutting_row = next(filter(is_process_id_match, csv.reader(file)), None)
-            if cutting_row is None:
-                raise Error("Invalid Process ID")
-            process_id = cutting_row[marking_processid_index]
-
-        with open(self._filename, "r") as file:
-            marking_row = next(filter(is_process_id_match, csv.reader(file)), None)
+        try:
+            cutting_idx, marking_idx = self._get_process_index()[process_id]
+        except KeyError:
+            raise Error("Invalid Process ID")
 
+        table = self._get_table()
+        cutting_row = table.row(cutting_idx)
+        marking_row = None if marking_idx is None else table.row(marking_idx)
         return cutting_row, marking_row
 
     def get_param_id_list(
@@ -166,33 +265,60 @@ class CutChart:
     ) -> Tuple[List[int], List[int]]:
         """Gets Param id and Marking param id values
 
+        The lists are computed on first use, and kept till the cutchart is
+        closed.
+
+        Args:
+            need_filter: only the param ids in ``PARAM_ID_INCLUDE_RANGES``,
+                and not in ``PARAM_ID_SKIP_RANGES``, without duplicates
+
         Returns:
             Param ids and Marking param ids as couple
         """
+        table = self._get_table()
+        param_id_lists = self._param_id_lists
+        if need_filter not in param_id_lists:
+            row = table.row(table.find(CutChart.PARAM_ID_COL_NO - 1, "ParamID"))
+            idx = CutChart.PARAM_START_COL_NO - 1
+            param_id_list = list(map(int, row[idx:-1]))
 
-        def is_param_id_row(row):
-            return row[CutChart.PARAM_ID_COL_NO - 1] == "ParamID"
+            if need_filter:
+                param_id_filter = ParamIdFilter(
+                    CutChart.PARAM_ID_INCLUDE_RANGES, CutChart.PARAM_ID_SKIP_RANGES
+                )
+                param_id_list = param_id_filter.apply(param_id_list)
 
-        def skip_param_id_ranges(param_id_list):
-            filtered_param_id = []
-            for param_id in param_id_list:
-                for skip_start, skip_end in CutChart.PARAM_ID_SKIP_RANGES:
-                    if param_id < skip_start or param_id > skip_end:
-                        filtered_param_id.append(param_id)
+            marking_param_id_list = [
+                param_id + self.MARKING_PARAM_ID_OFFSET for param_id in param_id_list
+            ]
+            param_id_lists[need_filter] = (param_id_list, marking_param_id_list)
 
-            return filtered_param_id
+        param_id_list, marking_param_id_list = param_id_lists[need_filter]
+        return (list(param_id_list), list(marking_param_id_list))
 
-        with open(self._filename, "r") as file:
-            row = next(filter(is_param_id_row, csv.reader(file)), None)
-            idx = CutChart.PARAM_START_COL_NO - 1
-            param_id_list = row[idx:-1]
-            param_id_list = list(map(int, param_id_list))
+    def get_param_matrix(self) -> ParamMatrix:
+        """Gets the parameter values of all the cutting and marking rows
 
-            if need_filter:
-                param_id_list = skip_param_id_ranges(param_id_list)
+        The matrix is built on first use, and kept till the cutchart is
+        closed.
+
+        Returns:
+            Parameter matrix indexed by process id
+        """
+        table = self._get_table()
+        if self._param_matrix is not None:
+            return self._param_matrix
+
+        param_id_list, _ = self.get_param_id_list()
+        matrix = ParamMatrix(param_id_list, self.MARKING_PARAM_ID_OFFSET)
+        processid_index = CutChart.PARAM_COL_IDX["process_id"]
+        idx = CutChart.PARAM_START_COL_NO - 1
 
-            def offset_func(a):
-                return a + self.MARKING_PARAM_ID_OFFSET
+        for row_idx in table.find_all(CutChart.FILTER_COL, "C") + table.find_all(
+            CutChart.FILTER_COL, "M"
+        ):
+            row = table.row(row_idx)
+            matrix.add_row(row[processid_index], row[idx:])
 
-            marking_param_id_list = list(map(offset_func, param_id_list))
-            return (param_id_list, marking_param_id_list)
+        self._param_matrix = matrix
+        return matrix
@@ -0,0 +1,318 @@
+"""Precompiled columnar cache of the cutchart CSV file.
+
+Parsing the cutchart CSV with ``csv.reader`` on every query is slow on
+the tablets. The CSV is compiled once into a versioned binary file,
+stored next to the CSV, and the queries are served from a memory-mapped
+view of that file. The cache is keyed by the SHA-256 digest of the CSV
+content and is rebuilt automatically when the CSV changes.
+
+Layout of the cache file (native, little endian unsigned integers)::
+
+    header        magic, format version, CSV digest, rows, cols, strings
+    str_offsets   uint32[strings + 1], offsets into the string blob
+    row_lengths   uint32[rows], number of cells in each row
+    columns       uint32[cols][rows], string id of each cell
+    blob          utf-8 encoded strings
+
+The CSV can also be gzip compressed (``.gz`` suffix), as the app's
+cutchart is, it is then parsed from the decompressor stream, without
+writing the plain CSV.
+
+The cache can also be built ahead of time, as part of the APK build::
+
+    python -m iotnode.cut_chart_cache iotnode/cutchart.csv.gz
+"""
+
+from array import array
+from typing import Dict, Iterable, List, Optional
+import csv
+import gzip
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+
+MAGIC = b"CCHT"
+FORMAT_VERSION = 1
+CACHE_SUFFIX = ".cache"
+GZIP_SUFFIX = ".gz"
+
+# Magic, format version, reserved, CSV digest, rows, cols, strings
+_HEADER = struct.Struct("<4sHH32sIII")
+# String id of the cells missing in short rows
+_MISSING = 0xFFFFFFFF
+
+
+class CacheError(Exception):
+    """Raised to indicate an invalid or stale cache file."""
+
+    pass
+
+
+def file_digest(filename: str) -> bytes:
+    """Returns the SHA-256 digest of the file content.
+
+    Raises:
+        OSError: Error accessing file.
+    """
+    digest = hashlib.sha256()
+    with open(filename, "rb") as fp:
+        for block in iter(lambda: fp.read(64 * 1024), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def read_csv_rows(filename: str) -> Iterable[List[str]]:
+    """Yields the rows of the cutchart CSV file.
+
+    Files with the ``.gz`` suffix are decompressed while being read.
+
+    Raises:
+        OSError: Error accessing file, or invalid gzip file.
+    """
+    if filename.endswith(GZIP_SUFFIX):
+        fp = gzip.open(filename, "rt", newline="")
+    else:
+        fp = open(filename, "r", newline="")
+    with fp:
+        try:
+            yield from csv.reader(fp)
+        except EOFError as exc:
+            raise OSError("Truncated cutchart file {}".format(filename)) from exc
+
+
+def build_table(rows: Iterable[List[str]], digest: bytes) -> bytes:
+    """Compiles the CSV rows to the columnar cache format.
+
+    Args:
+        rows: rows of the cutchart
+        digest: SHA-256 digest of the CSV file, the rows are read from
+
+    Returns:
+        Content of the cache file
+    """
+    string_ids: Dict[str, int] = {}
+    columns: List[List[int]] = []
+    row_lengths = array("I")
+
+    for row_no, row in enumerate(rows):
+        row_lengths.append(len(row))
+        while len(columns) < len(row):
+            columns.append([_MISSING] * row_no)
+        for col, cell in zip(columns, row):
+            col.append(string_ids.setdefault(cell, len(string_ids)))
+        for col in columns[len(row) :]:
+            col.append(_MISSING)
+
+    blob = bytearray()
+    str_offsets = array("I", [0])
+    for string in string_ids:
+        blob += string.encode("utf-8")
+        str_offsets.append(len(blob))
+
+    header = _HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        0,
+        digest,
+        len(row_lengths),
+        len(columns),
+        len(string_ids),
+    )
+    parts = [header, str_offsets.tobytes(), row_lengths.tobytes()]
+    parts.extend(array("I", col).tobytes() for col in columns)
+    parts.append(bytes(blob))
+    return b"".join(parts)
+
+
+class ColumnarTable:
+    """Read-only view of the cutchart, backed by the cache file content.
+
+    Args:
+        buffer: content of the cache file, a mmap or bytes object
+
+    Raises:
+        CacheError: if the buffer is not a valid cache
+    """
+
+    def __init__(self, buffer) -> None:
+        self._buffer = buffer
+        if len(buffer) < _HEADER.size:
+            raise CacheError("Truncated cache header")
+
+        magic, version, _, digest, n_rows, n_cols, n_strings = _HEADER.unpack_from(
+            buffer
+        )
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise CacheError("Unsupported cache format")
+
+        n_words = n_strings + 1 + n_rows + n_cols * n_rows
+        blob_start = _HEADER.size + n_words * 4
+        if len(buffer) < blob_start:
+            raise CacheError("Truncated cache")
+        (blob_size,) = struct.unpack_from("I", buffer, _HEADER.size + n_strings * 4)
+        if len(buffer) != blob_start + blob_size:
+            raise CacheError("Truncated string table")
+
+        self.digest = digest
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.nbytes = len(buffer)
+
+        words = memoryview(buffer)[_HEADER.size : blob_start].cast("I")
+        offset = 0
+
+        def take(count):
+            nonlocal offset
+            start, offset = offset, offset + count
+            return words[start:offset]
+
+        self._str_offsets = take(n_strings + 1)
+        self._row_lengths = take(n_rows)
+        self._columns = [take(n_rows) for _ in range(n_cols)]
+        self._blob = memoryview(buffer)[blob_start:]
+
+        self._strings: List[Optional[str]] = [None] * n_strings
+        self._string_ids: Optional[Dict[str, int]] = None
+
+    def string(self, string_id: int) -> str:
+        """Returns the string for the given string id."""
+        string = self._strings[string_id]
+        if string is None:
+            start = self._str_offsets[string_id]
+            end = self._str_offsets[string_id + 1]
+            string = str(self._blob[start:end], "utf-8")
+            self._strings[string_id] = string
+        return string
+
+    def string_id(self, string: str) -> Optional[int]:
+        """Returns the string id of the given string, None if not present."""
+        if self._string_ids is None:
+            self._string_ids = {
+                self.string(sid): sid for sid in range(len(self._strings))
+            }
+        return self._string_ids.get(string)
+
+    def column(self, col: int):
+        """Returns the string ids of the cells in the given column."""
+        return self._columns[col]
+
+    def cell(self, row: int, col: int) -> str:
+        """Returns the cell value, empty string for missing cells."""
+        if col >= self.n_cols:
+            return ""
+        sid = self._columns[col][row]
+        if sid == _MISSING:
+            return ""
+        return self.string(sid)
+
+    def row(self, row: int) -> List[str]:
+        """Returns the row, as it was read from the CSV file."""
+        return [
+            self.string(self._columns[col][row])
+            for col in range(self._row_lengths[row])
+        ]
+
+    def find(self, col: int, value: str, start: int = 0) -> Optional[int]:
+        """Returns the index of the first row, with given value in the column.
+
+        Args:
+            col: column number to search in
+            value: cell value to search for
+            start: row index to start the search from
+        """
+        sid = self.string_id(value)
+        if sid is None or col >= self.n_cols:
+            return None
+        try:
+            return self._columns[col].tolist().index(sid, start)
+        except ValueError:
+            return None
+
+    def find_all(self, col: int, value: str) -> List[int]:
+        """Returns the indices of all the rows, with given value in the column."""
+        sid = self.string_id(value)
+        if sid is None or col >= self.n_cols:
+            return []
+        return [idx for idx, cell in enumerate(self._columns[col]) if cell == sid]
+
+    def close(self) -> None:
+        """Releases the memory map, if any."""
+        self._str_offsets = self._row_lengths = self._blob = None
+        self._columns = []
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+
+def get_cache_path(filename: str, cache_dir: Optional[str] = None) -> str:
+    """Returns the cache file path for the CSV file."""
+    if cache_dir is None:
+        return filename + CACHE_SUFFIX
+    return os.path.join(cache_dir, os.path.basename(filename) + CACHE_SUFFIX)
+
+
+def _map_cache(cache_path: str, digest: bytes) -> ColumnarTable:
+    with open(cache_path, "rb") as fp:
+        buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        table = ColumnarTable(buffer)
+    except CacheError:
+        buffer.close()
+        raise
+    if table.digest != digest:
+        table.close()
+        raise CacheError("Stale cache")
+    return table
+
+
+def _write_cache(cache_path: str, content: bytes) -> None:
+    tmp_path = "{}.{}.tmp".format(cache_path, os.getpid())
+    try:
+        with open(tmp_path, "wb") as fp:
+            fp.write(content)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def load_table(filename: str, cache_dir: Optional[str] = None) -> ColumnarTable:
+    """Loads the cutchart, building the cache if missing or stale.
+
+    If the cache file cannot be written, the table is served from memory.
+
+    Args:
+        filename: absolute filepath of cutchart csv
+        cache_dir: directory to store the cache, defaults to CSV directory
+
+    Raises:
+        OSError: Error accessing the CSV file.
+    """
+    digest = file_digest(filename)
+    cache_path = get_cache_path(filename, cache_dir)
+
+    # The cache uses native byte order, prebuilt caches are little endian
+    if sys.byteorder == "little":
+        try:
+            return _map_cache(cache_path, digest)
+        except (OSError, ValueError, CacheError):
+            pass
+
+    content = build_table(read_csv_rows(filename), digest)
+    if sys.byteorder == "little":
+        try:
+            _write_cache(cache_path, content)
+            return _map_cache(cache_path, digest)
+        except (OSError, ValueError, CacheError) as exc:
+            print("Cutchart cache not stored: {}".format(exc))
+
+    return ColumnarTable(content)
+
+
+if __name__ == "__main__":
+    for csv_filename in sys.argv[1:]:
+        load_table(csv_filename).close()
+        print("Built {}".format(get_cache_path(csv_filename)))
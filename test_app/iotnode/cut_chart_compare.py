@@ -0,0 +1,71 @@
+"""Compares the node param values against the cutchart, as they arrive.
+
+The node param values are read in chunks. Each chunk is checked against
+the expected cutchart values as soon as it is received, so the progress
+and the mismatch count are known during the transfer.
+"""
+
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+class CutchartComparator:
+    """Running comparison of the node param values against the cutchart.
+
+    Args:
+        expected: cutchart value of each param id, param ids not in the
+            cutchart are not compared
+        n_params: number of param values to be received
+
+    Attributes:
+        obtained: node value of each received param id
+        mismatches: (expected, obtained) values of the differing param ids
+    """
+
+    def __init__(self, expected: Dict[int, int], n_params: int) -> None:
+        self._expected = expected
+        self._n_params = n_params
+        self.obtained: Dict[int, int] = {}
+        self.mismatches: Dict[int, Tuple[int, int]] = {}
+
+    @property
+    def n_received(self) -> int:
+        return len(self.obtained)
+
+    @property
+    def n_mismatched(self) -> int:
+        return len(self.mismatches)
+
+    def differs(self) -> bool:
+        """Returns True if any of the received values differs."""
+        return bool(self.mismatches)
+
+    def update(self, chunk: Iterable[Sequence[int]]) -> int:
+        """Compares a chunk of (param_id, value) pairs read from the node.
+
+        Returns:
+            Number of differing values in the chunk
+        """
+        pairs: List[Sequence[int]] = list(chunk)
+        if not pairs:
+            return 0
+        param_ids, values = zip(*pairs)
+        expected_values = list(map(self._expected.get, param_ids))
+        self.obtained.update(zip(param_ids, values))
+
+        mismatches = [
+            (param_id, (expected, value))
+            for param_id, expected, value in zip(param_ids, expected_values, values)
+            if expected is not None and expected != value
+        ]
+        self.mismatches.update(mismatches)
+        return len(mismatches)
+
+    def progress(self) -> Dict[str, int]:
+        """Returns the progress of the comparison, as the
+        ``cutchart_compare_progress`` event value.
+        """
+        return {
+            "received": self.n_received,
+            "total": self._n_params,
+            "mismatched": self.n_mismatched,
+        }
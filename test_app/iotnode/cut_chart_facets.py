@@ -0,0 +1,152 @@
+"""Bitmap index for faceted filtering of the cutchart process list.
+
+For every facet (material, thickness, gas, ...) and every value of the
+facet, a bitmap of the rows having that value is precomputed. Bitmaps are
+stored as Python integers, bit ``n`` set indicates row ``n`` matches.
+Narrowing a selection is an intersection of bitmaps, and the values
+remaining available for a facet are the ones with a non-zero population
+count in the current selection.
+"""
+
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Sequence
+
+
+def popcount(bitmap: int) -> int:
+    """Returns the number of rows in the bitmap."""
+    return bin(bitmap).count("1")
+
+
+if hasattr(int, "bit_count"):
+    popcount = int.bit_count  # noqa: F811
+
+
+class FacetIndex:
+    """Precomputed bitmaps of rows, per facet value.
+
+    The selections are kept as a stack, so a selection can be undone
+    without recomputing the bitmaps.
+
+    Args:
+        rows: rows to be indexed
+        facets: facet name and the function returning the facet value of
+            a row
+    """
+
+    def __init__(
+        self, rows: Sequence[Any], facets: Dict[str, Callable[[Any], Hashable]]
+    ) -> None:
+        self.rows = rows
+        self.all_rows = (1 << len(rows)) - 1
+        self._bitmaps: Dict[str, Dict[Hashable, int]] = {}
+
+        for name, get_value in facets.items():
+            bitmaps: Dict[Hashable, int] = {}
+            for idx, row in enumerate(rows):
+                value = get_value(row)
+                bitmaps[value] = bitmaps.get(value, 0) | (1 << idx)
+            self._bitmaps[name] = bitmaps
+
+        self._selections = [self.all_rows]
+
+    @property
+    def selection(self) -> int:
+        """Bitmap of the rows in the current selection."""
+        return self._selections[-1]
+
+    def _get_bitmaps(self, facet: str) -> Dict[Hashable, int]:
+        try:
+            return self._bitmaps[facet]
+        except KeyError:
+            raise ValueError(f"The given {facet} not available")
+
+    def bitmap(self, facet: str, value: Hashable) -> int:
+        """Returns the bitmap of the rows with the given facet value.
+
+        Raises:
+            ValueError: if the facet is not indexed
+        """
+        return self._get_bitmaps(facet).get(value, 0)
+
+    def union(self, facet: str, predicate: Callable[[Hashable], bool]) -> int:
+        """Returns the bitmap of the rows whose facet value match the predicate.
+
+        Raises:
+            ValueError: if the facet is not indexed
+        """
+        bitmap = 0
+        for value, value_bitmap in self._get_bitmaps(facet).items():
+            if predicate(value):
+                bitmap |= value_bitmap
+        return bitmap
+
+    def reset(self, bitmap: int = None) -> None:
+        """Drops all the selections, and starts over from the given rows.
+
+        Args:
+            bitmap: rows to start from, defaults to all rows
+        """
+        if bitmap is None:
+            bitmap = self.all_rows
+        self._selections = [bitmap & self.all_rows]
+
+    def select(self, **kwargs: Hashable) -> int:
+        """Narrows the current selection to rows matching all facet values.
+
+        Keyword Args:
+            facet name: Target facet to match
+            value: Target value to match
+
+        Returns:
+            Bitmap of the new selection
+
+        Raises:
+            ValueError: if the facet is not indexed
+        """
+        bitmap = self.selection
+        for facet, value in kwargs.items():
+            bitmap &= self.bitmap(facet, value)
+        self._selections.append(bitmap)
+        return bitmap
+
+    def undo(self) -> int:
+        """Reverts the last selection.
+
+        Returns:
+            Bitmap of the restored selection
+        """
+        if len(self._selections) > 1:
+            self._selections.pop()
+        return self.selection
+
+    def counts(self, facet: str) -> Dict[Hashable, int]:
+        """Returns the facet values available in the current selection.
+
+        Returns:
+            Facet value and the number of selected rows having the value
+
+        Raises:
+            ValueError: if the facet is not indexed
+        """
+        selection = self.selection
+        counts = {}
+        for value, bitmap in self._get_bitmaps(facet).items():
+            count = popcount(bitmap & selection)
+            if count:
+                counts[value] = count
+        return counts
+
+    def __len__(self) -> int:
+        return popcount(self.selection)
+
+    def indices(self, bitmap: int = None) -> Iterable[int]:
+        """Yields the row indices in the bitmap, defaults to the selection."""
+        if bitmap is None:
+            bitmap = self.selection
+        while bitmap:
+            lowest = bitmap & -bitmap
+            yield lowest.bit_length() - 1
+            bitmap ^= lowest
+
+    def selected_rows(self) -> List[Any]:
+        """Returns the rows in the current selection."""
+        return [self.rows[idx] for idx in self.indices()]
@@ -1,13 +1,18 @@
 import os
+import threading
 from .cut_chart import CutChart, InputParams, Error
+from .cut_chart_facets import FacetIndex
 import re
 from typing import NamedTuple, Optional, Union, List
 
 def get_cutchart_path():
-    """Returns the absolute path of the cut chart csv file"""
+    """Returns the absolute path of the cut chart csv file
+
+    The cut chart is kept gzip compressed in the source tree, and packaged
+    as is in the APK.
+    """
     dir_path = os.path.abspath(os.path.dirname(__file__))
-    file_path = os.path.join(dir_path, CutchartFetchInputParam.FILE_NAME)
-    return file_path
+    return os.path.join(dir_path, CutchartFetchInputParam.FILE_NAME)
 
 
 class CutChartFetcherError(Exception):
@@ -27,6 +32,80 @@ class Thickness(NamedTuple):
 
 
 
+class CutchartPrefetcher:
+    """Loads the cut chart in a background thread.
+
+    Once the cut chart and its indexes are loaded, the ``cutchart_ready``
+    event is sent. Screens created after that query the same cut chart
+    object, from the already built indexes, without parsing it again. If
+    the loading fails, the ``cutchart_error`` event is sent instead, with
+    the error message.
+
+    Args:
+        send_event_cb: callback to send the readiness event
+        filename: absolute filepath of cutchart csv, used if no cut chart
+            is given
+        cutchart: cut chart to load, the registry's active one
+
+    Attributes:
+        cutchart: cut chart loaded
+        error: exception raised when loading the cut chart, if any
+    """
+    EVENT_NAME = "cutchart_ready"
+    ERROR_EVENT_NAME = "cutchart_error"
+
+    def __init__(
+        self,
+        send_event_cb,
+        filename: Optional[str] = None,
+        cutchart: Optional[CutChart] = None,
+    ) -> None:
+        self._send_event_cb = send_event_cb
+        self.cutchart = cutchart or CutChart(filename or get_cutchart_path())
+        self._ready = threading.Event()
+        self._thread = None
+        self.error = None
+
+    def start(self) -> None:
+        """Starts loading the cut chart, if not already started."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._load, name="cutchart-prefetch", daemon=True)
+        self._thread.start()
+
+    def _load(self) -> None:
+        try:
+            self.cutchart.preload()
+        except Exception as exc:  # pylint: disable=broad-except
+            self.error = exc
+            try:
+                print("Cutchart prefetch failed: {}".format(exc))
+            except ModuleNotFoundError as e:
+                pass
+        finally:
+            self._ready.set()
+        if self.error is None:
+            self._send_event_cb(self.EVENT_NAME)
+        else:
+            self._send_event_cb(self.ERROR_EVENT_NAME, str(self.error))
+
+    def is_ready(self) -> bool:
+        """Returns True, once the cut chart loading is completed."""
+        return self._ready.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until the cut chart loading is completed.
+
+        Args:
+            timeout: maximum time to wait, in seconds
+
+        Returns:
+            True, if the loading is completed
+        """
+        return self._ready.wait(timeout)
+
+
 class CutchartFetchInputParam:
     """Loads and stores cut chart data in user readable format
 
@@ -44,13 +123,26 @@ class CutchartFetchInputParam:
         thickness_selection_list: segregated thickness values
         amperage_selection_list: segregated amperage values
         cutchart_obj: perform query values on the cut chart file
-        rows: rows of values loaded from the cut chart
+        rows: rows of values in the current selection
+        facets: bitmap index of the cut chart rows
         is_metric: apply filter based on the unit of measure selected
         selected_param: target column and value as key value pair to apply filter
     """
-    FILE_NAME = "cutchart.csv"
-
-    def __init__(self, use_metric: bool) -> None:
+    FILE_NAME = "cutchart.csv.gz"
+
+    # Columns of the cut chart, that can be used to filter the rows
+    FACETS = {
+        "material": lambda row: row.material,
+        "thickness": lambda row: row.thickness,
+        "is_thickness_inch": lambda row: row.is_thickness_inch,
+        "cutting_quality": lambda row: row.cutting_quality,
+        "amperage": lambda row: row.amperage,
+        "plasma_gas": lambda row: row.plasma_gas,
+        "shield_gas": lambda row: row.shield_gas,
+        "gas": lambda row: (row.plasma_gas, row.shield_gas),
+    }
+
+    def __init__(self, use_metric: bool, cutchart_obj: Optional[CutChart] = None) -> None:
         # User-friendly value of cutchart param
         self.cutting_quality_map = {"B": "Best",
                                     "F": "Fastest",
@@ -88,70 +180,75 @@ class CutchartFetchInputParam:
         self.thickness_selection_list = []
         self.amperage_selection_list = []
 
-        self.cutchart_obj = CutChart(get_cutchart_path())
-        self.rows = self.cutchart_obj.load_process_list()
+        self.cutchart_obj = cutchart_obj or CutChart(get_cutchart_path())
+        rows = self.cutchart_obj.load_process_list()
+        self.facets = FacetIndex(rows, self.FACETS)
+
+        # Thickness values are sorted by the thickness in inch
+        self._thickness_in_inch = {}
+        for row in rows:
+            in_inch = float(row.thickness_inch)
+            prev = self._thickness_in_inch.get(row.thickness, in_inch)
+            self._thickness_in_inch[row.thickness] = min(prev, in_inch)
 
         #
         # FIXME: We need to use the metric / imperial column to select between the two.
         # Because there are other units that used in case of imperial, apart from inches, like gauge.
         #
         self.is_metric = use_metric
-        self.update_input_params()
         self.selected_param = {}
+        self.reset()
+
+    @property
+    def rows(self) -> List[InputParams]:
+        """Rows of the cut chart in the current selection."""
+        return self.facets.selected_rows()
+
+    def reset(self):
+        """Drops all the selections, and reapplies the unit of measure."""
+        unit = "1" if self.is_metric else "0"
+        valid_rows = self.facets.union("is_thickness_inch", lambda val: unit in val)
+        valid_rows &= self.facets.union(
+            "cutting_quality", lambda val: val in self.cutting_quality_map)
+        self.facets.reset(valid_rows)
+        self.selected_param = {}
+        self.update_input_params()
 
     def update_input_params(self):
         """
         Stores the input params to its individual parameter and
         converts cutchart format to required (user-friendly) format.
         """
-
-        def is_valid_row(row: InputParams):
-            mm_check = ("1" if self.is_metric else "0") in row.is_thickness_inch
-            cutting_quality_check = (
-                row.cutting_quality in self.cutting_quality_map)
-            return cutting_quality_check and mm_check
-
-        filtered_rows = filter(is_valid_row, self.rows)
-        inp_params_by_col = zip(*filtered_rows)
-        inp_params_by_name = dict(zip(InputParams._fields, inp_params_by_col))
-
-        material_list = set(inp_params_by_name["material"])
         self.material_selection_list = [
-            self.material_map[m] for m in material_list]
-
-        thickness_set = inp_params_by_name["thickness"]
-        thickness_inch_set = inp_params_by_name["thickness_inch"]
-        thickness = set(zip(thickness_set, thickness_inch_set))
-        thickness_list = [Thickness(value, float(in_inch)) for value, in_inch in thickness]
-        thickness_list.sort(key=lambda item: item.in_inch, reverse=False)
-        thickness_selection_list = []
-        for thickness in thickness_list:
-            if thickness.value not in thickness_selection_list:
-                thickness_selection_list.append(thickness.value)
-        self.thickness_selection_list = thickness_selection_list
+            self.material_map[m] for m in self.facets.counts("material")]
 
+        thickness_list = sorted(self.facets.counts("thickness"),
+                                key=self._thickness_in_inch.get)
+        self.thickness_selection_list = thickness_list
 
-        cutting_quality_list = set(inp_params_by_name["cutting_quality"])
+        cutting_quality_list = self.facets.counts("cutting_quality")
         self.cutting_quality_selection_list.clear()
         # cutting quality selection list order should be same as cutting_quality_map
         for key, val in self.cutting_quality_map.items():
             if key in cutting_quality_list:
                 self.cutting_quality_selection_list.append(val)
 
-        plasma_gas_list = inp_params_by_name["plasma_gas"]
-        shield_gas_list = inp_params_by_name["shield_gas"]
-        gas_pairs = zip(plasma_gas_list, shield_gas_list)
+        gas_pairs = self.facets.counts("gas")
         self.gas_selection_list = set(f"{self.gas_plasma_map[p]} / {self.gas_shield_map[s]}"
                                       for p, s in gas_pairs)
 
-        amp_lst = {*inp_params_by_name["amperage"]}
+        amp_lst = self.facets.counts("amperage")
         self.amperage_selection_list = sorted(amp_lst, key=int)
 
     def reduce_row(self):
         """Filters the applicable row from the selected parameters"""
-        # for the selected param we are reducing the self.rows
-        self.rows = self.cutchart_obj.query_with_process_param(
-            self.rows, **self.selected_param)
+        # for the selected param we are narrowing the selected rows
+        self.facets.select(**self.selected_param)
+        self.update_input_params()
+
+    def undo_selection(self):
+        """Reverts the last selection, without reloading the cut chart"""
+        self.facets.undo()
         self.update_input_params()
 
     def gas_selected(self, text: str):
@@ -228,8 +325,8 @@ class CutChartParam:
     PARAM_START_COL_NO = 36
     PROCESS_ID_IDX = 1
 
-    def __init__(self) -> None:
-        self.cutchart_obj = CutChart(get_cutchart_path())
+    def __init__(self, cutchart_obj: Optional[CutChart] = None) -> None:
+        self.cutchart_obj = cutchart_obj or CutChart(get_cutchart_path())
 
     def get_cutting_marking_params(self, process_id: str):
         """Performs query with the given process id
@@ -256,6 +353,23 @@ class CutChartParam:
         """
         return self.cutchart_obj.get_param_id_list(need_filter)
 
+    def _get_process_id_list(self, process_id: int):
+        return [
+            (self.PARAM_ID_CCM_PROCESS_ID, process_id),
+            (self.PARAM_ID_DMC_PROCESS_ID, process_id),
+            (self.PARAM_ID_DPC_PROCESS_ID, process_id)
+        ]
+
+    def _get_pairs(self, row: Optional[List[str]], marking: bool = False):
+        if row is None:
+            return []
+        matrix = self.cutchart_obj.get_param_matrix()
+        process_id = row[self.PROCESS_ID_IDX]
+        if process_id in matrix:
+            return matrix.pairs(process_id, marking)
+        idx = self.PARAM_START_COL_NO-1
+        return matrix.pairs_from_cells(row[idx:], marking)
+
     def get_param_id_val_pair(self, cutting: List[str], marking: List[str]):
         """Groups cutting pairs and marking pairs for corresponding process id
 
@@ -266,34 +380,30 @@ class CutChartParam:
         Returns:
             Cutting pairs, Marking pairs, List of Process id as tuples
         """
+        cutting_pairs = self._get_pairs(cutting)
+        marking_pairs = self._get_pairs(marking, marking=True)
+        process_id_list = self._get_process_id_list(int(cutting[self.PROCESS_ID_IDX]))
+        return (*cutting_pairs, *marking_pairs, *process_id_list)
 
-        def is_value_empty(pair: str) -> bool:
-            return not (pair[1].strip() == "" or pair[1] is None)
+    def get_param_id_val_pairs(self, process_ids: List[str]):
+        """Groups cutting and marking pairs for several process ids at once
 
-        def cast_int(string: str) -> int:
-            try:
-                return int(string)
-            except ValueError:
-                return int(float(string))
-
-        cutting_param_id_list, marking_param_id_list = self.get_param_ids()
-        process_id_list = [
-            (self.PARAM_ID_CCM_PROCESS_ID, int(cutting[self.PROCESS_ID_IDX])),
-            (self.PARAM_ID_DMC_PROCESS_ID, int(cutting[self.PROCESS_ID_IDX])),
-            (self.PARAM_ID_DPC_PROCESS_ID, int(cutting[self.PROCESS_ID_IDX]))
-        ]
-        idx = self.PARAM_START_COL_NO-1
-        # Pipeline to get Cutting pairs
-        cutting_value_list = cutting[idx:]
-        cutting_pairs = zip(cutting_param_id_list, cutting_value_list)
-        cutting_pairs = filter(is_value_empty, cutting_pairs)
-        cutting_pairs = [(k, cast_int(v)) for k, v in cutting_pairs]
-        # Pipeline to get marking pairs
-        marking_value_list = marking[idx:]
-        marking_pairs = zip(marking_param_id_list, marking_value_list)
-        marking_pairs = filter(is_value_empty, marking_pairs)
-        marking_pairs = [(k, cast_int(v)) for k, v in marking_pairs]
-        return (*cutting_pairs, *marking_pairs, *process_id_list)
+        Used to pre-stage the downloads of a job list.
+
+        Args:
+            process_ids: list of cutting process ids
+
+        Returns:
+            Cutting pairs, Marking pairs, List of Process id as tuples, by
+            process id
+
+        Raises:
+            CutChartFetcherError
+        """
+        return {
+            pid: self.get_param_id_val_pair(*self.get_cutting_marking_params(pid))
+            for pid in process_ids
+        }
 
     def get_cutting_marking_param_with_param_id(self, process_id: str):
         """Maps cutting and marking values pair into tuples
@@ -0,0 +1,126 @@
+"""Integer matrix of the cutting and marking parameter values.
+
+The parameter block of the cutchart (columns 36 to the end) is parsed
+once into a row-major integer matrix, with a validity mask marking the
+non-empty cells, and a cached vector of parameter ids. Producing the
+(param_id, value) pairs for a process is then a masked selection over a
+row of the matrix, instead of parsing the row cell by cell.
+"""
+
+from array import array
+from itertools import compress
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+ParamPairs = List[Tuple[int, int]]
+
+
+def parse_cell(cell: str) -> Tuple[int, bool]:
+    """Returns the integer value of a cell, and if the cell is non-empty."""
+    if cell is None or cell.strip() == "":
+        return 0, False
+    try:
+        return int(cell), True
+    except ValueError:
+        return int(float(cell)), True
+
+
+class ParamMatrix:
+    """Parameter values of the cutchart processes.
+
+    Args:
+        param_ids: param id of each parameter column
+        marking_offset: offset added to param ids, for marking rows
+
+    Attributes:
+        param_ids: param id vector, for cutting rows
+        marking_param_ids: param id vector, for marking rows
+        values: parameter values, one row of ``len(param_ids)`` per process
+        mask: 1 if the corresponding value is present in the cutchart
+    """
+
+    def __init__(self, param_ids: Sequence[int], marking_offset: int) -> None:
+        self.param_ids = array("q", param_ids)
+        self.marking_param_ids = array("q", (i + marking_offset for i in param_ids))
+        self.values = array("q")
+        self.mask = bytearray()
+        self._row_index: Dict[str, int] = {}
+        self._parsed: Dict[str, Tuple[int, bool]] = {}
+
+    def __len__(self) -> int:
+        return len(self._row_index)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the values and the mask, in bytes."""
+        return len(self.values) * self.values.itemsize + len(self.mask)
+
+    def __contains__(self, process_id: str) -> bool:
+        return process_id in self._row_index
+
+    def _parse(self, cells: Sequence[str]) -> Tuple[array, bytes]:
+        n_params = len(self.param_ids)
+        values = array("q", bytes(8 * n_params))
+        mask = bytearray(n_params)
+        parsed = self._parsed
+        for idx, cell in enumerate(cells[:n_params]):
+            value = parsed.get(cell)
+            if value is None:
+                value = parsed[cell] = parse_cell(cell)
+            values[idx], mask[idx] = value
+        return values, bytes(mask)
+
+    def add_row(self, process_id: str, cells: Sequence[str]) -> None:
+        """Appends the parameter cells of a process to the matrix.
+
+        Args:
+            process_id: process id of the cutchart row
+            cells: cells of the row, from the first parameter column
+        """
+        if process_id in self._row_index:
+            return
+        values, mask = self._parse(cells)
+        self._row_index[process_id] = len(self._row_index)
+        self.values.extend(values)
+        self.mask.extend(mask)
+
+    def get_row(self, process_id: str) -> Tuple[array, bytes]:
+        """Returns the values and validity mask of a process.
+
+        Raises:
+            KeyError: if the process is not in the matrix
+        """
+        n_params = len(self.param_ids)
+        start = self._row_index[process_id] * n_params
+        end = start + n_params
+        return self.values[start:end], bytes(self.mask[start:end])
+
+    def _pairs(self, values, mask, marking: bool) -> ParamPairs:
+        param_ids = self.marking_param_ids if marking else self.param_ids
+        return list(zip(compress(param_ids, mask), compress(values, mask)))
+
+    def pairs(self, process_id: str, marking: bool = False) -> ParamPairs:
+        """Returns the (param_id, value) pairs of the non-empty cells.
+
+        Args:
+            process_id: process id of the cutchart row
+            marking: use the marking param ids
+
+        Raises:
+            KeyError: if the process is not in the matrix
+        """
+        return self._pairs(*self.get_row(process_id), marking)
+
+    def pairs_from_cells(self, cells: Sequence[str], marking: bool = False) -> ParamPairs:
+        """Returns the (param_id, value) pairs of a row not in the matrix."""
+        return self._pairs(*self._parse(cells), marking)
+
+    def batch_pairs(
+        self, process_ids: Iterable[str], marking: bool = False
+    ) -> Dict[str, ParamPairs]:
+        """Returns the (param_id, value) pairs of several processes.
+
+        Raises:
+            KeyError: if any of the processes is not in the matrix
+        """
+        return {pid: self.pairs(pid, marking) for pid in process_ids}
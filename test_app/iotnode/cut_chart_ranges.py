@@ -0,0 +1,90 @@
+"""Sorted interval set of the cutchart param id ranges.
+
+The param id ranges are kept as sorted, disjoint, inclusive intervals, so
+checking an id against any number of ranges is a binary search over the
+interval starts.
+"""
+
+from bisect import bisect_right
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+
+Interval = Tuple[int, int]
+
+
+class IntervalSet:
+    """Set of integers stored as sorted, disjoint, inclusive intervals.
+
+    Overlapping and adjacent intervals are merged on insertion.
+
+    Args:
+        intervals: (start, end) intervals, both ends included
+    """
+
+    def __init__(self, intervals: Iterable[Interval] = ()) -> None:
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        for start, end in intervals:
+            self.add(start, end)
+
+    def add(self, start: int, end: int) -> None:
+        """Adds the interval [start, end] to the set.
+
+        Raises:
+            ValueError: if the interval end is before its start
+        """
+        if end < start:
+            raise ValueError("Invalid interval ({}, {})".format(start, end))
+        # First interval ending at or after start - 1, it can be merged
+        lo = bisect_right(self._ends, start - 2)
+        # Intervals starting at or before end + 1 can be merged
+        hi = bisect_right(self._starts, end + 1)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def __contains__(self, value: int) -> bool:
+        idx = bisect_right(self._starts, value) - 1
+        return idx >= 0 and value <= self._ends[idx]
+
+    def __iter__(self) -> Iterator[Interval]:
+        return zip(self._starts, self._ends)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __bool__(self) -> bool:
+        return bool(self._starts)
+
+    def __repr__(self) -> str:
+        return "IntervalSet({})".format(list(self))
+
+
+class ParamIdFilter:
+    """Selects the param ids in the included ranges, and not in the
+    excluded ranges.
+
+    Args:
+        include: ranges of the param ids to keep, all the ids are kept if
+            no range is given
+        exclude: ranges of the param ids to skip
+    """
+
+    def __init__(
+        self, include: Iterable[Interval] = (), exclude: Iterable[Interval] = ()
+    ) -> None:
+        self.include = IntervalSet(include)
+        self.exclude = IntervalSet(exclude)
+
+    def __call__(self, param_id: int) -> bool:
+        if self.include and param_id not in self.include:
+            return False
+        return param_id not in self.exclude
+
+    def apply(self, param_ids: Sequence[int]) -> List[int]:
+        """Returns the selected param ids, without duplicates, in the given
+        order.
+        """
+        return [param_id for param_id in dict.fromkeys(param_ids) if self(param_id)]
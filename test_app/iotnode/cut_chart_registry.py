@@ -0,0 +1,123 @@
+"""Registry of the cutchart revisions supported by the app.
+
+Nodes running different firmware need different cutchart revisions. The
+registry holds the cutchart file for each range of node protocol
+versions, and picks the one matching the connected node. The cutcharts
+are loaded on first use, and the least recently used ones are released
+when the loaded cutcharts exceed the memory budget.
+"""
+
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from .cut_chart import CutChart
+
+
+class CutChartRegistryError(Exception):
+    """Raised to indicate no cutchart is available for a node version."""
+
+    pass
+
+
+class CutChartRegistry:
+    """Selects and loads the cutchart for the node protocol version.
+
+    Args:
+        max_resident_bytes: memory budget of the loaded cutcharts, the
+            active cutchart is kept loaded even if it exceeds the budget
+        cache_dir: directory to store the compiled cutcharts
+
+    Attributes:
+        active: cutchart selected for the connected node
+    """
+
+    DEFAULT_MAX_RESIDENT_BYTES = 4 * 1024 * 1024
+
+    def __init__(
+        self,
+        max_resident_bytes: int = DEFAULT_MAX_RESIDENT_BYTES,
+        cache_dir: Optional[str] = None,
+    ) -> None:
+        self._max_resident_bytes = max_resident_bytes
+        self._cache_dir = cache_dir
+        # (min node version, filename), sorted by version
+        self._entries: List[Tuple[int, str]] = []
+        self._resident: "OrderedDict[str, CutChart]" = OrderedDict()
+        self.active: Optional[CutChart] = None
+
+    def register(self, filename: str, min_version: int = 0) -> None:
+        """Registers a cutchart revision file.
+
+        Args:
+            filename: absolute filepath of cutchart csv
+            min_version: oldest node protocol version using the cutchart,
+                the cutchart is used till the next registered version
+
+        Raises:
+            ValueError: if a cutchart is already registered for the version
+        """
+        versions = [version for version, _ in self._entries]
+        if min_version in versions:
+            raise ValueError("Duplicate cutchart for version {}".format(min_version))
+        self._entries.insert(bisect_right(versions, min_version), (min_version, filename))
+
+    def get_filename(self, version: int) -> str:
+        """Returns the cutchart file for the node protocol version.
+
+        Raises:
+            CutChartRegistryError: if no cutchart supports the version
+        """
+        versions = [min_version for min_version, _ in self._entries]
+        idx = bisect_right(versions, version)
+        if idx == 0:
+            raise CutChartRegistryError(
+                "No cutchart available for version {}".format(version)
+            )
+        return self._entries[idx - 1][1]
+
+    def get(self, version: int) -> CutChart:
+        """Returns the cutchart for the node protocol version, loading it
+        if required.
+
+        Raises:
+            CutChartRegistryError: if no cutchart supports the version
+        """
+        filename = self.get_filename(version)
+        cutchart = self._resident.get(filename)
+        if cutchart is None:
+            cutchart = CutChart(filename, self._cache_dir)
+            self._resident[filename] = cutchart
+        self._resident.move_to_end(filename)
+        self._evict()
+        return cutchart
+
+    def select(self, version: int) -> CutChart:
+        """Selects the cutchart for the connected node.
+
+        Returns:
+            Active cutchart
+
+        Raises:
+            CutChartRegistryError: if no cutchart supports the version
+        """
+        self.active = self.get(version)
+        return self.active
+
+    def resident_bytes(self) -> int:
+        """Returns the memory used by the loaded cutcharts, in bytes."""
+        return sum(cutchart.resident_size() for cutchart in self._resident.values())
+
+    def resident_filenames(self) -> List[str]:
+        """Returns the loaded cutchart files, least recently used first."""
+        return list(self._resident)
+
+    def _evict(self) -> None:
+        for filename in list(self._resident):
+            if self.resident_bytes() <= self._max_resident_bytes:
+                return
+            cutchart = self._resident[filename]
+            if cutchart is self.active or filename == next(reversed(self._resident)):
+                continue
+            del self._resident[filename]
+            cutchart.close()
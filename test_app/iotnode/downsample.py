@@ -0,0 +1,112 @@
+"""Downsampling of the process value trends.
+
+A shift of samples is too many points to send to the web view and to draw
+on a tablet. The trends are reduced to a few hundred points keeping their
+shape, either with the largest triangle three buckets algorithm, keeping
+in each bucket the point making the largest triangle with its neighbours,
+or with the min and max of each bucket, keeping all the peaks.
+"""
+
+from typing import List, Sequence, Tuple
+
+LTTB = "lttb"
+MIN_MAX = "minmax"
+METHODS = (LTTB, MIN_MAX)
+
+
+def lttb(
+    timestamps: Sequence[float], values: Sequence[float], threshold: int
+) -> Tuple[List[float], List[float]]:
+    """Downsamples the series with the largest triangle three buckets
+    algorithm.
+
+    Args:
+        timestamps: sorted timestamps of the series
+        values: values of the series
+        threshold: largest number of points returned
+
+    Returns:
+        timestamps and values of the points kept, the first and last points
+        always being kept
+    """
+    size = len(values)
+    if threshold >= size:
+        return list(timestamps), list(values)
+    if threshold <= 2:
+        kept = [0, size - 1][:max(threshold, 0)]
+        return [timestamps[i] for i in kept], [values[i] for i in kept]
+
+    # Inner points per bucket, the first and last points are buckets alone
+    every = (size - 2) / (threshold - 2)
+    kept = [0]
+    prev = 0
+    for bucket in range(threshold - 2):
+        # Average point of the next bucket
+        next_start = int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, size)
+        count = next_end - next_start
+        avg_x = sum(timestamps[next_start:next_end]) / count
+        avg_y = sum(values[next_start:next_end]) / count
+
+        prev_x = timestamps[prev]
+        prev_y = values[prev]
+        max_area = -1.0
+        for idx in range(int(bucket * every) + 1, next_start):
+            # Twice the area of the triangle, the factor does not matter
+            area = abs(
+                (prev_x - avg_x) * (values[idx] - prev_y)
+                - (prev_x - timestamps[idx]) * (avg_y - prev_y)
+            )
+            if area > max_area:
+                max_area = area
+                selected = idx
+        kept.append(selected)
+        prev = selected
+    kept.append(size - 1)
+
+    return [timestamps[i] for i in kept], [values[i] for i in kept]
+
+
+def min_max(
+    timestamps: Sequence[float], values: Sequence[float], threshold: int
+) -> Tuple[List[float], List[float]]:
+    """Downsamples the series to the min and max points of buckets.
+
+    Args:
+        timestamps: sorted timestamps of the series
+        values: values of the series
+        threshold: largest number of points returned
+
+    Returns:
+        timestamps and values of the points kept, in time order
+    """
+    size = len(values)
+    if threshold >= size:
+        return list(timestamps), list(values)
+
+    buckets = threshold // 2
+    kept = []
+    for bucket in range(buckets):
+        start = bucket * size // buckets
+        end = (bucket + 1) * size // buckets
+        bucket_values = values[start:end]
+        low = start + min(range(end - start), key=bucket_values.__getitem__)
+        high = start + max(range(end - start), key=bucket_values.__getitem__)
+        kept.extend(sorted({low, high}))
+
+    return [timestamps[i] for i in kept], [values[i] for i in kept]
+
+
+def downsample(
+    timestamps: Sequence[float], values: Sequence[float], threshold: int, method: str = LTTB
+) -> Tuple[List[float], List[float]]:
+    """Downsamples the series with the method, lttb or minmax.
+
+    Raises:
+        ValueError: if the method is unknown
+    """
+    if method == LTTB:
+        return lttb(timestamps, values, threshold)
+    if method == MIN_MAX:
+        return min_max(timestamps, values, threshold)
+    raise ValueError("Unknown downsampling method: {}".format(method))
@@ -0,0 +1,162 @@
+"""
+Local stand-in of the IoT Node JSON-RPC websocket server.
+
+Serves the requests of the IotNodeInterface from memory, so the client can
+be run and tested without a machine. With ``push`` enabled, the node also
+accepts the ``subscribe`` and ``unsubscribe`` requests, and notifies the
+subscribed keys of the read data when their values change, and the full
+set of them on every heartbeat. Without it, it behaves as a node firmware without
+subscriptions.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+from aiohttp import WSMsgType, web
+
+
+class FakeNode:
+    """In-memory IoT Node served over JSON-RPC websockets.
+
+    Args:
+        read_data: read data values of the node
+        version: websocket protocol version of the node
+        push: supports the ``subscribe`` and ``unsubscribe`` requests
+        host: address to listen on
+        port: port to listen on, any free port if 0
+    """
+
+    def __init__(
+        self,
+        read_data: Dict[str, Any],
+        version: int = 1,
+        push: bool = True,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.read_data = dict(read_data)
+        self.version = version
+        self.push = push
+        self.host = host
+        self.port = port
+        self.params: Dict[int, int] = {}
+        # Number of received requests, by method
+        self.requests: Dict[str, int] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._subscriptions: List["_Subscription"] = []
+        self._sockets: List[web.WebSocketResponse] = []
+
+    @property
+    def url(self) -> str:
+        return "ws://{}:{}".format(self.host, self.port)
+
+    async def start(self) -> None:
+        """Starts listening, the port is set if any free port was asked."""
+        app = web.Application()
+        app.router.add_get("/", self._handle_ws)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        """Closes the client connections and stops listening."""
+        for subscription in list(self._subscriptions):
+            subscription.cancel()
+        for ws in list(self._sockets):
+            await ws.close()
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def update(self, values: Dict[str, Any]) -> None:
+        """Changes read data values, and notifies the subscribers of the
+        changed ones.
+        """
+        changed = {
+            key: value
+            for key, value in values.items()
+            if self.read_data.get(key) != value
+        }
+        self.read_data.update(values)
+        for subscription in list(self._subscriptions):
+            await subscription.notify(changed)
+
+    async def _handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._sockets.append(ws)
+        subscription = None
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                message = json.loads(msg.data)
+                method = message.get("method")
+                params = message.get("params") or {}
+                self.requests[method] = self.requests.get(method, 0) + 1
+
+                if method == "subscribe" and self.push:
+                    if subscription:
+                        subscription.cancel()
+                    subscription = _Subscription(self, ws, **params)
+                    self._subscriptions.append(subscription)
+                    response = {"result": True}
+                elif method == "unsubscribe" and self.push:
+                    if subscription:
+                        subscription.cancel()
+                        subscription = None
+                    response = {"result": True}
+                else:
+                    response = self._dispatch(method, params)
+                response.update(jsonrpc="2.0", id=message.get("id"))
+                await ws.send_str(json.dumps(response))
+        finally:
+            self._sockets.remove(ws)
+            if subscription:
+                subscription.cancel()
+        return ws
+
+    def _dispatch(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if method == "ping":
+            return {"result": "pong"}
+        if method == "get_version":
+            return {"result": self.version}
+        if method == "read_data":
+            return {"result": self.read_data}
+        if method == "set_params":
+            self.params.update((pid, value) for pid, value in params["pv_list"])
+            return {"result": True}
+        if method == "get_params":
+            return {"result": [[pid, self.params.get(pid, 0)] for pid in params["pid"]]}
+        return {"error": {"code": -32601, "message": "Method not found"}}
+
+
+class _Subscription:
+    """Keys of the read data subscribed by a connected client."""
+
+    def __init__(self, node: FakeNode, ws: web.WebSocketResponse, keys, heartbeat):
+        self._node = node
+        self._ws = ws
+        self._keys = set(keys)
+        self._heartbeat_task = asyncio.ensure_future(self._send_heartbeats(heartbeat))
+
+    async def notify(self, values: Dict[str, Any]) -> None:
+        values = {key: value for key, value in values.items() if key in self._keys}
+        if not values or self._ws.closed:
+            return
+        message = {"jsonrpc": "2.0", "method": "notify_data", "params": {"values": values}}
+        await self._ws.send_str(json.dumps(message))
+
+    async def _send_heartbeats(self, period: float) -> None:
+        while not self._ws.closed:
+            await asyncio.sleep(period)
+            await self.notify(self._node.read_data)
+
+    def cancel(self) -> None:
+        self._heartbeat_task.cancel()
+        if self in self._node._subscriptions:
+            self._node._subscriptions.remove(self)
+
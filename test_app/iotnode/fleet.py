@@ -0,0 +1,193 @@
+"""
+Client polling the read data of every configured machine at once.
+
+The IotNodeInterface talks to the current machine only. The fleet client
+keeps one websocket per machine of the configuration, all of them on a
+single aiohttp session, and polls them concurrently as tasks of one event
+loop. Each read data sample is passed to the callbacks tagged with the
+name of its machine.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import aiohttp
+import jsonschema
+from jsonrpc_base import ProtocolError, TransportError
+from jsonrpc_websocket import Server
+
+from .rpc import IotNodeInterface
+
+
+class _FleetNode:
+    """Websocket connection and polling task of a machine."""
+
+    def __init__(self, name: str, url: str, client: Server) -> None:
+        self.name = name
+        self.url = url
+        self.client = client
+        self.task: Optional[asyncio.Future] = None
+
+
+class FleetClient:
+    """Polls the read data of all the machines of the configuration.
+
+    Args:
+        config: configuration holding the machines and the poll period
+    """
+
+    CONN_TIMEOUT = IotNodeInterface.CONN_TIMEOUT
+    RESP_TIMEOUT = IotNodeInterface.RESP_TIMEOUT
+    # Connection retry period of a node, in seconds
+    RETRY_PERIOD = 5
+    # Connections open at once, in total and per node
+    CONN_LIMIT = 100
+    CONN_LIMIT_PER_HOST = 2
+
+    def __init__(self, config) -> None:
+        self._config = config
+        self._callbacks: List[Callable[[str, dict, float], None]] = []
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._nodes: Dict[str, _FleetNode] = {}
+
+    def register_callback(self, cb: Callable[[str, dict, float], None]) -> None:
+        """Registers callbacks which will be triggered on response.
+
+        Args:
+          cb: callback function, receiving the machine name, the read data
+            and its timestamp
+        """
+        self._callbacks.append(cb)
+
+    def machines(self) -> List[str]:
+        """Returns the names of the polled machines."""
+        return list(self._nodes)
+
+    def is_connected(self, name: str) -> bool:
+        node = self._nodes.get(name)
+        return bool(node and node.client.connected)
+
+    def start(self) -> None:
+        """Run the sync as a task."""
+        asyncio.ensure_future(self.sync())
+
+    async def sync(self) -> None:
+        """Polls the machines of the configuration.
+
+        Polling is started for the new machines, and stopped for the
+        removed ones. Machines with a changed address are reconnected.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.CONN_LIMIT, limit_per_host=self.CONN_LIMIT_PER_HOST
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=self.CONN_TIMEOUT
+            )
+
+        urls = {
+            machine["name"]: "ws://{}:{}".format(machine["ip"], machine["port"])
+            for machine in self._config.machines.get_machines()
+        }
+        for name, node in list(self._nodes.items()):
+            if urls.get(name) != node.url:
+                await self._stop_node(name)
+
+        new_names = [name for name in urls if name not in self._nodes]
+        poll_period = self._config.get_poll_period()
+        for idx, name in enumerate(new_names):
+            client = Server(urls[name], session=self._session, timeout=self.RESP_TIMEOUT)
+            node = _FleetNode(name, urls[name], client)
+            # Spread the polls of the nodes over the poll period
+            delay = poll_period * idx / len(new_names)
+            node.task = asyncio.ensure_future(self._poll(node, delay))
+            self._nodes[name] = node
+
+    async def _stop_node(self, name: str) -> None:
+        node = self._nodes.pop(name)
+        node.task.cancel()
+        await asyncio.gather(node.task, return_exceptions=True)
+        await node.client.close()
+
+    async def close(self) -> None:
+        """Stops polling, and closes the connections."""
+        for name in list(self._nodes):
+            await self._stop_node(name)
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def _connect(self, node: _FleetNode) -> bool:
+        try:
+            await node.client.ws_connect()
+        except (ProtocolError, TransportError, ConnectionError):
+            return False
+        return node.client.connected
+
+    async def _poll(self, node: _FleetNode, delay: float) -> None:
+        await asyncio.sleep(delay)
+        while True:
+            if not node.client.connected and not await self._connect(node):
+                await asyncio.sleep(self.RETRY_PERIOD)
+                continue
+
+            await asyncio.sleep(self._config.get_poll_period())
+            try:
+                data = await node.client.read_data()
+            except (ProtocolError, TransportError, ConnectionError) as exc:
+                try:
+                    print("{}: {}".format(node.name, exc))
+                except ModuleNotFoundError as e:
+                    pass
+                await node.client.close()
+                continue
+
+            self._process_read_data(node.name, data)
+
+    def _process_read_data(self, name: str, data: Any) -> None:
+        try:
+            IotNodeInterface.READ_DATA_VALIDATOR.validate(data)
+        except jsonschema.exceptions.ValidationError as exc:
+            err_path = "/".join(str(i) for i in exc.absolute_path)
+            err = "{}: Read data validation failed at /{}".format(name, err_path)
+            try:
+                print(err)
+            except ModuleNotFoundError as err:
+                pass
+        else:
+            timestamp = time.time()
+            for cb in self._callbacks:
+                cb(name, data, timestamp)
+
+
+class PerMachine:
+    """Holds an object per machine, fed with the samples of its machine.
+
+    Registered as a fleet client callback, it calls the given method of the
+    machine object with the read data and its timestamp, e.g. one
+    ProcessValueFormatter per machine, sharing their converter caches, with
+    ``PerMachine(lambda: ProcessValueFormatter(caches), "process_data")``.
+
+    Args:
+        factory: creates the object of a machine
+        method: name of the method receiving the read data
+    """
+
+    def __init__(self, factory: Callable[[], Any], method: str) -> None:
+        self._factory = factory
+        self._method = method
+        self._objects: Dict[str, Any] = {}
+
+    def get(self, name: str) -> Any:
+        """Returns the object of the machine, created on first use."""
+        obj = self._objects.get(name)
+        if obj is None:
+            obj = self._objects[name] = self._factory()
+        return obj
+
+    def names(self) -> List[str]:
+        return list(self._objects)
+
+    def __call__(self, name: str, data: dict, timestamp: float) -> None:
+        getattr(self.get(name), self._method)(data, timestamp)
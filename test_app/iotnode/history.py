@@ -0,0 +1,206 @@
+"""History of the numeric process values, for the trends.
+
+The read data samples are appended to a ring of typed arrays, one per
+numeric read data key plus one of the timestamps, preallocated to the
+history capacity. A sample costs 4 bytes per key and 8 bytes for its
+timestamp, so 8 hours of 2 Hz samples of the 13 keys take 3.5 MB, and
+appending overwrites the oldest sample once the history is full. The
+timestamps being sorted, the time windows are found by bisection.
+"""
+
+import math
+import time
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .downsample import LTTB, downsample
+
+# Value of the keys missing from a sample
+_NAN = float("nan")
+
+
+class ProcessHistory:
+    """Ring buffer of the numeric read data values.
+
+    Registered as an IotNodeInterface callback, it receives the read data
+    and its timestamp.
+
+    Args:
+        capacity: number of samples kept
+        keys: read data keys kept
+        clock: wall clock, in seconds, of the read data timestamps
+    """
+
+    # Numeric read data keys: arc voltage, current, pressures, flows,
+    # timers and hours
+    # fmt: off
+    KEYS = (
+        "av", "cur", "app", "asgp", "ashf", "cmip", "pip", "sip", "sihp",
+        "fv", "ptr", "ah", "hl",
+    )
+    # fmt: on
+
+    # 8 hours of samples at 2 Hz
+    DEFAULT_CAPACITY = 8 * 3600 * 2
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        keys: Iterable[str] = KEYS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("History capacity must be positive: {}".format(capacity))
+        self._capacity = capacity
+        self._clock = clock
+        self._timestamps = array("d", [0.0]) * capacity
+        self._values: Dict[str, array] = {
+            key: array("f", [_NAN]) * capacity for key in keys
+        }
+        self.clear()
+
+    def clear(self) -> None:
+        """Drops all the samples."""
+        # Position of the next sample, and number of samples
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def keys(self) -> Tuple[str, ...]:
+        return tuple(self._values)
+
+    def append(self, data: dict, timestamp: float) -> None:
+        """Appends the numeric values of the read data sample.
+
+        Args:
+            data: read data
+            timestamp: timestamp of the read data, in seconds
+        """
+        pos = self._next
+        if self._size:
+            # Kept sorted if the wall clock goes back
+            timestamp = max(timestamp, self._timestamps[pos - 1])
+        self._timestamps[pos] = timestamp
+        for key, values in self._values.items():
+            value = data.get(key)
+            values[pos] = _NAN if value is None else value
+
+        self._next = (pos + 1) % self._capacity
+        if self._size < self._capacity:
+            self._size += 1
+
+    def _start(self) -> int:
+        return (self._next - self._size) % self._capacity
+
+    def _bisect(self, timestamp: float, right: bool) -> int:
+        """Returns the position, from the oldest sample, of the first sample
+        after the timestamp, or at the timestamp if not right.
+        """
+        timestamps = self._timestamps
+        start = self._start()
+        capacity = self._capacity
+        low, high = 0, self._size
+        while low < high:
+            mid = (low + high) // 2
+            mid_timestamp = timestamps[(start + mid) % capacity]
+            if mid_timestamp < timestamp or (right and mid_timestamp == timestamp):
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _slice(self, buffer: array, first: int, last: int) -> array:
+        """Returns the samples of the buffer from the first to the last
+        position, from the oldest sample.
+        """
+        begin = (self._start() + first) % self._capacity
+        count = last - first
+        if begin + count <= self._capacity:
+            return buffer[begin : begin + count]
+        return buffer[begin:] + buffer[: begin + count - self._capacity]
+
+    def series(
+        self, key: str, start: Optional[float] = None, end: Optional[float] = None
+    ) -> Tuple[array, array]:
+        """Returns the timestamps and the values of the key, between the
+        start and end times.
+
+        Args:
+            key: read data key
+            start: oldest timestamp, from the oldest sample if None
+            end: latest timestamp, up to the latest sample if None
+
+        Returns:
+            arrays of the timestamps and of the values, oldest first; the
+            values missing from the samples are NaN
+
+        Raises:
+            KeyError: if the key is not kept
+        """
+        values = self._values[key]
+        first = 0 if start is None else self._bisect(start, right=False)
+        last = self._size if end is None else self._bisect(end, right=True)
+        last = max(first, last)
+        return self._slice(self._timestamps, first, last), self._slice(values, first, last)
+
+    def window(self, key: str, seconds: float) -> Tuple[array, array]:
+        """Returns the timestamps and the values of the key, over the last
+        seconds.
+
+        Raises:
+            KeyError: if the key is not kept
+        """
+        return self.series(key, start=self._clock() - seconds)
+
+    def stats(self, key: str, seconds: Optional[float] = None) -> Dict[str, float]:
+        """Returns the min, max and mean of the values of the key, over the
+        last seconds, all the history if None.
+
+        The missing values are skipped, and the stats of no value are NaN.
+
+        Raises:
+            KeyError: if the key is not kept
+        """
+        if seconds is None:
+            _, values = self.series(key)
+        else:
+            _, values = self.window(key, seconds)
+
+        total = math.fsum(values)
+        if math.isnan(total):
+            values = [value for value in values if not math.isnan(value)]
+            total = math.fsum(values)
+        if not values:
+            return {"count": 0, "min": _NAN, "max": _NAN, "mean": _NAN}
+        return {
+            "count": len(values),
+            "min": min(values),
+            "max": max(values),
+            "mean": total / len(values),
+        }
+
+    def trend(
+        self,
+        key: str,
+        max_points: int,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        method: str = LTTB,
+    ) -> Tuple[List[float], List[float]]:
+        """Returns the trend of the key between the start and end times,
+        downsampled to at most max_points.
+
+        The missing values are skipped.
+
+        Raises:
+            KeyError: if the key is not kept
+            ValueError: if the downsampling method is unknown
+        """
+        timestamps, values = self.series(key, start, end)
+        if math.isnan(math.fsum(values)):
+            present = [idx for idx, value in enumerate(values) if not math.isnan(value)]
+            timestamps = [timestamps[idx] for idx in present]
+            values = [values[idx] for idx in present]
+        return downsample(timestamps, values, max_points, method)
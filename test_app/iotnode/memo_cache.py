@@ -0,0 +1,103 @@
+"""Bounded memo caches of the process value converters.
+
+The converters are pure functions of a few read data values, which take a
+small set of values on a machine: an idle machine reports the same
+pressures and states at every poll. Their results are cached by input
+value, in a cache per converter bounded to its most recently used values.
+The caches may be shared by the formatters of several machines.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+class MemoCache:
+    """Results of a converter by input value, evicting the least recently
+    used ones.
+
+    Args:
+        maxsize: largest number of results kept
+
+    Attributes:
+        hits: number of lookups finding the result
+        misses: number of lookups not finding the result
+        evictions: number of results dropped to make room
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self._maxsize = maxsize
+        self._results: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the result of the input value, or default if not cached."""
+        try:
+            result = self._results[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._results.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: Hashable, result: Any) -> None:
+        """Caches the result of the input value."""
+        if self._maxsize <= 0:
+            return
+        self._results[key] = result
+        self._results.move_to_end(key)
+        if len(self._results) > self._maxsize:
+            self._results.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._results.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        """Returns the part of the lookups finding the result, in [0, 1]."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "size": len(self._results),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+
+class ConverterCaches:
+    """Memo caches of the converters, one per converter function.
+
+    Args:
+        maxsize: largest number of results kept per converter
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self._maxsize = maxsize
+        self._caches: Dict[Callable, MemoCache] = {}
+
+    def cache(self, converter: Callable) -> MemoCache:
+        """Returns the cache of the converter, created on first use."""
+        cache = self._caches.get(converter)
+        if cache is None:
+            cache = self._caches[converter] = MemoCache(self._maxsize)
+        return cache
+
+    def clear(self) -> None:
+        for cache in self._caches.values():
+            cache.clear()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Returns the stats of the caches, by converter name."""
+        return {
+            converter.__name__: cache.stats() for converter, cache in self._caches.items()
+        }
@@ -0,0 +1,101 @@
+"""Time limited cache of the node param values, per machine.
+
+The service screens read the same params every time they are entered,
+while most of them are configuration params, only changed by the app
+writes. Each param class has its own time to live: the configuration
+params are kept long, the live values of the node briefly. The writes
+invalidate the written params, and the cache of a machine is flushed when
+it is reconnected, as its params may have changed meanwhile.
+"""
+
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .cut_chart_ranges import IntervalSet
+
+
+class ParamCache:
+    """Param values of the machines, by param id, with a TTL per param
+    class.
+
+    Args:
+        ttls: time to live in seconds of each param class
+        ranges: param id ranges of the param classes, the ids not in any
+            range are of the default class
+        default_class: class of the other param ids
+        clock: monotonic clock, in seconds
+
+    Attributes:
+        hits: number of param reads served by the cache
+        misses: number of param reads not in the cache, or expired
+    """
+
+    def __init__(
+        self,
+        ttls: Dict[str, float],
+        ranges: Dict[str, Iterable[Tuple[int, int]]],
+        default_class: str,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttls = ttls
+        self._ranges = [(IntervalSet(r), param_class) for param_class, r in ranges.items()]
+        self._default_class = default_class
+        self._clock = clock
+        # Value and expiry time of the params, by machine
+        self._machines: Dict[str, Dict[int, Tuple[int, float]]] = {}
+        self._machine: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+    def param_class(self, param_id: int) -> str:
+        for interval_set, param_class in self._ranges:
+            if param_id in interval_set:
+                return param_class
+        return self._default_class
+
+    def select_machine(self, machine: str) -> None:
+        """Uses the cache of the machine."""
+        self._machine = machine
+
+    def _entries(self) -> Dict[int, Tuple[int, float]]:
+        return self._machines.setdefault(self._machine, {})
+
+    def get(self, param_ids: Sequence[int]) -> Tuple[Dict[int, int], List[int]]:
+        """Returns the cached values of the params, and the param ids not
+        cached or expired.
+        """
+        entries = self._entries()
+        now = self._clock()
+        values = {}
+        missing = []
+        for param_id in param_ids:
+            entry = entries.get(param_id)
+            if entry is not None and entry[1] > now:
+                values[param_id] = entry[0]
+            else:
+                missing.append(param_id)
+        self.hits += len(values)
+        self.misses += len(missing)
+        return values, missing
+
+    def put(self, pv_list: Iterable[Sequence[int]]) -> None:
+        """Caches the (param id, value) pairs read from the node."""
+        entries = self._entries()
+        now = self._clock()
+        for param_id, value in pv_list:
+            ttl = self._ttls[self.param_class(param_id)]
+            if ttl > 0:
+                entries[param_id] = (value, now + ttl)
+
+    def invalidate(self, param_ids: Iterable[int]) -> None:
+        """Drops the params written to the node."""
+        entries = self._entries()
+        for param_id in param_ids:
+            entries.pop(param_id, None)
+
+    def flush(self) -> None:
+        """Drops the params of the machine."""
+        self._machines.pop(self._machine, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,127 @@
+"""Coalesces the concurrent reads of the node params.
+
+The screens and the cutchart transfers may read the same params at the
+same time. A read of params already being read waits for the request in
+flight, instead of sending another one. Small reads are also held for a
+short window, and sent together in chunked requests.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Sequence
+
+# Value of the params missing from the node reply
+_MISSING = object()
+
+
+class ParamReadCoalescer:
+    """Merges the concurrent reads of the same params into one request.
+
+    Args:
+        send: sends a get params request for the param ids, returning the
+            (param id, value) pairs
+        window: time the batched reads are held for, in seconds
+        get_chunk_size: returns the largest number of param ids per request
+
+    Attributes:
+        requests: number of requests sent
+        coalesced: number of param reads served by another read's request
+    """
+
+    def __init__(
+        self,
+        send: Callable[[List[int]], Awaitable[list]],
+        window: float = 0.005,
+        get_chunk_size: Callable[[], int] = lambda: 30,
+    ) -> None:
+        self._send = send
+        self._window = window
+        self._get_chunk_size = get_chunk_size
+        # Value futures of the params being read, and of the batched ones
+        self._in_flight: Dict[int, asyncio.Future] = {}
+        self._batch: Dict[int, asyncio.Future] = {}
+        self._flush_handle = None
+        self.requests = 0
+        self.coalesced = 0
+
+    async def read(self, param_ids: Sequence[int], batch: bool = True) -> List[list]:
+        """Reads the param values, sharing the requests of the concurrent
+        reads.
+
+        Args:
+            param_ids: param ids to read
+            batch: hold the read for the batching window, else the params
+                not already being read are requested at once
+
+        Returns:
+            (param id, value) pairs of the params returned by the node, in
+            the order of param_ids
+
+        Raises:
+            ProtocolError, TransportError: if the request reading any of the
+                params fails
+        """
+        loop = asyncio.get_event_loop()
+        futures: Dict[int, asyncio.Future] = {}
+        new_ids = []
+        for param_id in dict.fromkeys(param_ids):
+            future = self._in_flight.get(param_id) or self._batch.get(param_id)
+            if future is None:
+                future = loop.create_future()
+                new_ids.append(param_id)
+            else:
+                self.coalesced += 1
+            futures[param_id] = future
+
+        if new_ids and batch:
+            self._batch.update((param_id, futures[param_id]) for param_id in new_ids)
+            if self._flush_handle is None:
+                self._flush_handle = loop.call_later(self._window, self._flush)
+        elif new_ids:
+            self._start_request(new_ids, futures)
+
+        pairs = []
+        for param_id in param_ids:
+            # Shielded, cancelling a read does not fail the others' reads
+            value = await asyncio.shield(futures[param_id])
+            if value is not _MISSING:
+                pairs.append([param_id, value])
+        return pairs
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        batch, self._batch = self._batch, {}
+        param_ids = list(batch)
+        size = max(1, self._get_chunk_size())
+        for pos in range(0, len(param_ids), size):
+            self._start_request(param_ids[pos : pos + size], batch)
+
+    def _start_request(
+        self, param_ids: List[int], futures: Dict[int, asyncio.Future]
+    ) -> None:
+        chunk_futures = [futures[param_id] for param_id in param_ids]
+        self._in_flight.update(zip(param_ids, chunk_futures))
+        asyncio.ensure_future(self._request(param_ids, chunk_futures))
+
+    async def _request(self, param_ids: List[int], futures: List[asyncio.Future]):
+        self.requests += 1
+        try:
+            reply = await self._send(param_ids)
+            values = dict(reply or ())
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+        except Exception as exc:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exc)
+                    # The error is raised to the waiting reads, if any
+                    future.exception()
+        else:
+            for param_id, future in zip(param_ids, futures):
+                if not future.done():
+                    future.set_result(values.get(param_id, _MISSING))
+        finally:
+            for param_id, future in zip(param_ids, futures):
+                if self._in_flight.get(param_id) is future:
+                    del self._in_flight[param_id]
@@ -0,0 +1,98 @@
+"""Drift-free scheduling of the read data polls.
+
+Sleeping for the poll period between the requests makes the actual period
+the poll period plus the request round trip, drifting further at every
+poll. The scheduler wakes up on absolute deadlines, one poll period apart,
+whatever the time the requests took. A request overrunning the next
+deadline makes it skipped, rather than polled late and bunched with the
+following one, so the samples stay on an even grid.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+
+class PollScheduler:
+    """Waits for the poll deadlines, and measures the sample timing.
+
+    Args:
+        get_period: returns the poll period, in seconds
+        clock: monotonic clock, in seconds
+        sleep: sleeps for the given seconds
+
+    Attributes:
+        samples: number of deadlines waited for
+        overruns: number of deadlines skipped, as the previous poll was
+            still running
+        interval: time between the last two deadlines waited for, in
+            seconds
+        lateness: time the last wake up was after its deadline, in seconds
+        max_lateness: largest lateness, in seconds
+        overrun_rate: moving average of the part of the deadlines skipped,
+            in [0, 1]
+    """
+
+    # Weight of the last deadline in the overrun rate
+    RATE_WEIGHT = 0.1
+
+    def __init__(
+        self,
+        get_period: Callable[[], float],
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self._get_period = get_period
+        self._clock = clock
+        self._sleep = sleep
+        self.reset()
+
+    def reset(self) -> None:
+        """Starts a new schedule, from the next wait."""
+        self._deadline: Optional[float] = None
+        self._last_wakeup: Optional[float] = None
+        self.samples = 0
+        self.overruns = 0
+        self.interval = 0.0
+        self.lateness = 0.0
+        self.max_lateness = 0.0
+        self.overrun_rate = 0.0
+
+    async def wait(self) -> None:
+        """Sleeps until the next deadline not yet passed."""
+        period = self._get_period()
+        now = self._clock()
+        if self._deadline is None:
+            self._deadline = now + period
+        else:
+            self._deadline += period
+
+        missed = 0
+        if now > self._deadline and period > 0:
+            missed = int((now - self._deadline) // period) + 1
+            self._deadline += missed * period
+        self.overruns += missed
+        # Averages 1 for each skipped deadline, and 0 for the one polled
+        keep = 1 - self.RATE_WEIGHT
+        self.overrun_rate = (1 - (1 - self.overrun_rate) * keep ** missed) * keep
+
+        await self._sleep(max(0.0, self._deadline - now))
+
+        wakeup = self._clock()
+        self.lateness = max(0.0, wakeup - self._deadline)
+        self.max_lateness = max(self.max_lateness, self.lateness)
+        if self._last_wakeup is not None:
+            self.interval = wakeup - self._last_wakeup
+        self._last_wakeup = wakeup
+        self.samples += 1
+
+    def metrics(self) -> Dict[str, float]:
+        """Returns the sample timing metrics."""
+        return {
+            "samples": self.samples,
+            "overruns": self.overruns,
+            "interval": self.interval,
+            "lateness": self.lateness,
+            "max_lateness": self.max_lateness,
+            "overrun_rate": self.overrun_rate,
+        }
@@ -1,5 +1,10 @@
 """API to format the process values for the UI display."""
+from collections.abc import Mapping
+from operator import itemgetter
+from typing import Iterable, Optional
+
 from iotnode.faults import FCCM, FDMC, FDPC
+from iotnode.memo_cache import ConverterCaches
 
 
 GAS = {
@@ -86,187 +91,292 @@ ENUM_MAP = {
 }
 
 
-class ProcessValueFormatter:
-    """Process value formatter for displaying on the UI.
+# Valve status keys, from bit 0
+VS_KEYS = ("phe", "ple", "pe", "sge", "she", "ve", "cse", "mse")
+
+_ENABLED_BIT = ("Enabled", "Disabled")
+
+# Device switch settings fields: key, bit shift, bit mask and values
+DSS_FIELDS = (
+    ("pft", 0, 0b11, ("8 Sec", "6 Sec", "4 Sec", "2 Sec")),  # bit0 & bit1
+    ("pf", 2, 0b11, ("0 Sec", "5 Sec", "20 Sec", "10 Sec")),  # bit2 & bit3
+    ("apf", 8, 0b1, _ENABLED_BIT),  # bit8
+    (
+        "apt",
+        9,
+        0b111,
+        ("2.0 Sec", "1.5 Sec", "1.0 Sec", "0.8 Sec", "0.4 Sec", "0.2 Sec", "0.1 Sec", "0.0 Sec"),
+    ),  # bit9-11
+    ("pt", 12, 0b1, ("3 s", "85 ms")),  # bit12, long - 3s, short-85ms
+    ("radc", 13, 0b1, _ENABLED_BIT),  # bit13
+    ("tr", 14, 0b1, ("Disabled", "Enabled")),  # bit14
+    ("rcmmc", 15, 0b1, _ENABLED_BIT),  # bit15
+)
+
+PSI_BAR_CONST = 0.068947
+GPH_LPM_CONST = 0.0630902
+INCH_METER_CONST = 0.0254
+INCH_FT_CONST = 1 / 12
+
+# Value never equal to another one
+_MISSING = object()
+
+# Process values shown by each screen, the screens not listed show all
+SCREEN_KEYS = {
+    "home_screen": ("fccm",),
+    "service_menu_screen": ("fccm",),
+    # fmt: off
+    "cutting_screen": (
+        "pid", "ptr", "av", "app", "asgp", "ashf", "cmip", "pg", "sf", "cur",
+        "kw", "pip", "sip", "sihp",
+    ),
+    "service_screen": (
+        "ds", "dccm", "fccm", "ddmc", "fdmc", "ddpc", "fdpc", "pf", "sgf",
+        "ah", "dss", "fr_ccm", "fr_dmc", "fr_dpc", "ecc", "hl", "pm", "ps",
+        "pe", "pref", "po", "otm", "mms", "vs",
+    ),
+    # fmt: on
+}
 
-    Attributes:
-        data (dict): the formatted process values
-    """
 
-    def __init__(self) -> None:
-        self._process_value_map = {
-            "pid": self._no_conv,
-            "otm": self._no_conv,
-            "po": self._no_conv,
-            "ecc": self._no_conv,
-            "ps": self._no_conv,
-            "pe": self._no_conv,
-            "mms": self._no_conv,
-            "pref": self._no_conv,
-            "dccm": self._enum_conv,
-            "ddmc": self._enum_conv,
-            "ddpc": self._enum_conv,
-            "ds": self._enum_conv,
-            "fccm": self._enum_conv,
-            "fdmc": self._enum_conv,
-            "fdpc": self._enum_conv,
-            "lccm": self._enum_conv,
-            "ldmc": self._enum_conv,
-            "ldpc": self._enum_conv,
-            "av": self._volt_conv,
-            "ptr": self._sec_conv,
-            "vs": self._valve_bitmask_conv,
-            "app": self._psi_to_bar_conv,
-            "asgp": self._psi_to_bar_conv,
-            "ashf": self._gph_to_lpm_conv,
-            "cmip": self._psi_to_bar_conv,
-            "pip": self._psi_to_bar_conv,
-            "sip": self._psi_to_bar_conv,
-            "sihp": self._psi_to_bar_conv,
-            "fv": self._no_conv,
-            "dss": self._dss_bitmask_conv,
-            "pm": self._enum_conv,
-            "hl": self._inch_to_meter_conv,
-            "ah": self._hr_conv,
-            "pf": self._get_gas_flow,
-            "sgf": self._get_gas_flow,
-            "fr_ccm": self._firmware_revision,
-            "fr_dmc": self._firmware_revision,
-            "fr_dpc": self._firmware_revision,
-            "pg": self._enum_conv,
-            "sf": self._enum_conv,
-            "kw": self._get_kw_output,
-            "cur": self._format_current,
-        }
-        self.data = self._get_default_data()
+# The formatters below take the read data value of a process value, or the
+# tuple of its DERIVED_INPUTS values, and return the formatted value, or
+# None to display the default one.
 
-    @staticmethod
-    def _no_conv(ps, data):
-        if ps not in data:
-            return {}
 
-        val = data[ps]
-        return {ps: str(val)}
+def _no_conv(val):
+    return str(val)
 
-    @staticmethod
-    def _volt_conv(ps, data):
-        if ps not in data:
-            return {}
 
-        val = data[ps]
-        res = "{} Volts".format(val)
-        return {ps: res}
+def _volt_conv(val):
+    return "{} Volts".format(val)
 
-    @staticmethod
-    def _sec_conv(ps, data):
-        if ps not in data:
-            return {}
 
-        val = data[ps]
-        res = "{} Sec".format(val)
-        return {ps: res}
+def _sec_conv(val):
+    return "{} Sec".format(val)
 
-    @staticmethod
-    def _hr_conv(ps, data):
-        if ps not in data:
-            return {}
 
-        val = data[ps]
-        res = "{} hr".format(val)
-        return {ps: res}
+def _hr_conv(val):
+    return "{} hr".format(val)
 
-    @staticmethod
-    def _enum_conv(ps, data):
-        if ps not in data:
-            return {}
 
-        val = data[ps]
+def _format_current(val):
+    return "{} A".format(val)
+
+
+def _enum_conv(key):
+    enum_map = ENUM_MAP[key]
+
+    def conv(val):
         if isinstance(val, list):
             val = tuple(val)
-        res = ENUM_MAP[ps].get(val)
-        if res is not None:
-            return {ps: res}
-        return {}
+        return enum_map.get(val)
 
-    @staticmethod
-    def _valve_bitmask_conv(ps, data):
-        if ps not in data:
-            return {}
+    conv.__name__ = "_enum_conv_{}".format(key)
+    return conv
 
-        val = data[ps]
-        vs_keys = ("phe", "ple", "pe", "sge", "she", "ve", "cse", "mse")
-        vs_data = {}
-        for i, key in enumerate(vs_keys):
-            vs_data[key] = (val >> i) & 0x01
-        return {ps: vs_data}
 
-    @staticmethod
-    def _dss_bitmask_conv(ps, data):
-        if ps not in data:
-            return {}
-
-        val = data[ps]
-        dss_data = {}
-        pft_map = {0: "8 Sec", 1: "6 Sec", 2: "4 Sec", 3: "2 Sec"}
-        pf_map = {0: "0 Sec", 1: "5 Sec", 2: "20 Sec", 3: "10 Sec"}
-        apf_map = radc_map = rcmmc_map = {0: "Enabled", 1: "Disabled"}
-        tr_map = {0: "Disabled", 1: "Enabled"}
-        pt_map = {0: "3 s", 1: "85 ms"}  # long - 3s, short-85ms
-        apt_map = {
-            0: "2.0 Sec",
-            1: "1.5 Sec",
-            2: "1.0 Sec",
-            3: "0.8 Sec",
-            4: "0.4 Sec",
-            5: "0.2 Sec",
-            6: "0.1 Sec",
-            7: "0.0 Sec",
-        }
+def _valve_bitmask_conv(val):
+    return {key: (val >> i) & 0x01 for i, key in enumerate(VS_KEYS)}
 
-        dss_data["pft"] = pft_map[val & 0b11]  # bit0 & bit1
-        dss_data["pf"] = pf_map[(val >> 2) & 0b11]  # bit2 & bit3
-        dss_data["apf"] = apf_map[(val >> 8) & 0b1]  # bit8
-        dss_data["apt"] = apt_map[(val >> 9) & 0b111]  # bit9-11
-        dss_data["pt"] = pt_map[(val >> 12) & 0b1]  # bit12
-        dss_data["radc"] = radc_map[(val >> 13) & 0b1]  # bit13
-        dss_data["tr"] = tr_map[(val >> 14) & 0b1]  # bit14
-        dss_data["rcmmc"] = rcmmc_map[(val >> 15) & 0b1]  # bit15
-        return {ps: dss_data}
 
-    @staticmethod
-    def _psi_to_bar_conv(ps, data):
-        if ps not in data:
-            return {}
+def _dss_bitmask_conv(val):
+    return {key: values[(val >> shift) & mask] for key, shift, mask, values in DSS_FIELDS}
 
-        psi = data[ps]
-        psi_bar_const = 0.068947
-        psi /= 10
-        res_str = "{} PSI\n({:.1f} BAR)".format(psi, psi * psi_bar_const)
-        return {ps: res_str}
 
-    @staticmethod
-    def _gph_to_lpm_conv(ps, data):
-        if ps not in data:
-            return {}
+def _psi_to_bar_conv(psi):
+    psi /= 10
+    return "{} PSI\n({:.1f} BAR)".format(psi, psi * PSI_BAR_CONST)
 
-        gph = data[ps]
-        gph_lpm_const = 0.0630902
-        gph /= 10
-        res_str = "{} GPH\n({:.1f} LPM)".format(gph, gph * gph_lpm_const)
-        return {ps: res_str}
 
-    @staticmethod
-    def _inch_to_meter_conv(ps, data):
-        if ps not in data:
-            return {}
-
-        inch = data[ps]
-        inch_meter_const = 0.0254
-        inch_ft_const = 1 / 12
-        ft = inch * inch_ft_const
-        meter = inch * inch_meter_const
-        res_str = "{:.0f} ft\n({:.0f} m)".format(ft, meter)
-        return {ps: res_str}
+def _gph_to_lpm_conv(gph):
+    gph /= 10
+    return "{} GPH\n({:.1f} LPM)".format(gph, gph * GPH_LPM_CONST)
+
+
+def _inch_to_meter_conv(inch):
+    return "{:.0f} ft\n({:.0f} m)".format(inch * INCH_FT_CONST, inch * INCH_METER_CONST)
+
+
+def _firmware_revision(fr_values):
+    return "{}.{}.{}".format(*fr_values)
+
+
+def _gas_flow(ps):
+    flow_ord = {"pf": 0, "sgf": 1}[ps]
+
+    def get_gas_flow(cur_pg_sf):
+        try:
+            flow_value = GAS[cur_pg_sf]
+        except KeyError:
+            err_msg = "No mapping available for gas flow values: %s"
+            print(err_msg)
+            return None
+        return "{} slpm/scfh".format(flow_value[flow_ord])
+
+    get_gas_flow.__name__ = "_get_gas_flow_{}".format(ps)
+    return get_gas_flow
+
+
+def _get_kw_output(cur_av):
+    kw = (cur_av[0] * cur_av[1]) / 1000
+    return "{:.3} kW".format(kw)
+
+
+class ProcessValueView(Mapping):
+    """Process values of a read data sample, formatted on first access.
+
+    Args:
+        formatter: formatter of the process values
+        raw_data: read data sample
+        keys: keys of the process values in the view
+        key_set: set of the keys
+    """
+
+    def __init__(self, formatter, raw_data: dict, keys: tuple, key_set: frozenset) -> None:
+        self._formatter = formatter
+        self._raw_data = raw_data
+        self._keys = keys
+        self._key_set = key_set
+        self._values = {}
+
+    def __getitem__(self, key):
+        value = self._values.get(key, _MISSING)
+        if value is _MISSING:
+            if key not in self._key_set:
+                raise KeyError(key)
+            value = self._formatter.format_value(key, self._raw_data)
+            self._values[key] = value
+        return value
+
+    def get(self, key, default=None):
+        if key in self._key_set:
+            return self[key]
+        return default
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return "{}({!r})".format(type(self).__name__, dict(self))
+
+
+class ProcessValueFormatter:
+    """Process value formatter for displaying on the UI.
+
+    The formatters are compiled once into a plan, giving the read data keys
+    and the formatter of each process value. The process values are
+    formatted lazily, when read from a view, and memoized until the read
+    data values they are formatted from change, so that the formatting cost
+    scales with the process values displayed. The converter results are
+    also cached by input value, in caches which may be shared by the
+    formatters of several machines.
+
+    Args:
+        caches: memo caches of the converters, own ones if None
+
+    Attributes:
+        data (ProcessValueView): all the formatted process values
+    """
+
+    # Converter results cached per converter, by input value
+    CACHE_SIZE = 256
+
+    # Read data keys of the process values not formatted from their own key
+    DERIVED_INPUTS = {
+        "pf": ("cur", "pg", "sf"),
+        "sgf": ("cur", "pg", "sf"),
+        "kw": ("cur", "av"),
+        "fr_ccm": ("fr_maj_ccm", "fr_min_ccm", "fr_dev_ccm"),
+        "fr_dmc": ("fr_maj_dmc", "fr_min_dmc", "fr_dev_dmc"),
+        "fr_dpc": ("fr_maj_dpc", "fr_min_dpc", "fr_dev_dpc"),
+    }
+
+    # Formatter of each process value
+    FORMATTERS = {
+        "pid": _no_conv,
+        "otm": _no_conv,
+        "po": _no_conv,
+        "ecc": _no_conv,
+        "ps": _no_conv,
+        "pe": _no_conv,
+        "mms": _no_conv,
+        "pref": _no_conv,
+        "dccm": _enum_conv("dccm"),
+        "ddmc": _enum_conv("ddmc"),
+        "ddpc": _enum_conv("ddpc"),
+        "ds": _enum_conv("ds"),
+        "fccm": _enum_conv("fccm"),
+        "fdmc": _enum_conv("fdmc"),
+        "fdpc": _enum_conv("fdpc"),
+        "lccm": _enum_conv("lccm"),
+        "ldmc": _enum_conv("ldmc"),
+        "ldpc": _enum_conv("ldpc"),
+        "av": _volt_conv,
+        "ptr": _sec_conv,
+        "vs": _valve_bitmask_conv,
+        "app": _psi_to_bar_conv,
+        "asgp": _psi_to_bar_conv,
+        "ashf": _gph_to_lpm_conv,
+        "cmip": _psi_to_bar_conv,
+        "pip": _psi_to_bar_conv,
+        "sip": _psi_to_bar_conv,
+        "sihp": _psi_to_bar_conv,
+        "fv": _no_conv,
+        "dss": _dss_bitmask_conv,
+        "pm": _enum_conv("pm"),
+        "hl": _inch_to_meter_conv,
+        "ah": _hr_conv,
+        "pf": _gas_flow("pf"),
+        "sgf": _gas_flow("sgf"),
+        "fr_ccm": _firmware_revision,
+        "fr_dmc": _firmware_revision,
+        "fr_dpc": _firmware_revision,
+        "pg": _enum_conv("pg"),
+        "sf": _enum_conv("sf"),
+        "kw": _get_kw_output,
+        "cur": _format_current,
+    }
+
+    def __init__(self, caches: Optional[ConverterCaches] = None) -> None:
+        self._plan = self._compile_plan()
+        self._caches = ConverterCaches(self.CACHE_SIZE) if caches is None else caches
+        # Inputs getter, formatter and memo cache of each process value
+        self._converters = {
+            key: (get_inputs, formatter, self._caches.cache(formatter))
+            for key, (get_inputs, formatter) in self._plan.items()
+        }
+        self._defaults = self._get_default_data()
+        self._keys = tuple(self._defaults)
+        # Read data values and formatted value of the last formatting, by key
+        self._memo = {}
+        # Read data of the last sample, or accumulated from the deltas
+        self._raw_data = {}
+        # Views of the last sample, by keys
+        self._views = {}
+        # Checked key sets of the views, by keys
+        self._key_sets = {}
+
+    @classmethod
+    def _compile_plan(cls) -> dict:
+        """Returns the inputs getter and the formatter of each process value,
+        compiled on first use.
+        """
+        if "_PLAN" not in cls.__dict__:
+            plan = {}
+            for key in cls._get_default_data():
+                inputs = cls.DERIVED_INPUTS.get(key, (key,))
+                plan[key] = (itemgetter(*inputs), cls.FORMATTERS[key])
+            cls._PLAN = plan
+            cls._PLAN_INPUTS = frozenset(
+                input_key
+                for key in plan
+                for input_key in cls.DERIVED_INPUTS.get(key, (key,))
+            )
+        return cls._PLAN
 
     @staticmethod
     def _get_default_data():
@@ -279,13 +389,12 @@ class ProcessValueFormatter:
         )
         # fmt: on
         fault_keys = ("fccm", "lccm", "fdmc", "ldmc", "fdpc", "ldpc")
-        vs_keys = ("phe", "ple", "pe", "sge", "she", "ve", "cse", "mse")
         dss_keys = ("pft", "pf", "apf", "apt", "pit", "radc", "tr", "rcmmc")
 
         def set_defaults(keys, default="-"):
             return {key: default for key in keys}
 
-        vs = set_defaults(vs_keys)
+        vs = set_defaults(VS_KEYS)
         dss = set_defaults(dss_keys)
         faults = set_defaults(fault_keys, ("-",) * 3)
         data = set_defaults(data_keys)
@@ -294,75 +403,109 @@ class ProcessValueFormatter:
         data.update(faults)
         return data
 
-    @staticmethod
-    def _firmware_revision(ps, raw_dt):
-        res = {}
-        fr_map = {
-            "fr_ccm": ("fr_maj_ccm", "fr_min_ccm", "fr_dev_ccm"),
-            "fr_dmc": ("fr_maj_dmc", "fr_min_dmc", "fr_dev_dmc"),
-            "fr_dpc": ("fr_maj_dpc", "fr_min_dpc", "fr_dev_dpc"),
-        }
-        fr_keys = fr_map[ps]
-        if not all(fr_key in raw_dt for fr_key in fr_keys):
-            return res
-
-        fr = "{}.{}.{}".format(
-            raw_dt[fr_keys[0]], raw_dt[fr_keys[1]], raw_dt[fr_keys[2]]
-        )
-        res[ps] = fr
+    def format_value(self, key: str, raw_data: dict):
+        """Returns the formatted process value of the read data.
 
-        return res
+        The value is formatted again only if its read data values changed
+        since its last formatting, and were not formatted recently.
 
-    @staticmethod
-    def _get_gas_flow(ps, raw_dt):
-        flow_map_keys = {"cur", "pg", "sf"}
-        flow_ord = {"pf": 0, "sgf": 1}
-        res = {}
-        if not all(fm_key in raw_dt for fm_key in flow_map_keys):
-            return res
-
-        cur = raw_dt["cur"]
-        pg = raw_dt["pg"]
-        sf = raw_dt["sf"]
+        Raises:
+            KeyError: if key is not a process value
+        """
+        get_inputs, formatter, cache = self._converters[key]
         try:
-            flow_value = GAS[(cur, pg, sf)]
+            inputs = get_inputs(raw_data)
         except KeyError:
-            err_msg = "No mapping available for gas flow values: %s"
-            print(err_msg)
-            return res
+            return self._defaults[key]
 
-        res[ps] = "{} slpm/scfh".format(flow_value[flow_ord[ps]])
-        return res
+        memo = self._memo.get(key)
+        # The type is compared too, as 1 == 1.0 == True
+        if memo is not None and type(memo[0]) is type(inputs) and memo[0] == inputs:
+            return memo[1]
 
-    @staticmethod
-    def _get_kw_output(ps, raw_dt):
+        if type(inputs) is list:
+            cache_key = (list, tuple(inputs))
+        else:
+            cache_key = (type(inputs), inputs)
         try:
-            kw = (raw_dt["cur"] * raw_dt["av"]) / 1000
-            return {"kw": "{:.3} kW".format(kw)}
-        except KeyError:
-            return {}
+            value = cache.get(cache_key, _MISSING)
+        except TypeError:
+            # Not hashable, not cached
+            cache_key = None
+            value = _MISSING
+        if value is _MISSING:
+            value = formatter(inputs)
+            if cache_key is not None:
+                cache.put(cache_key, value)
+
+        if value is None:
+            value = self._defaults[key]
+        self._memo[key] = (inputs, value)
+        return value
+
+    def get_cache_stats(self) -> dict:
+        """Returns the stats of the converter caches, by converter name."""
+        return self._caches.stats()
+
+    def view(self, keys: Optional[Iterable[str]] = None) -> ProcessValueView:
+        """Returns the lazily formatted process values of the last sample.
 
-    @staticmethod
-    def _format_current(ps, raw_dt):
-        try:
-            return {"cur": "{} A".format(raw_dt["cur"])}
-        except KeyError:
-            return {}
+        Args:
+            keys: keys of the process values in the view, all if None
+
+        Raises:
+            KeyError: if a key is not a process value
+        """
+        keys = self._keys if keys is None else tuple(keys)
+        view = self._views.get(keys)
+        if view is None:
+            key_set = self._key_sets.get(keys)
+            if key_set is None:
+                for key in keys:
+                    if key not in self._plan:
+                        raise KeyError(key)
+                key_set = self._key_sets[keys] = frozenset(keys)
+            view = ProcessValueView(self, self._raw_data, keys, key_set)
+            self._views[keys] = view
+        return view
+
+    def screen_view(self, screen: str) -> ProcessValueView:
+        """Returns the lazily formatted process values shown by the screen."""
+        return self.view(SCREEN_KEYS.get(screen))
+
+    @property
+    def data(self) -> ProcessValueView:
+        return self.view()
+
+    def _set_raw_data(self, raw_data: dict) -> None:
+        self._raw_data = raw_data
+        self._views = {}
 
     def process_data(self, data: dict, timestamp: float = None) -> None:
-        """Formats the process values and stores in data attribute.
+        """Stores the process values to be formatted by the views.
 
         Args:
            data: process values to be formatted
            timestamp: timestamp of process values, in seconds
         """
-        process_dt = self._get_default_data()
+        if data != self._raw_data:
+            self._set_raw_data(dict(data))
 
-        for key in process_dt:
-            conv = self._process_value_map[key](key, data)
-            process_dt.update(conv)
+    def process_delta(self, delta: dict, seq: int, timestamp: float = None) -> None:
+        """Stores the changed read data values, the others are kept.
+
+        Args:
+           delta: read data values changed since the previous call
+           seq: sequence number of the read data
+           timestamp: timestamp of process values, in seconds
+        """
+        if not self._PLAN_INPUTS.intersection(delta):
+            self._raw_data.update(delta)
+            return
 
-        self.data = process_dt
+        raw_data = dict(self._raw_data)
+        raw_data.update(delta)
+        self._set_raw_data(raw_data)
 
     def get_fault_code(self, data: dict) -> (str, str):
         """Return CCM fault code"""
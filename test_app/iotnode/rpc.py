@@ -4,7 +4,8 @@ Client side API to establish communication between the mobile application and Io
 The communication protocol used is JSON-RPC over websockets.
 """
 
-from typing import Any, Callable
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 import time
 import asyncio
 import aiohttp
@@ -13,7 +14,14 @@ import jsonschema
 
 from jsonrpc_websocket import Server
 from jsonrpc_base import TransportError, ProtocolError
+from .backoff import Backoff, CircuitBreaker
+from .chunk_size import ChunkSizeController
+from .cut_chart_compare import CutchartComparator
 from .cut_chart_fetcher import CutChartParam
+from .param_cache import ParamCache
+from .param_reads import ParamReadCoalescer
+from .poll_scheduler import PollScheduler
+from .schema_compiler import CompiledValidator
 
 from .utils import VResult, validate_ip
 
@@ -25,8 +33,32 @@ class IotNodeInterface:
     RESP_TIMEOUT = 3
 
     REQUEST_TIMEOUT = 20
-    # Chunk size of get and set params
+    # Largest delay between the reconnect attempts, in seconds
+    RECONNECT_MAX_DELAY = 60
+    # Failed reconnects opening the circuit, and the time it stays open
+    CIRCUIT_FAILURE_THRESHOLD = 6
+    CIRCUIT_OPEN_PERIOD = 120
+    # Initial chunk size of get and set params, adapted per machine
     CHUNK_SIZE = 30
+    MAX_CHUNK_SIZE = 128
+    # Number of chunk requests in flight during a transfer
+    PIPELINE_WINDOW = 4
+    # Number of retries of a failed chunk request
+    CHUNK_RETRIES = 2
+    # Node error messages of the chunks rejected for their size
+    PAYLOAD_TOO_LARGE_MESSAGES = ("too large", "too long")
+    # Time the small param reads are held for, to be sent together
+    PARAM_BATCH_WINDOW = 0.005
+    # Cache time to live in seconds of the live node values, like the
+    # solenoid states, and of the configuration params
+    PARAM_CACHE_TTL = {"live": 1.0, "config": 300.0}
+    LIVE_PARAM_RANGES = ((7808, 7811), (11901, 11903), (11910, 11924), (16000, 16007))
+    # Number of shadowed params read back before a differential download
+    VERIFY_SAMPLE_SIZE = 8
+    # Heartbeat period in seconds of the read data pushed by the node
+    PUSH_HEARTBEAT = 5
+    # Pushed read data is stale after this many missed heartbeats
+    PUSH_MISSED_HEARTBEATS = 2
 
     lock_unlock_param_ids = (0x10, 0x110, 0x210)
     lock_param_val = 0
@@ -158,18 +190,47 @@ class IotNodeInterface:
         },
     }
 
-    NETWORKS_VALIDATOR = jsonschema.Draft7Validator(NETWORKS_SCHEMA)
-    READ_DATA_VALIDATOR = jsonschema.Draft7Validator(READ_DATA_SCHEMA)
+    NETWORKS_VALIDATOR = CompiledValidator(NETWORKS_SCHEMA)
+    READ_DATA_VALIDATOR = CompiledValidator(READ_DATA_SCHEMA)
 
     def __init__(self, config, send_event_cb):
         self._config = config
         self._callbacks = []
+        self._delta_callbacks = []
+        # Last read data and its sequence number, the deltas are taken from
+        self._last_read_data: Optional[dict] = None
+        self._read_seq = 0
         self._send_event_cb = send_event_cb
         self._ws_client = None
         self._session = None
         self._try_conn_task = None
+        self._backoff = None
+        self._reconnect_wakeup = None
+        self._circuit = CircuitBreaker(
+            self.CIRCUIT_FAILURE_THRESHOLD, self.CIRCUIT_OPEN_PERIOD
+        )
         self._version = 0
         self._read_paused = False
+        self._poll_scheduler = PollScheduler(config.get_poll_period)
+        # Last known param values of the node, by param id
+        self._param_shadow: Dict[int, int] = {}
+        self._chunk_sizer = None
+        self._learned_chunk_size = self.CHUNK_SIZE
+        # The chunk size was decreased by timeouts or oversized chunks
+        self._chunk_size_failed = False
+        self._param_cache = ParamCache(
+            self.PARAM_CACHE_TTL, {"live": self.LIVE_PARAM_RANGES}, "config"
+        )
+        self._param_reads = ParamReadCoalescer(
+            self._get_params_request,
+            self.PARAM_BATCH_WINDOW,
+            lambda: self._get_chunk_sizer().size,
+        )
+        # Subscribed read data keys, the read data is polled if None
+        self._push_keys: Optional[List[str]] = None
+        self._push_supported = True
+        self._push_data: Optional[dict] = None
+        self._last_push = 0.0
 
     @staticmethod
     def run() -> bool:
@@ -184,6 +245,20 @@ class IotNodeInterface:
         """
         self._callbacks.append(cb)
 
+    def register_delta_callback(self, cb: Callable[[dict, int, float], None]) -> None:
+        """Registers callbacks which will be triggered with the changed values.
+
+        The callback receives the read data values changed since the previous
+        read data, the sequence number of the read data, and its timestamp.
+        It is not triggered if no value changed. The first read data after
+        connecting, or after registering a callback, is passed in full.
+
+        Args:
+          cb: callback function
+        """
+        self._delta_callbacks.append(cb)
+        self._last_read_data = None
+
     def _get_url(self):
         ip, port = self._config.get_machine_ip_and_port()
         if not ip:
@@ -198,15 +273,74 @@ class IotNodeInterface:
     def pause_read_data(self, state: bool):
         self._read_paused = state
 
+    def enable_push_mode(self, keys: Optional[Iterable[str]] = None) -> None:
+        """Subscribes to the read data pushed by the node, instead of
+        polling it.
+
+        The node notifies the values of the subscribed keys when they change,
+        and all of them on every heartbeat. The callbacks still receive the
+        full read data. Nodes not supporting the subscriptions are polled.
+        Takes effect on the next connection.
+
+        Args:
+          keys: read data keys to subscribe to, all of them if None
+        """
+        if keys is None:
+            keys = self.READ_DATA_SCHEMA["required"]
+        self._push_keys = list(keys)
+
+    def disable_push_mode(self) -> None:
+        """Polls the read data, instead of subscribing to it.
+
+        The subscription is cancelled on the node within a poll period,
+        the read data pushed meanwhile is ignored.
+        """
+        self._push_keys = None
+
     async def _close(self):
         if self._ws_client:
             await self._ws_client.close()
             self._ws_client = None
 
+    async def close(self) -> None:
+        """Closes the connection, and the session kept across reconnects."""
+        await self._close()
         if self._session:
             await self._session.close()
             self._session = None
 
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Returns the session, kept for the life of the interface."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=self.CONN_TIMEOUT)
+        return self._session
+
+    def get_poll_metrics(self) -> Dict[str, float]:
+        """Returns the timing metrics of the read data polls."""
+        return self._poll_scheduler.metrics()
+
+    def is_push_alive(self) -> Optional[bool]:
+        """Tells if the node keeps pushing the read data.
+
+        Returns:
+          None if the read data is polled, else False if the node missed
+          its heartbeats
+        """
+        if self._push_keys is None or self._push_data is None:
+            return None
+        return time.monotonic() - self._last_push <= self._get_push_timeout()
+
+    def _get_push_timeout(self) -> float:
+        return self.PUSH_HEARTBEAT * self.PUSH_MISSED_HEARTBEATS
+
+    def get_param_cache_stats(self) -> Dict[str, int]:
+        """Returns the hit and miss counts of the param cache."""
+        return self._param_cache.stats()
+
+    def get_circuit_state(self) -> str:
+        """Returns the state of the connection circuit breaker."""
+        return self._circuit.state
+
     def _is_valid_client(self):
         url = self._get_url()
 
@@ -228,8 +362,15 @@ class IotNodeInterface:
             await self._close()
             return False
 
-        self._session = aiohttp.ClientSession(timeout=self.CONN_TIMEOUT)
-        self._ws_client = Server(url, session=self._session, timeout=self.RESP_TIMEOUT)
+        # Params may have changed while disconnected
+        self.invalidate_param_shadow()
+        self._param_cache.select_machine(url)
+        self._param_cache.flush()
+        self._push_data = None
+        self._last_read_data = None
+        # The machine may have changed
+        self._chunk_sizer = None
+        self._ws_client = Server(url, session=self._get_session(), timeout=self.RESP_TIMEOUT)
 
         try:
             await self._ws_client.ws_connect()
@@ -261,28 +402,71 @@ class IotNodeInterface:
     def try_connect_start(self, retry_period: int) -> None:
         """Run the try_connect as a task.
 
+        The reconnect delays and the circuit breaker are reset, as the
+        connection is asked for again.
+
         Args:
           retry_period: connection retry period in seconds.
         """
+        if self._backoff:
+            self._backoff.reset()
+        if self._circuit.state != CircuitBreaker.CLOSED:
+            self._circuit.reset()
+            self._send_event_cb("circuit_closed")
+        if self._reconnect_wakeup:
+            self._reconnect_wakeup.set()
+
         if self._try_conn_task and not self._try_conn_task.cancelled():
             asyncio.ensure_future(self._close())
         else:
             self._try_conn_task = asyncio.ensure_future(self.try_connect(retry_period))
 
+    async def _wait_reconnect(self) -> None:
+        """Records a failed connection, and waits before the next one."""
+        was_closed = self._circuit.state == CircuitBreaker.CLOSED
+        self._circuit.on_failure()
+        if self._circuit.allow():
+            await self._sleep_reconnect(self._backoff.next_delay())
+            return
+
+        if was_closed:
+            self._send_event_cb("circuit_open")
+        await self._sleep_reconnect(self._circuit.remaining())
+
+    async def _sleep_reconnect(self, delay: float) -> None:
+        """Sleeps for the delay, or until try_connect_start is called."""
+        self._reconnect_wakeup = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._reconnect_wakeup.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+
+    def _on_connected(self) -> None:
+        """Resets the reconnect delays, the connection is healthy."""
+        self._backoff.reset()
+        if self._circuit.state != CircuitBreaker.CLOSED:
+            self._circuit.on_success()
+            self._send_event_cb("circuit_closed")
+
     async def try_connect(self, retry_period: int) -> None:
-        """Retry connection for every retry_period.
+        """Retry connection until connected.
 
-        Tries to connect to websocket server for every retry
-        period. Once connected, sends rpc requests - ping, get_version
-        and read_data.
+        Tries to connect to websocket server, with exponentially growing
+        delays, from retry_period, between the attempts. After repeated
+        failures, the circuit breaker opens, sending the ``circuit_open``
+        event, and the connection is only tried again after its open
+        period. Once connected, sends rpc requests - ping, get_version and
+        read_data, and sends the ``circuit_closed`` event if the circuit
+        was open.
 
         Args:
-          retry_period: connection retry period in seconds.
+          retry_period: initial connection retry period in seconds.
         """
+        self._backoff = Backoff(retry_period, max(retry_period, self.RECONNECT_MAX_DELAY))
         while self.run():
             connected = await self._validate_and_reinit_client()
             if not connected:
-                await asyncio.sleep(retry_period)
+                await self._wait_reconnect()
                 continue
 
             try:
@@ -294,10 +478,15 @@ class IotNodeInterface:
                 version = await self._ws_client.get_version()
             except (ProtocolError, TransportError, ConnectionError):
                 await self._close()
-                await asyncio.sleep(retry_period)
+                await self._wait_reconnect()
             else:
+                self._on_connected()
                 if isinstance(version, int):
+                    if version != self._version:
+                        self.invalidate_param_shadow()
+                        self._push_supported = True
                     self._version = version
+                    self._send_event_cb("got_version", value=version)
                 else:
                     try:
                         print(
@@ -307,9 +496,9 @@ class IotNodeInterface:
                         pass
                 await self.read_data()
 
-    def _process_read_data(self, data):
+    def _validate_read_data(self, data) -> bool:
         try:
-            self.READ_DATA_VALIDATOR.validate(data, self.READ_DATA_SCHEMA)
+            self.READ_DATA_VALIDATOR.validate(data)
         except jsonschema.exceptions.ValidationError as exc:
             err_path = "/".join(str(i) for i in exc.absolute_path)
             err = "Read data validation failed at /{}".format(err_path)
@@ -317,13 +506,124 @@ class IotNodeInterface:
                 print(err)
             except ModuleNotFoundError as err:
                 pass
-        else:
+            return False
+        return True
+
+    def _process_read_data(self, data):
+        if self._validate_read_data(data):
             self._trigger_cbs(data)
 
-    async def read_data(self) -> None:
-        """Read data from WebSocket for every Poll Period."""
+    def _on_notify_data(self, values: Dict[str, Any]) -> None:
+        """Handles the read data values pushed by the node."""
+        self._last_push = time.monotonic()
+        if self._push_data is None or self._push_keys is None:
+            return
+
+        data = dict(self._push_data)
+        data.update(values)
+        if not self._validate_read_data(data):
+            return
+        self._push_data = data
+        if not self._read_paused:
+            self._trigger_cbs(data)
+
+    async def _subscribe(self) -> bool:
+        """Subscribes to the pushed read data, and reads its initial values.
+
+        Returns:
+          False if the node does not support the subscriptions
+        """
+        self._ws_client.notify_data = self._on_notify_data
+        try:
+            await self._ws_client.subscribe(
+                keys=self._push_keys, heartbeat=self.PUSH_HEARTBEAT
+            )
+        except ProtocolError:
+            try:
+                print("Read data subscription not supported, polling instead")
+            except ModuleNotFoundError as e:
+                pass
+            self._push_supported = False
+            return False
+
+        data = await self._ws_client.read_data()
+        self._last_push = time.monotonic()
+        if self._validate_read_data(data):
+            self._push_data = data
+            if not self._read_paused:
+                self._trigger_cbs(data)
+        return True
+
+    async def _unsubscribe(self) -> bool:
+        """Cancels the subscription to the pushed read data.
+
+        Returns:
+          False if the connection failed
+        """
+        try:
+            await self._ws_client.unsubscribe()
+        except ProtocolError as exc:
+            # The pushed read data keeps being ignored
+            try:
+                print("Read data unsubscription failed: {}".format(exc))
+            except ModuleNotFoundError as e:
+                pass
+        except (TransportError, ConnectionError) as exc:
+            try:
+                print(exc)
+            except ModuleNotFoundError as e:
+                pass
+            await self._close()
+            return False
+        self._push_data = None
+        return True
+
+    async def _read_pushed_data(self) -> bool:
+        """Waits for the read data pushed by the node.
+
+        Returns:
+          True if the read data has to be polled instead
+        """
+        try:
+            subscribed = await self._subscribe()
+        except (ProtocolError, TransportError, ConnectionError) as exc:
+            try:
+                print(exc)
+            except ModuleNotFoundError as e:
+                pass
+            await self._close()
+            return False
+        if not subscribed:
+            return True
+
+        timeout = self._get_push_timeout()
         while self.run():
             await asyncio.sleep(self._config.get_poll_period())
+            if self._push_keys is None:
+                return await self._unsubscribe()
+            if not self._is_valid_client():
+                await self._close()
+                return False
+            if time.monotonic() - self._last_push > timeout:
+                try:
+                    print("No read data pushed for {} s".format(timeout))
+                except ModuleNotFoundError as e:
+                    pass
+                await self._close()
+                return False
+        return False
+
+    async def read_data(self) -> None:
+        """Read data from WebSocket for every Poll Period, or as pushed by
+        the node in the push mode."""
+        if self._push_keys is not None and self._push_supported:
+            poll = await self._read_pushed_data()
+            if not poll:
+                return
+
+        self._poll_scheduler.reset()
+        while self.run():
+            await self._poll_scheduler.wait()
             connected = await self._validate_and_reinit_client()
             if not connected:
                 return
@@ -370,7 +670,7 @@ class IotNodeInterface:
         networks = await self._send_server_req(self._ws_client.list_networks)
 
         try:
-            self.NETWORKS_VALIDATOR.validate(networks, self.NETWORKS_SCHEMA)
+            self.NETWORKS_VALIDATOR.validate(networks)
         except jsonschema.exceptions.ValidationError as exc:
             err_path = "/".join(str(i) for i in exc.absolute_path)
             err = "List networks validation failed at /{}".format(err_path)
@@ -503,18 +803,215 @@ class IotNodeInterface:
         for cb in self._callbacks:
             cb(data, timestamp)
 
+        self._read_seq += 1
+        last_data = self._last_read_data
+        self._last_read_data = data
+        if not self._delta_callbacks:
+            return
+
+        if last_data is None:
+            delta = dict(data)
+        else:
+            # A value changing type only, as 1 to True, is a change too
+            delta = {
+                key: value
+                for key, value in data.items()
+                if key not in last_data
+                or not (type(last_data[key]) is type(value) and last_data[key] == value)
+            }
+        if not delta:
+            return
+        for cb in self._delta_callbacks:
+            cb(delta, self._read_seq, timestamp)
+
     def chunks(self, lst):
         """Yield successive n-sized chunks from lst."""
         for i in range(0, len(lst), self.CHUNK_SIZE):
             yield lst[i : i + self.CHUNK_SIZE]
 
+    def _get_chunk_sizer(self) -> ChunkSizeController:
+        """Returns the chunk size controller of the current machine."""
+        if self._chunk_sizer is None:
+            self._learned_chunk_size = self._config.get_chunk_size(self.CHUNK_SIZE)
+            self._chunk_sizer = ChunkSizeController(
+                self._learned_chunk_size,
+                max_size=self.MAX_CHUNK_SIZE,
+                slow_rtt=self.RESP_TIMEOUT / 3,
+            )
+        return self._chunk_sizer
+
+    @staticmethod
+    def _merge_get_replies(replies: list) -> list:
+        """Joins the (param id, value) pairs of the replies of a split
+        get params chunk."""
+        return [pair for reply in replies for pair in reply]
+
+    @staticmethod
+    def _merge_set_replies(replies: list) -> None:
+        """The set params requests have no reply to join."""
+        return None
+
+    async def _transfer_chunks(
+        self, request, items: list, merge: Callable[[list], Any], on_chunk=None
+    ) -> list:
+        """Sends the chunk requests pipelined on the websocket.
+
+        Up to ``PIPELINE_WINDOW`` requests are in flight, the next chunk is
+        sent as the oldest reply is received. The replies are collected in
+        the chunk order. A failed chunk is retried up to ``CHUNK_RETRIES``
+        times, without restarting the transfer. An oversized chunk is retried
+        split in smaller chunks, the replies of which are joined by merge.
+
+        The chunk size is adapted to the round trip times and errors, the
+        ``chunk_size_learned`` event is sent when it decreases.
+
+        Args:
+          request: coroutine function sending the request of a chunk
+          items: items to be split in chunks
+          merge: joins the replies of a chunk split on retry, into the
+            reply of the chunk
+          on_chunk: called with each reply, in the chunk order, the
+            transfer is stopped if it returns True
+
+        Returns:
+          Replies of the chunks, in order
+
+        Raises:
+          ProtocolError, TransportError: if a chunk request failed
+        """
+        self._get_chunk_sizer()
+        try:
+            return await self._pipeline_chunks(request, items, merge, on_chunk)
+        finally:
+            self._report_chunk_size(settled=False)
+
+    def _report_chunk_size(self, settled: bool) -> None:
+        """Sends the ``chunk_size_learned`` event, if the chunk size has
+        settled on a size differing from the learned one.
+
+        The size grows on most transfers, and is only reported once the
+        download is completed. A decrease is reported right away, the size
+        found too large is not tried again on the next connection. A
+        decrease caused by params rejected by the node is not reported.
+
+        Args:
+          settled: the download is completed
+        """
+        size = self._get_chunk_sizer().size
+        grown = settled and size > self._learned_chunk_size
+        shrunk = self._chunk_size_failed and size < self._learned_chunk_size
+        self._chunk_size_failed = False
+        if grown or shrunk:
+            self._learned_chunk_size = size
+            self._send_event_cb("chunk_size_learned", size)
+
+    @classmethod
+    def _is_payload_too_large(cls, exc: ProtocolError) -> bool:
+        """Tells if the node rejected the request for its size.
+
+        Args:
+          exc: error reply of the node, or client side protocol error
+
+        Returns:
+          bool: the error message says the payload is too large
+        """
+        message = " ".join(str(arg) for arg in exc.args[:2]).lower()
+        return any(text in message for text in cls.PAYLOAD_TOO_LARGE_MESSAGES)
+
+    async def _pipeline_chunks(
+        self, request, items: list, merge: Callable[[list], Any], on_chunk=None
+    ) -> list:
+        sizer = self._get_chunk_sizer()
+
+        async def send(chunk):
+            for retry in range(self.CHUNK_RETRIES + 1):
+                if retry and len(chunk) > sizer.size:
+                    # Retry an oversized chunk in smaller chunks
+                    return merge(await self._pipeline_chunks(request, chunk, merge))
+
+                start = time.monotonic()
+                try:
+                    reply = await request(chunk)
+                except (ProtocolError, TransportError, asyncio.TimeoutError) as exc:
+                    is_protocol_error = isinstance(exc, ProtocolError)
+                    too_large = is_protocol_error and self._is_payload_too_large(exc)
+                    sizer.on_error(len(chunk), too_large=too_large)
+                    # Params rejected by the node fail in any chunk size
+                    if is_protocol_error and not too_large:
+                        raise
+                    self._chunk_size_failed = True
+                    if retry == self.CHUNK_RETRIES:
+                        raise
+                    # Oversized chunks are only retried in smaller chunks
+                    if too_large and len(chunk) <= sizer.size:
+                        raise
+                else:
+                    sizer.on_success(time.monotonic() - start)
+                    return reply
+
+        pos = 0
+        in_flight = deque()
+
+        def send_next():
+            nonlocal pos
+            if pos < len(items):
+                chunk = items[pos : pos + sizer.size]
+                pos += len(chunk)
+                in_flight.append(asyncio.ensure_future(send(chunk)))
+
+        for _ in range(self.PIPELINE_WINDOW):
+            send_next()
+
+        replies = []
+        try:
+            while in_flight:
+                reply = await in_flight[0]
+                in_flight.popleft()
+                replies.append(reply)
+                if on_chunk is not None and on_chunk(reply):
+                    break
+                send_next()
+        finally:
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        return replies
+
+    async def _get_params_request(self, param_ids: list):
+        # The client is dropped on disconnect, while reads may be batched
+        if self._ws_client is None:
+            raise TransportError("Not connected")
+        return await self._ws_client.get_params(pid=param_ids)
+
+    async def _get_params_chunk(self, chunk: list):
+        return await self._param_reads.read(chunk, batch=False)
+
+    async def read_params(self, param_ids: list) -> list:
+        """Reads the param values, sharing the requests with the concurrent
+        reads, the reads within a short window are sent together.
+
+        Returns:
+          (param id, value) pairs
+        """
+        return await self._param_reads.read(param_ids)
+
     async def _set_params(self, data: list):
-        async def main():
-            for chunk in self.chunks(data):
-                good_status = await self._validate_reinit_else_send_error()
-                if not good_status:
-                    return None
+        async def set_chunk(chunk):
+            param_ids = [param_id for param_id, _ in chunk]
+            self._param_cache.invalidate(param_ids)
+            try:
                 await self._ws_client.set_params(pv_list=chunk)
+            finally:
+                # A read answered during the write may have cached the
+                # previous values
+                self._param_cache.invalidate(param_ids)
+            self._update_param_shadow(chunk)
+
+        async def main():
+            good_status = await self._validate_reinit_else_send_error()
+            if not good_status:
+                return None
+            await self._transfer_chunks(set_chunk, data, self._merge_set_replies)
 
         await self._send_server_req(main)
 
@@ -533,11 +1030,10 @@ class IotNodeInterface:
             good_status = await self._validate_reinit_else_send_error()
             if not good_status:
                 return None
-            res = await self._ws_client.get_params(
-                pid=[CutChartParam.PARAM_ID_PROCESS_ID]
-            )
+            res = await self.read_params([CutChartParam.PARAM_ID_PROCESS_ID])
             # FIXME: Need to validate results?
             # FIXME: Need to handle Exceptions?
+            self._update_param_shadow(res)
             process_id_value = res[0][1]
             self._send_event_cb("got_process_id", value=process_id_value)
 
@@ -546,15 +1042,18 @@ class IotNodeInterface:
     def get_param_list_start(self, param_id_list: list):
         param_list = []
 
+        def on_chunk(res):
+            # FIXME: Need to validate results?
+            self._update_param_shadow(res)
+            param_list.extend(res)
+
         async def get_param_list():
-            for chunk in self.chunks(param_id_list):
-                good_status = await self._validate_reinit_else_send_error()
-                if not good_status:
-                    return None
-                res = await self._ws_client.get_params(pid=chunk)
-                # FIXME: Need to validate results?
-                # FIXME: Need to handle Exceptions?
-                param_list.extend(res)
+            good_status = await self._validate_reinit_else_send_error()
+            if not good_status:
+                return None
+            await self._transfer_chunks(
+                self._get_params_chunk, param_id_list, self._merge_get_replies, on_chunk
+            )
 
         async def main():
             await self._send_server_req(get_param_list)
@@ -562,10 +1061,141 @@ class IotNodeInterface:
 
         asyncio.ensure_future(main())
 
-    def set_params_start(self, data: list, locked: bool = True):
-        asyncio.ensure_future(self.set_params(data, locked))
+    def _update_param_shadow(self, pv_list) -> None:
+        for param_id, value in pv_list:
+            # Lock state is not a download parameter
+            if param_id not in self.lock_unlock_param_ids:
+                self._param_shadow[param_id] = value
+
+    def invalidate_param_shadow(self) -> None:
+        """Forgets the param values known to be on the node."""
+        self._param_shadow.clear()
+
+    def diff_params(self, data: list) -> List[Tuple[int, int]]:
+        """Returns the (param_id, value) pairs differing from the values
+        known to be on the node.
+
+        Args:
+          data: (param_id, value) pairs to be downloaded
+        """
+        shadow = self._param_shadow
+        return [
+            (param_id, value)
+            for param_id, value in data
+            if param_id not in shadow or shadow[param_id] != value
+        ]
+
+    async def _verify_param_shadow(self, sample_size: int) -> bool:
+        """Reads back a sample of the shadowed params, and invalidates the
+        shadow if any of them has changed on the node.
+
+        Returns:
+          True if the sampled values match the shadow
+        """
+        param_ids = list(self._param_shadow)
+        if not param_ids:
+            return True
+        step = max(1, len(param_ids) // sample_size)
+        sample = param_ids[::step][:sample_size]
+        expected = {param_id: self._param_shadow[param_id] for param_id in sample}
+
+        good_status = await self._validate_reinit_else_send_error()
+        if not good_status:
+            return False
+        res = await self._send_server_req(self.read_params, sample)
+        if not res or dict(res) != expected:
+            self.invalidate_param_shadow()
+            return False
+        return True
+
+    async def compare_param_list(
+        self, param_id_list: list, expected: dict, stop_on_mismatch: bool = False
+    ) -> CutchartComparator:
+        """Reads the node param values and compares them against the
+        cutchart, chunk by chunk.
+
+        The ``cutchart_compare_progress`` event is sent after each chunk,
+        with the running mismatch count.
+
+        Args:
+          param_id_list: param ids to be read
+          expected: cutchart value of each param id
+          stop_on_mismatch: stop reading at the first differing value
+
+        Returns:
+          Comparison of the received values
+        """
+        comparator = CutchartComparator(expected, len(param_id_list))
+
+        def on_chunk(res):
+            self._update_param_shadow(res)
+            comparator.update(res)
+            self._send_event_cb("cutchart_compare_progress", comparator.progress())
+            return stop_on_mismatch and comparator.differs()
+
+        async def compare():
+            good_status = await self._validate_reinit_else_send_error()
+            if not good_status:
+                return None
+            await self._transfer_chunks(
+                self._get_params_chunk, param_id_list, self._merge_get_replies, on_chunk
+            )
+
+        await self._send_server_req(compare)
+        return comparator
+
+    def compare_param_list_start(self, param_id_list: list, expected: dict):
+        async def main():
+            comparator = await self.compare_param_list(param_id_list, expected)
+            self._send_event_cb("got_param_list", comparator.obtained)
+
+        asyncio.ensure_future(main())
+
+    async def params_differ(self, param_id_list: list, expected: dict) -> bool:
+        """Returns True if any node param value differs from the cutchart.
+
+        Reading stops at the first differing value.
+        """
+        comparator = await self.compare_param_list(
+            param_id_list, expected, stop_on_mismatch=True
+        )
+        return comparator.differs()
+
+    def set_params_start(
+        self,
+        data: list,
+        locked: bool = True,
+        differential: bool = False,
+        verify: bool = False,
+    ):
+        asyncio.ensure_future(self.set_params(data, locked, differential, verify))
+
+    async def set_params(
+        self,
+        data: list,
+        locked: bool = True,
+        differential: bool = False,
+        verify: bool = False,
+    ):
+        """Downloads the params to the node.
+
+        Args:
+          data: (param_id, value) pairs
+          locked: wrap the download in the unlock and lock sequence
+          differential: only send the pairs differing from the param
+            shadow
+          verify: read back a sample of the param shadow before a
+            differential download, all the pairs are sent if any of the
+            sampled values changed on the node
+        """
+        if differential:
+            if verify:
+                await self._verify_param_shadow(self.VERIFY_SAMPLE_SIZE)
+            data = self.diff_params(data)
+            if not data:
+                self._send_event_cb("sent_param_list")
+                return
 
-    async def set_params(self, data: list, locked: bool = True):
         try:
             if locked:
                 await self._unlock_sequence()
@@ -574,20 +1204,30 @@ class IotNodeInterface:
             if locked:
                 await self._lock_sequence()
 
+        self._report_chunk_size(settled=True)
         self._send_event_cb("sent_param_list")
 
     def get_params_start(self, data: list):
         async def main():
-            temp = []
-            for chunck in self.chunks(data):
+            values, missing = self._param_cache.get(data)
+
+            def on_chunk(res):
+                if res:
+                    self._update_param_shadow(res)
+                    self._param_cache.put(res)
+                    values.update(res)
+
+            if missing:
                 good_status = await self._validate_reinit_else_send_error()
                 if not good_status:
                     return None
-                res = await self._send_server_req(
-                    self._ws_client.get_params, pid=chunck
+                await self._send_server_req(
+                    self._transfer_chunks,
+                    self._get_params_chunk,
+                    missing,
+                    self._merge_get_replies,
+                    on_chunk,
                 )
-                if res:
-                    temp.extend(res)
-            self._send_event_cb("got_service_data", value=dict(temp))
+            self._send_event_cb("got_service_data", value=values)
 
         asyncio.ensure_future(self._send_server_req(main))
@@ -0,0 +1,50 @@
+"""Sample data of an IoT Node, shared by the tests and the benchmarks."""
+
+# Read data of a node, valid against IotNodeInterface.READ_DATA_SCHEMA
+VALID_READ_DATA = {
+    "pid": 112,
+    "otm": 1,
+    "po": 0,
+    "ecc": 0,
+    "ps": 1,
+    "pe": 0,
+    "mms": 0,
+    "pref": 1,
+    "dccm": 0,
+    "ddmc": 0,
+    "ddpc": 0,
+    "ds": 0,
+    "fccm": [4112, 1],
+    "fdmc": [8192, 1],
+    "fdpc": [12288, 1],
+    "lccm": [4112, 2],
+    "ldmc": [8192, 2],
+    "ldpc": [12288, 2],
+    "av": 10,
+    "ptr": 20,
+    "vs": 240,
+    "app": 300,
+    "asgp": 300,
+    "ashf": 300,
+    "cmip": 300,
+    "pip": 300,
+    "sip": 300,
+    "sihp": 300,
+    "fv": 0.1,
+    "dss": 61680,
+    "pm": 0,
+    "hl": 240,
+    "ah": 2,
+    "cur": 30,
+    "pg": 1,
+    "sf": 1,
+    "fr_maj_ccm": 0,
+    "fr_min_ccm": 0,
+    "fr_dev_ccm": 0,
+    "fr_maj_dmc": 1,
+    "fr_min_dmc": 1,
+    "fr_dev_dmc": 1,
+    "fr_maj_dpc": 2,
+    "fr_min_dpc": 2,
+    "fr_dev_dpc": 2,
+}
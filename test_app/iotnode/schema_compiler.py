@@ -0,0 +1,250 @@
+"""Compiles the fixed JSON schemas into specialised validation functions.
+
+The generic jsonschema validator walks the schema on every call, which
+costs more than receiving the read data on the devices. The schemas of the
+app are fixed, so each one is turned once into Python source, with the
+checks of the schema unrolled, in the keyword order jsonschema follows.
+The compiled function returns the path of the first error, the same as
+the ``absolute_path`` of the error raised by jsonschema.
+
+Valid instances are accepted by the compiled function alone. For invalid
+ones, jsonschema validates the instance again, and raises the error with
+its message. Schemas using keywords the compiler does not know are
+validated by jsonschema only.
+"""
+
+import numbers
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import jsonschema
+
+
+Path = Tuple[Any, ...]
+
+# Checks of the draft 7 types, formatted with the checked variable
+TYPE_CHECKS = {
+    "array": "isinstance({v}, list)",
+    "boolean": "isinstance({v}, bool)",
+    "integer": (
+        "(isinstance({v}, int) and not isinstance({v}, bool)"
+        " or isinstance({v}, float) and {v}.is_integer())"
+    ),
+    "null": "{v} is None",
+    "number": "(isinstance({v}, _Number) and not isinstance({v}, bool))",
+    "object": "isinstance({v}, dict)",
+    "string": "isinstance({v}, str)",
+}
+
+NUMBER_CHECK = "isinstance({v}, _Number) and not isinstance({v}, bool)"
+
+# Comparisons failing the numeric keywords, formatted with the variable
+# and the keyword value
+BOUND_CHECKS = {
+    "minimum": "{v} < {value!r}",
+    "maximum": "{v} > {value!r}",
+    "exclusiveMinimum": "{v} <= {value!r}",
+    "exclusiveMaximum": "{v} >= {value!r}",
+}
+
+LENGTH_CHECKS = {
+    "minLength": "len({v}) < {value!r}",
+    "maxLength": "len({v}) > {value!r}",
+}
+
+# Keywords without validation
+ANNOTATIONS = ("$schema", "$id", "$comment", "title", "description", "default", "examples")
+
+
+class UnsupportedSchema(ValueError):
+    """Raised for the schemas using keywords the compiler does not know."""
+
+
+class _CodeGenerator:
+    def __init__(self, format_checker: Optional[jsonschema.FormatChecker]) -> None:
+        self._format_checker = format_checker
+        self._n_vars = 0
+        self._n_funcs = 0
+        self.lines: List[str] = []
+
+    def _new_name(self, prefix: str) -> str:
+        self._n_vars += 1
+        return "{}{}".format(prefix, self._n_vars)
+
+    def function(self, schema: Any) -> str:
+        """Generates the function checking the schema, returns its name."""
+        self._n_funcs += 1
+        name = "_check{}".format(self._n_funcs)
+        body = self._node(schema, "v0", [], 1)
+        self.lines.append("def {}(v0):".format(name))
+        self.lines.extend(body)
+        self.lines.append("    return None")
+        return name
+
+    def _node(self, schema: Any, var: str, path: List[str], depth: int) -> List[str]:
+        ind = "    " * depth
+        ret = "return ({})".format("".join(p + ", " for p in path))
+        fail = ind + "    " + ret
+        if schema is True:
+            return []
+        if schema is False:
+            return [ind + ret]
+        if not isinstance(schema, dict) or "$ref" in schema:
+            raise UnsupportedSchema("Unsupported schema {!r}".format(schema))
+
+        lines: List[str] = []
+        for key, value in schema.items():
+            if key in ANNOTATIONS:
+                continue
+            if key == "type":
+                types = value if isinstance(value, list) else [value]
+                try:
+                    checks = [TYPE_CHECKS[t].format(v=var) for t in types]
+                except KeyError:
+                    raise UnsupportedSchema("Unsupported type {!r}".format(value))
+                lines += ["{}if not ({}):".format(ind, " or ".join(checks)), fail]
+            elif key == "required":
+                if not value:
+                    continue
+                lines.append("{}if isinstance({}, dict):".format(ind, var))
+                for name in value:
+                    lines += [
+                        "{}    if {!r} not in {}:".format(ind, name, var),
+                        ind + "        " + ret,
+                    ]
+            elif key == "properties":
+                body: List[str] = []
+                for name, subschema in value.items():
+                    sub_var = self._new_name("v")
+                    sub_lines = self._node(subschema, sub_var, path + [repr(name)], depth + 2)
+                    if sub_lines:
+                        body += [
+                            "{}    if {!r} in {}:".format(ind, name, var),
+                            "{}        {} = {}[{!r}]".format(ind, sub_var, var, name),
+                        ] + sub_lines
+                if body:
+                    lines += ["{}if isinstance({}, dict):".format(ind, var)] + body
+            elif key == "additionalProperties":
+                if value is not False or "patternProperties" in schema:
+                    raise UnsupportedSchema("Unsupported additionalProperties")
+                names = tuple(schema.get("properties", {}))
+                key_var = self._new_name("k")
+                lines += [
+                    "{}if isinstance({}, dict):".format(ind, var),
+                    "{}    for {} in {}:".format(ind, key_var, var),
+                    "{}        if {} not in {!r}:".format(ind, key_var, names),
+                    ind + "            " + ret,
+                ]
+            elif key == "items":
+                if not isinstance(value, (dict, bool)):
+                    raise UnsupportedSchema("Unsupported items {!r}".format(value))
+                idx_var = self._new_name("i")
+                sub_var = self._new_name("v")
+                sub_lines = self._node(value, sub_var, path + [idx_var], depth + 2)
+                if sub_lines:
+                    lines += [
+                        "{}if isinstance({}, list):".format(ind, var),
+                        "{}    for {}, {} in enumerate({}):".format(ind, idx_var, sub_var, var),
+                    ] + sub_lines
+            elif key == "enum":
+                # Only strings compare equal to strings, so the membership test
+                # matches the jsonschema equality for any instance
+                if not all(isinstance(item, str) for item in value):
+                    raise UnsupportedSchema("Unsupported enum {!r}".format(value))
+                lines += ["{}if {} not in {!r}:".format(ind, var, tuple(value)), fail]
+            elif key in BOUND_CHECKS:
+                check = BOUND_CHECKS[key].format(v=var, value=value)
+                lines += [
+                    "{}if {} and {}:".format(ind, NUMBER_CHECK.format(v=var), check),
+                    fail,
+                ]
+            elif key in LENGTH_CHECKS:
+                check = LENGTH_CHECKS[key].format(v=var, value=value)
+                lines += ["{}if isinstance({}, str) and {}:".format(ind, var, check), fail]
+            elif key == "format":
+                if self._format_checker is not None:
+                    lines += [
+                        "{}if not _conforms({}, {!r}):".format(ind, var, value),
+                        fail,
+                    ]
+            elif key == "anyOf":
+                funcs = [self.function(subschema) for subschema in value]
+                checks = " or ".join("{}({}) is None".format(f, var) for f in funcs)
+                lines += ["{}if not ({}):".format(ind, checks), fail]
+            else:
+                raise UnsupportedSchema("Unsupported keyword {!r}".format(key))
+        return lines
+
+
+def compile_schema(
+    schema: Dict[str, Any], format_checker: Optional[jsonschema.FormatChecker] = None
+) -> Callable[[Any], Optional[Path]]:
+    """Compiles the schema into a function returning the path of the first
+    error of an instance, or None if it is valid.
+
+    Args:
+        schema: draft 7 JSON schema
+        format_checker: checker of the ``format`` keyword, the formats are
+            not checked if None, as with jsonschema
+
+    Raises:
+        UnsupportedSchema: if the schema uses keywords the compiler does not
+            know
+    """
+    generator = _CodeGenerator(format_checker)
+    name = generator.function(schema)
+    namespace: Dict[str, Any] = {"_Number": numbers.Number}
+    if format_checker is not None:
+        namespace["_conforms"] = format_checker.conforms
+    exec("\n".join(generator.lines), namespace)
+    return namespace[name]
+
+
+class CompiledValidator:
+    """Draft 7 validator, checking the instances with the compiled schema.
+
+    The errors are raised by jsonschema, it also validates the schemas the
+    compiler does not support.
+
+    Args:
+        schema: draft 7 JSON schema
+        format_checker: checker of the ``format`` keyword
+
+    Attributes:
+        validator: jsonschema validator of the schema
+    """
+
+    def __init__(
+        self, schema: Dict[str, Any], format_checker: Optional[jsonschema.FormatChecker] = None
+    ) -> None:
+        self.schema = schema
+        self.validator = jsonschema.Draft7Validator(schema, format_checker=format_checker)
+        try:
+            self._check = compile_schema(schema, format_checker)
+        except UnsupportedSchema:
+            self._check = None
+
+    @property
+    def compiled(self) -> bool:
+        return self._check is not None
+
+    def error_path(self, instance: Any) -> Optional[Path]:
+        """Returns the path of the first error, or None if the instance is
+        valid.
+        """
+        if self._check is not None:
+            return self._check(instance)
+        error = next(self.validator.iter_errors(instance), None)
+        return None if error is None else tuple(error.absolute_path)
+
+    def is_valid(self, instance: Any) -> bool:
+        return self.error_path(instance) is None
+
+    def validate(self, instance: Any) -> None:
+        """Validates the instance.
+
+        Raises:
+            jsonschema.exceptions.ValidationError: if the instance is invalid
+        """
+        if self._check is not None and self._check(instance) is None:
+            return
+        self.validator.validate(instance)
@@ -23,9 +23,14 @@ class StatusIndicator:
     STATUS_GOOD = 5
     STATUS_FAULT = 3
     MAX_SIZE = 10
+    # Part of the poll deadlines skipped, above which a good connection is
+    # faulty
+    MAX_OVERRUN_RATE = 0.5
 
-    def __init__(self, cb):
+    def __init__(self, cb, poll_metrics_cb=None, push_alive_cb=None):
         self._get_poll_period_cb = cb
+        self._get_poll_metrics_cb = poll_metrics_cb
+        self._is_push_alive_cb = push_alive_cb
         self._dataqueue = queue.Queue(maxsize = self.MAX_SIZE)
 
     def collect_data(self, data: dict, timestamp: float):
@@ -43,9 +48,15 @@ class StatusIndicator:
     def get_connection_status(self) -> Status:
         """Provides the status of connection to UI.
 
+        The read data pushed by the node only arrives on value changes and
+        heartbeats, the connection is then judged from the heartbeats.
+
         Returns:
             Status of connection
         """
+        push_alive = self.is_push_alive()
+        if push_alive is not None:
+            return Status.GOOD if push_alive else Status.NOT_CONNECTED
 
         current_time = time.time()
         poll_period = self._get_poll_period_cb()
@@ -57,8 +68,33 @@ class StatusIndicator:
 
         qsize = self._dataqueue.qsize()
         if qsize >= self.STATUS_GOOD:
+            overrun_rate = self.get_poll_metrics().get("overrun_rate", 0)
+            if overrun_rate > self.MAX_OVERRUN_RATE:
+                return Status.FAULTY
             return  Status.GOOD
         if qsize >= self.STATUS_FAULT:
             return Status.FAULTY
 
         return Status.NOT_CONNECTED
+
+    def get_poll_metrics(self) -> dict:
+        """Provides the timing metrics of the polls, as the sample interval,
+        the lateness and the overruns.
+
+        Returns:
+            poll metrics, empty if not available
+        """
+        if self._get_poll_metrics_cb is None:
+            return {}
+        return self._get_poll_metrics_cb()
+
+    def is_push_alive(self):
+        """Tells if the node keeps pushing the read data.
+
+        Returns:
+            None if the read data is polled, else False if the node missed
+            its heartbeats
+        """
+        if self._is_push_alive_cb is None:
+            return None
+        return self._is_push_alive_cb()
@@ -0,0 +1,84 @@
+import unittest
+
+from .backoff import Backoff, CircuitBreaker
+
+
+class BackoffTestCase(unittest.TestCase):
+    def test_delays_grow_to_cap(self):
+        backoff = Backoff(1, 10, rand=lambda: 1.0)
+
+        delays = [backoff.next_delay() for _ in range(6)]
+
+        self.assertEqual([1, 2, 4, 8, 10, 10], delays)
+
+    def test_jitter(self):
+        backoff = Backoff(4, 60, rand=lambda: 0.0)
+
+        self.assertEqual(2, backoff.next_delay())
+        self.assertEqual(4, backoff.next_delay())
+
+    def test_jitter_spreads_delays(self):
+        delays = {Backoff(4, 60).next_delay() for _ in range(20)}
+
+        self.assertGreater(len(delays), 1)
+        self.assertTrue(all(2 <= delay <= 4 for delay in delays))
+
+    def test_reset(self):
+        backoff = Backoff(1, 10, rand=lambda: 1.0)
+        backoff.next_delay()
+        backoff.next_delay()
+
+        backoff.reset()
+
+        self.assertEqual(1, backoff.next_delay())
+
+
+class CircuitBreakerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.circuit = CircuitBreaker(3, 60, clock=lambda: self.now)
+
+    def fail(self, count):
+        for _ in range(count):
+            self.circuit.on_failure()
+
+    def test_opens_after_threshold(self):
+        self.fail(2)
+        self.assertEqual(CircuitBreaker.CLOSED, self.circuit.state)
+
+        self.fail(1)
+
+        self.assertEqual(CircuitBreaker.OPEN, self.circuit.state)
+        self.assertFalse(self.circuit.allow())
+        self.assertEqual(60, self.circuit.remaining())
+
+    def test_success_resets_failures(self):
+        self.fail(2)
+        self.circuit.on_success()
+        self.fail(2)
+
+        self.assertEqual(CircuitBreaker.CLOSED, self.circuit.state)
+
+    def test_half_open_after_period(self):
+        self.fail(3)
+        self.now = 60
+
+        self.assertEqual(CircuitBreaker.HALF_OPEN, self.circuit.state)
+        self.assertTrue(self.circuit.allow())
+
+    def test_half_open_failure_reopens(self):
+        self.fail(3)
+        self.now = 60
+
+        self.fail(1)
+
+        self.assertEqual(CircuitBreaker.OPEN, self.circuit.state)
+        self.assertEqual(60, self.circuit.remaining())
+
+    def test_half_open_success_closes(self):
+        self.fail(3)
+        self.now = 60
+
+        self.circuit.on_success()
+
+        self.assertEqual(CircuitBreaker.CLOSED, self.circuit.state)
@@ -0,0 +1,50 @@
+"""
+Test case file for adaptive chunk size
+"""
+import unittest
+
+from .chunk_size import ChunkSizeController
+
+
+class ChunkSizeControllerTestCase(unittest.TestCase):
+
+    def test_additive_increase(self):
+        sizer = ChunkSizeController(30, max_size=40, increase=5)
+
+        sizer.on_success(0.1)
+        self.assertEqual(35, sizer.size)
+        sizer.on_success(0.1)
+        sizer.on_success(0.1)
+        self.assertEqual(40, sizer.size)
+
+    def test_slow_reply_not_increased(self):
+        sizer = ChunkSizeController(30, slow_rtt=1.0)
+
+        sizer.on_success(1.5)
+
+        self.assertEqual(30, sizer.size)
+
+    def test_multiplicative_decrease(self):
+        sizer = ChunkSizeController(30)
+
+        sizer.on_error(30)
+        self.assertEqual(15, sizer.size)
+        sizer.on_error(10)
+        self.assertEqual(5, sizer.size)
+
+        for _ in range(5):
+            sizer.on_error(1)
+        self.assertEqual(1, sizer.size)
+
+    def test_too_large_lowers_max_size(self):
+        sizer = ChunkSizeController(30, increase=10)
+
+        sizer.on_error(30, too_large=True)
+        sizer.on_success(0.1)
+        sizer.on_success(0.1)
+
+        self.assertEqual(29, sizer.size)
+
+    def test_initial_size_clamped(self):
+        self.assertEqual(128, ChunkSizeController(500).size)
+        self.assertEqual(1, ChunkSizeController(0).size)
@@ -114,6 +114,19 @@ class ConfigurationTestCase(unittest.TestCase):
 
         self.assertEqual(out, (exp_ip, exp_port))
 
+    def test_get_chunk_size_without_machine(self):
+        self.assertEqual(30, self.config.get_chunk_size(30))
+
+    def test_set_chunk_size(self):
+        self.load_config()
+        self.config.curr_machine = self.valid_config["machines"][0]["name"]
+        self.assertEqual(30, self.config.get_chunk_size(30))
+
+        self.config.set_chunk_size(60)
+
+        self.assertEqual(60, self.config.get_chunk_size(30))
+        self.config.machines.validate(self.config.machines.get(self.config.curr_machine))
+
     def test_validate_machine_ip_empty_false(self):
         ip = ""
         exp = False, "Machine IP cannot be empty."
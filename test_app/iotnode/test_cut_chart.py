@@ -2,12 +2,14 @@
 Test case file for cut chart
 """
 import unittest
+from unittest import mock
 import os
 import tempfile
 import csv
 
-from .cut_chart import CutChart
+from .cut_chart import CutChart, Error
 from .cut_chart import InputParams
+from .cut_chart_cache import get_cache_path
 
 
 def make_header_row(data):
@@ -31,6 +33,14 @@ def get_cut_chart_data():
     ]
 
 
+def get_param_id_chart_data():
+    param_ids = ['6400', '14592', '14600', '14612', '14613', '6400', '20000', '20010']
+    return [
+        ['h', 'Rev', '', 'QP3', '4', '0', 'EOL'],
+        ['h', 'ParamID'] + [''] * 33 + param_ids + ['EOL'],
+    ]
+
+
 def get_process_param_list():
     return [
         InputParams('10000', '10006', '0', '86 in',
@@ -57,10 +67,25 @@ class CutChartTestCase(unittest.TestCase):
 
             def remove_tempfile():
                 os.unlink(temp_fp.name)
+                cache_path = get_cache_path(temp_fp.name)
+                if os.path.exists(cache_path):
+                    os.unlink(cache_path)
 
             self.addCleanup(remove_tempfile)
             return temp_fp.name
 
+    def get_param_id_chart_file(self):
+        with tempfile.NamedTemporaryFile("+w", delete=False) as temp_fp:
+            csv.writer(temp_fp).writerows(get_param_id_chart_data())
+
+        def remove_tempfile():
+            CutChart(temp_fp.name).close()
+            os.unlink(temp_fp.name)
+            os.unlink(get_cache_path(temp_fp.name))
+
+        self.addCleanup(remove_tempfile)
+        return temp_fp.name
+
     def test_query_with_valid_process_list(self):
         cc_filename = self.get_cut_chart_file()
         cut_chart = CutChart(cc_filename)
@@ -71,6 +96,15 @@ class CutChartTestCase(unittest.TestCase):
         with self.assertRaises(FileNotFoundError):
             cut_chart.load_process_list()
 
+    def test_cutchart_revision_read_lazily(self):
+        cut_chart = CutChart('iotnode/cuchart.csv')
+        self.assertIsNone(cut_chart._table)
+        self.assertIsNone(cut_chart.cutchart_revision)
+
+        cut_chart = CutChart(self.get_cut_chart_file())
+        self.assertIsNone(cut_chart._table)
+        self.assertEqual(cut_chart.cutchart_revision, "QP3.4.0")
+
     def test_get_cutchart_revision(self):
         cc_filename = self.get_cut_chart_file()
         cut_chart = CutChart(cc_filename)
@@ -144,3 +178,75 @@ class CutChartTestCase(unittest.TestCase):
         expected = make_marking_row('10018', 'D')
         _, marking_row = cut_chart.query_with_process_id(marking_id)
         self.assertEqual(expected, marking_row)
+
+    def test_query_with_process_id_returns_both_rows(self):
+        cc_filename = self.get_cut_chart_file()
+        cut_chart = CutChart(cc_filename)
+        expected = (
+            make_cutting_row('10000', '10006', 'A'),
+            make_marking_row('10006', 'B'),
+        )
+        result = cut_chart.query_with_process_id('10000')
+        self.assertEqual(expected, result)
+
+    def test_query_with_invalid_process_id(self):
+        cc_filename = self.get_cut_chart_file()
+        cut_chart = CutChart(cc_filename)
+        with self.assertRaises(Error):
+            cut_chart.query_with_process_id('99999')
+
+    def test_process_index_built_once(self):
+        cut_chart = CutChart(self.get_cut_chart_file())
+        index = cut_chart._get_process_index()
+        self.assertIs(index, cut_chart._get_process_index())
+        self.assertEqual((1, 2), index['10000'])
+
+    def test_close_releases_indexes(self):
+        cut_chart = CutChart(self.get_cut_chart_file())
+        cut_chart.load_process_list()
+        cut_chart._get_process_index()
+        self.assertGreater(cut_chart.resident_size(), 0)
+
+        cut_chart.close()
+
+        self.assertEqual(0, cut_chart.resident_size())
+        self.assertIsNone(cut_chart._process_index)
+        self.assertIsNone(cut_chart._param_matrix)
+        self.assertIsNone(cut_chart._process_list)
+        self.assertEqual({}, cut_chart._param_id_lists)
+        # Loaded again on next use
+        self.assertEqual((1, 2), cut_chart._get_process_index()['10000'])
+        cut_chart.close()
+
+    def test_get_param_id_list(self):
+        cut_chart = CutChart(self.get_param_id_chart_file())
+        cutting, marking = cut_chart.get_param_id_list()
+        self.assertEqual(
+            [6400, 14592, 14600, 14612, 14613, 6400, 20000, 20010], cutting)
+        self.assertEqual([i + 0x200 for i in cutting], marking)
+
+    def test_get_param_id_list_filtered(self):
+        cut_chart = CutChart(self.get_param_id_chart_file())
+        cutting, marking = cut_chart.get_param_id_list(need_filter=True)
+        self.assertEqual([6400, 14613, 20000, 20010], cutting)
+        self.assertEqual([6912, 14613 + 0x200, 20512, 20522], marking)
+
+    @mock.patch.object(CutChart, "PARAM_ID_SKIP_RANGES", ((14592, 14612), (20000, 20005)))
+    def test_get_param_id_list_multiple_skip_ranges(self):
+        cut_chart = CutChart(self.get_param_id_chart_file())
+        cutting, _ = cut_chart.get_param_id_list(need_filter=True)
+        self.assertEqual([6400, 14613, 20010], cutting)
+
+    @mock.patch.object(CutChart, "PARAM_ID_INCLUDE_RANGES", ((14000, 19999),))
+    def test_get_param_id_list_include_ranges(self):
+        cut_chart = CutChart(self.get_param_id_chart_file())
+        cutting, _ = cut_chart.get_param_id_list(need_filter=True)
+        self.assertEqual([14613], cutting)
+
+    def test_get_param_id_list_cached(self):
+        filename = self.get_param_id_chart_file()
+        cutting, _ = CutChart(filename).get_param_id_list(need_filter=True)
+        cutting.append(1)
+        self.assertEqual(
+            [6400, 14613, 20000, 20010],
+            CutChart(filename).get_param_id_list(need_filter=True)[0])
@@ -0,0 +1,127 @@
+"""
+Test case file for cut chart cache
+"""
+import unittest
+import os
+import tempfile
+import csv
+import gzip
+
+from .cut_chart_cache import ColumnarTable, CacheError
+from .cut_chart_cache import build_table, file_digest, get_cache_path, load_table
+
+
+def get_rows():
+    return [
+        ['h', 'Rev', '', 'QP3', '4', '0', 'EOL'],
+        ['C', '10000', '10006', '0', 'A', 'EOL'],
+        ['M', '10006', '', '0', 'B', 'B', 'EOL'],
+        ['C', '10014', '10006', '1', 'A', 'EOL'],
+    ]
+
+
+class CutChartCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.filename = os.path.join(self.tmp_dir.name, "cutchart.csv")
+        self.write_csv(get_rows())
+
+    def write_csv(self, rows):
+        with open(self.filename, "w", newline="") as fp:
+            csv.writer(fp).writerows(rows)
+
+    def load(self):
+        table = load_table(self.filename)
+        self.addCleanup(table.close)
+        return table
+
+    def test_rows_round_trip(self):
+        table = self.load()
+
+        rows = [table.row(idx) for idx in range(table.n_rows)]
+
+        self.assertEqual(get_rows(), rows)
+
+    def test_missing_cell_is_empty(self):
+        table = self.load()
+
+        self.assertEqual("", table.cell(1, 6))
+
+    def test_find(self):
+        table = self.load()
+
+        self.assertEqual(1, table.find(1, "10000"))
+        self.assertEqual(3, table.find(2, "10006", start=2))
+        self.assertIsNone(table.find(1, "99999"))
+        self.assertEqual([1, 3], table.find_all(0, "C"))
+
+    def test_cache_file_created(self):
+        self.load()
+
+        self.assertTrue(os.path.exists(get_cache_path(self.filename)))
+
+    def test_cache_rebuilt_on_change(self):
+        self.load()
+        rows = get_rows()
+        rows[1][1] = "20000"
+        self.write_csv(rows)
+
+        table = self.load()
+
+        self.assertEqual(file_digest(self.filename), table.digest)
+        self.assertEqual(1, table.find(1, "20000"))
+
+    def test_corrupt_cache_rebuilt(self):
+        with open(get_cache_path(self.filename), "wb") as fp:
+            fp.write(b"garbage")
+
+        table = self.load()
+
+        self.assertEqual(get_rows(), [table.row(i) for i in range(table.n_rows)])
+
+    def test_unwritable_cache_dir(self):
+        cache_dir = os.path.join(self.tmp_dir.name, "missing")
+
+        table = load_table(self.filename, cache_dir)
+
+        self.assertEqual(1, table.find(1, "10000"))
+
+    def test_invalid_buffer(self):
+        with self.assertRaises(CacheError):
+            ColumnarTable(b"CCHT")
+
+        content = build_table(get_rows(), b"\0" * 32)
+        with self.assertRaises(CacheError):
+            ColumnarTable(content[:-1])
+
+    def test_invalid_filepath(self):
+        with self.assertRaises(FileNotFoundError):
+            load_table(os.path.join(self.tmp_dir.name, "cuchart.csv"))
+
+    def write_gzip_csv(self, rows):
+        filename = self.filename + ".gz"
+        with gzip.open(filename, "wt", newline="") as fp:
+            csv.writer(fp).writerows(rows)
+        return filename
+
+    def test_gzip_rows_round_trip(self):
+        filename = self.write_gzip_csv(get_rows())
+
+        table = load_table(filename)
+        self.addCleanup(table.close)
+
+        self.assertEqual(get_rows(), [table.row(idx) for idx in range(table.n_rows)])
+        self.assertTrue(os.path.exists(filename + ".cache"))
+        self.assertFalse(os.path.exists(self.filename + ".cache"))
+
+    def test_truncated_gzip(self):
+        filename = self.write_gzip_csv(get_rows())
+        with open(filename, "rb") as fp:
+            content = fp.read()
+        with open(filename, "wb") as fp:
+            fp.write(content[:-12])
+
+        with self.assertRaises(OSError):
+            load_table(filename)
@@ -0,0 +1,32 @@
+"""
+Test case file for cut chart compare
+"""
+import unittest
+
+from .cut_chart_compare import CutchartComparator
+
+
+class CutchartComparatorTestCase(unittest.TestCase):
+
+    def test_update_counts_mismatches(self):
+        comparator = CutchartComparator({1: 10, 2: 20, 3: 30}, 4)
+
+        self.assertEqual(1, comparator.update([[1, 10], [2, 21]]))
+        self.assertEqual(1, comparator.update([[3, 31], [4, 40]]))
+
+        self.assertEqual({2: (20, 21), 3: (30, 31)}, comparator.mismatches)
+        self.assertEqual({1: 10, 2: 21, 3: 31, 4: 40}, comparator.obtained)
+        self.assertEqual(
+            {"received": 4, "total": 4, "mismatched": 2}, comparator.progress())
+
+    def test_param_not_in_cutchart_is_not_compared(self):
+        comparator = CutchartComparator({}, 1)
+
+        self.assertEqual(0, comparator.update([[1, 10]]))
+        self.assertFalse(comparator.differs())
+
+    def test_update_empty_chunk(self):
+        comparator = CutchartComparator({1: 10}, 1)
+
+        self.assertEqual(0, comparator.update([]))
+        self.assertEqual(0, comparator.n_received)
@@ -0,0 +1,87 @@
+"""
+Test case file for cut chart facets
+"""
+import unittest
+
+from .cut_chart import InputParams
+from .cut_chart_facets import FacetIndex, popcount
+
+
+def get_process_param_list():
+    return [
+        InputParams('10000', '10006', '0', '86 in',
+                    '0', '0.375', 'B', '100', '3', '6'),
+        InputParams('10018', '10016', '2', '9 in',
+                    '0', '0.3', 'M', '14', '1', '2'),
+        InputParams('10010', '10009', '0', '3.8 mm',
+                    '1', '0.5', 'B', '100', '5', '1'),
+        InputParams('10017', '10019', '1', '3/8 in',
+                    '0', '0.43', 'B', '100', '4', '1'),
+        InputParams('10015', '10006', '0', '10 mm',
+                    '1', '0.21', 'M', '100', '3', '2'),
+    ]
+
+
+FACETS = {
+    "material": lambda row: row.material,
+    "amperage": lambda row: row.amperage,
+    "gas": lambda row: (row.plasma_gas, row.shield_gas),
+}
+
+
+class FacetIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = get_process_param_list()
+        self.facets = FacetIndex(self.rows, FACETS)
+
+    def test_popcount(self):
+        self.assertEqual(0, popcount(0))
+        self.assertEqual(3, popcount(0b10101))
+
+    def test_counts_all_rows(self):
+        expected = {'0': 3, '2': 1, '1': 1}
+        self.assertEqual(expected, self.facets.counts("material"))
+
+    def test_select(self):
+        self.facets.select(material='0')
+
+        expected = [self.rows[0], self.rows[2], self.rows[4]]
+        self.assertEqual(expected, self.facets.selected_rows())
+        self.assertEqual({'100': 3}, self.facets.counts("amperage"))
+
+    def test_select_multiple_facets(self):
+        self.facets.select(material='0', gas=('3', '2'))
+
+        self.assertEqual([self.rows[4]], self.facets.selected_rows())
+
+    def test_select_missing_value(self):
+        self.facets.select(material='5')
+
+        self.assertEqual(0, len(self.facets))
+        self.assertEqual({}, self.facets.counts("material"))
+
+    def test_select_invalid_facet(self):
+        with self.assertRaises(ValueError):
+            self.facets.select(materil='0')
+
+    def test_undo(self):
+        self.facets.select(material='0')
+        self.facets.select(amperage='14')
+        self.assertEqual(0, len(self.facets))
+
+        self.facets.undo()
+
+        self.assertEqual(3, len(self.facets))
+        self.facets.undo()
+        self.facets.undo()
+        self.assertEqual(len(self.rows), len(self.facets))
+
+    def test_reset_with_base_selection(self):
+        base = self.facets.union("amperage", lambda val: val == '100')
+        self.facets.select(material='2')
+
+        self.facets.reset(base)
+
+        self.assertEqual(4, len(self.facets))
+        self.assertEqual({'0': 3, '1': 1}, self.facets.counts("material"))
@@ -0,0 +1,78 @@
+"""
+Test case file for cut chart fetcher
+"""
+import unittest
+from unittest import mock
+import os
+import tempfile
+import csv
+
+from .cut_chart import CutChart
+from .cut_chart_fetcher import CutchartPrefetcher
+
+
+def get_cut_chart_data():
+    return [
+        ['h', 'Rev', '', 'QP3', '4', '0', 'EOL'],
+        ['h', 'ParamID'] + [''] * 33 + ['6400', '6401', 'EOL'],
+        ['C', '10000', '10006'] + [''] * 32 + ['1', '2', 'EOL'],
+        ['M', '10006', ''] + [''] * 32 + ['3', '', 'EOL'],
+    ]
+
+
+class CutchartPrefetcherTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.filename = os.path.join(self.tmp_dir.name, "cutchart.csv")
+        with open(self.filename, "w", newline="") as fp:
+            csv.writer(fp).writerows(get_cut_chart_data())
+        self.send_event_cb = mock.Mock()
+
+    def test_prefetch_sends_ready_event(self):
+        prefetcher = CutchartPrefetcher(self.send_event_cb, self.filename)
+        self.assertFalse(prefetcher.is_ready())
+
+        prefetcher.start()
+
+        self.assertTrue(prefetcher.wait(5))
+        prefetcher._thread.join(5)
+        self.assertIsNone(prefetcher.error)
+        self.send_event_cb.assert_called_once_with("cutchart_ready")
+
+    def test_prefetch_loads_given_cutchart(self):
+        cutchart = CutChart(self.filename)
+        self.addCleanup(cutchart.close)
+        prefetcher = CutchartPrefetcher(self.send_event_cb, cutchart=cutchart)
+
+        prefetcher.start()
+        prefetcher._thread.join(5)
+
+        self.assertIs(prefetcher.cutchart, cutchart)
+        self.assertIsNotNone(cutchart._process_list)
+        self.assertIsNotNone(cutchart._param_matrix)
+        self.assertEqual(cutchart.load_process_list()[0].process_id, "10000")
+
+    def test_prefetch_start_once(self):
+        prefetcher = CutchartPrefetcher(self.send_event_cb, self.filename)
+
+        prefetcher.start()
+        thread = prefetcher._thread
+        prefetcher.start()
+
+        self.assertIs(thread, prefetcher._thread)
+        thread.join(5)
+        self.send_event_cb.assert_called_once_with("cutchart_ready")
+
+    def test_prefetch_invalid_filepath(self):
+        filename = os.path.join(self.tmp_dir.name, "cuchart.csv")
+        prefetcher = CutchartPrefetcher(self.send_event_cb, filename)
+
+        prefetcher.start()
+        prefetcher._thread.join(5)
+
+        self.assertTrue(prefetcher.is_ready())
+        self.assertIsInstance(prefetcher.error, FileNotFoundError)
+        self.send_event_cb.assert_called_once_with(
+            "cutchart_error", str(prefetcher.error))
@@ -0,0 +1,49 @@
+"""
+Test case file for cut chart parameter matrix
+"""
+import unittest
+
+from .cut_chart_params import ParamMatrix, parse_cell
+
+
+class ParamMatrixTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.matrix = ParamMatrix([6400, 6401, 6402], 0x200)
+        self.matrix.add_row('10000', ['1', '', '3', 'EOL'])
+        self.matrix.add_row('10006', [' ', '2.5', '7'])
+
+    def test_parse_cell(self):
+        self.assertEqual((12, True), parse_cell('12'))
+        self.assertEqual((2, True), parse_cell('2.9'))
+        self.assertEqual((0, False), parse_cell(' '))
+        self.assertEqual((0, False), parse_cell(None))
+
+    def test_pairs_skip_empty_cells(self):
+        expected = [(6400, 1), (6402, 3)]
+        self.assertEqual(expected, self.matrix.pairs('10000'))
+
+    def test_marking_pairs(self):
+        expected = [(6401 + 0x200, 2), (6402 + 0x200, 7)]
+        self.assertEqual(expected, self.matrix.pairs('10006', marking=True))
+
+    def test_pairs_invalid_process_id(self):
+        with self.assertRaises(KeyError):
+            self.matrix.pairs('99999')
+
+    def test_pairs_from_cells(self):
+        expected = [(6401, 4)]
+        self.assertEqual(expected, self.matrix.pairs_from_cells(['', '4']))
+
+    def test_batch_pairs(self):
+        expected = {
+            '10000': [(6400, 1), (6402, 3)],
+            '10006': [(6401, 2), (6402, 7)],
+        }
+        self.assertEqual(expected, self.matrix.batch_pairs(['10000', '10006']))
+
+    def test_duplicate_row_ignored(self):
+        self.matrix.add_row('10000', ['9', '9', '9'])
+
+        self.assertEqual(2, len(self.matrix))
+        self.assertEqual([(6400, 1), (6402, 3)], self.matrix.pairs('10000'))
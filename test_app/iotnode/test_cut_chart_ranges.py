@@ -0,0 +1,48 @@
+"""
+Test case file for cut chart param id ranges
+"""
+import unittest
+
+from .cut_chart_ranges import IntervalSet, ParamIdFilter
+
+
+class IntervalSetTestCase(unittest.TestCase):
+
+    def test_contains(self):
+        intervals = IntervalSet([(10, 20), (30, 30)])
+        self.assertIn(10, intervals)
+        self.assertIn(20, intervals)
+        self.assertIn(30, intervals)
+        self.assertNotIn(9, intervals)
+        self.assertNotIn(21, intervals)
+        self.assertNotIn(31, intervals)
+
+    def test_merge_overlapping_and_adjacent(self):
+        intervals = IntervalSet([(30, 40), (1, 3), (10, 20)])
+        intervals.add(4, 9)
+        intervals.add(15, 35)
+        self.assertEqual([(1, 40)], list(intervals))
+
+    def test_add_disjoint_keeps_order(self):
+        intervals = IntervalSet([(30, 40), (1, 3)])
+        intervals.add(10, 20)
+        self.assertEqual([(1, 3), (10, 20), (30, 40)], list(intervals))
+
+    def test_invalid_interval(self):
+        with self.assertRaises(ValueError):
+            IntervalSet([(5, 4)])
+
+
+class ParamIdFilterTestCase(unittest.TestCase):
+
+    def test_apply_exclude(self):
+        param_id_filter = ParamIdFilter(exclude=[(5, 6), (9, 10)])
+        self.assertEqual([1, 7, 11], param_id_filter.apply([1, 5, 7, 10, 11]))
+
+    def test_apply_include_and_exclude(self):
+        param_id_filter = ParamIdFilter(include=[(1, 10)], exclude=[(5, 6)])
+        self.assertEqual([1, 7], param_id_filter.apply([1, 5, 7, 11]))
+
+    def test_apply_removes_duplicates(self):
+        param_id_filter = ParamIdFilter(exclude=[(5, 6), (9, 10)])
+        self.assertEqual([7, 1], param_id_filter.apply([7, 1, 7, 1]))
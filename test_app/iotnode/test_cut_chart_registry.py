@@ -0,0 +1,88 @@
+"""
+Test case file for cut chart registry
+"""
+import unittest
+import os
+import tempfile
+import csv
+
+from .cut_chart_registry import CutChartRegistry, CutChartRegistryError
+
+
+def get_cut_chart_data(revision):
+    return [
+        ['h', 'Rev', '', 'QP3', revision, '0', 'EOL'],
+        ['h', 'ParamID'] + [''] * 33 + ['6400', '6401', 'EOL'],
+        ['C', '10000', '10006'] + [''] * 32 + ['1', '2', 'EOL'],
+        ['M', '10006', ''] + [''] * 32 + ['3', '', 'EOL'],
+    ]
+
+
+class CutChartRegistryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.filenames = {}
+        for min_version, revision in ((0, '4'), (5, '5'), (9, '6')):
+            filename = os.path.join(self.tmp_dir.name, "cutchart_{}.csv".format(revision))
+            with open(filename, "w", newline="") as fp:
+                csv.writer(fp).writerows(get_cut_chart_data(revision))
+            self.filenames[min_version] = filename
+        self.registry = CutChartRegistry()
+        for min_version in (9, 0, 5):
+            self.registry.register(self.filenames[min_version], min_version)
+
+    def tearDown(self):
+        for filename in self.registry.resident_filenames():
+            self.registry._resident[filename].close()
+
+    def test_get_filename(self):
+        self.assertEqual(self.registry.get_filename(0), self.filenames[0])
+        self.assertEqual(self.registry.get_filename(4), self.filenames[0])
+        self.assertEqual(self.registry.get_filename(5), self.filenames[5])
+        self.assertEqual(self.registry.get_filename(100), self.filenames[9])
+
+    def test_get_filename_unsupported_version(self):
+        registry = CutChartRegistry()
+        registry.register(self.filenames[5], 5)
+        with self.assertRaises(CutChartRegistryError):
+            registry.get_filename(1)
+
+    def test_register_duplicate_version(self):
+        with self.assertRaises(ValueError):
+            self.registry.register(self.filenames[0], 0)
+
+    def test_select_loads_lazily(self):
+        self.assertEqual(self.registry.resident_filenames(), [])
+
+        cutchart = self.registry.select(6)
+
+        self.assertIs(self.registry.active, cutchart)
+        self.assertEqual(cutchart.cutchart_revision, "QP3.5.0")
+        self.assertEqual(self.registry.resident_filenames(), [self.filenames[5]])
+        self.assertIs(self.registry.get(7), cutchart)
+
+    def test_evicts_least_recently_used(self):
+        self.registry.select(0)
+        self.registry.get(5)
+        self.registry.get(9)
+        budget = self.registry.resident_bytes()
+        self.registry._max_resident_bytes = budget - 1
+
+        self.registry.get(9)
+
+        self.assertEqual(
+            self.registry.resident_filenames(), [self.filenames[0], self.filenames[9]]
+        )
+
+    def test_keeps_active_over_budget(self):
+        cutchart = self.registry.select(0)
+        self.registry._max_resident_bytes = 0
+
+        self.registry.get(5)
+
+        self.assertEqual(
+            self.registry.resident_filenames(), [self.filenames[0], self.filenames[5]]
+        )
+        self.assertEqual(cutchart.load_process_list()[0].process_id, "10000")
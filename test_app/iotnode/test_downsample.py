@@ -0,0 +1,56 @@
+import math
+import unittest
+
+from .downsample import downsample, lttb, min_max
+
+
+class DownsampleTestCase(unittest.TestCase):
+    def setUp(self):
+        self.timestamps = [float(idx) for idx in range(100)]
+        self.values = [math.sin(idx / 5) for idx in range(100)]
+        # Spike to be kept by both methods
+        self.values[42] = 10.0
+
+    def test_lttb(self):
+        timestamps, values = lttb(self.timestamps, self.values, 20)
+
+        self.assertEqual(20, len(timestamps))
+        self.assertEqual(0.0, timestamps[0])
+        self.assertEqual(99.0, timestamps[-1])
+        self.assertEqual(sorted(timestamps), timestamps)
+        self.assertIn(42.0, timestamps)
+        self.assertEqual([self.values[int(ts)] for ts in timestamps], values)
+
+    def test_lttb_straight_line(self):
+        values = [2.0 * ts for ts in self.timestamps]
+
+        timestamps, kept = lttb(self.timestamps, values, 10)
+
+        self.assertEqual([2.0 * ts for ts in timestamps], kept)
+
+    def test_lttb_few_points_kept(self):
+        self.assertEqual(
+            (self.timestamps[:5], self.values[:5]),
+            lttb(self.timestamps[:5], self.values[:5], 10),
+        )
+        self.assertEqual(
+            ([0.0, 99.0], [self.values[0], self.values[-1]]),
+            lttb(self.timestamps, self.values, 2),
+        )
+        self.assertEqual(([], []), lttb(self.timestamps, self.values, 0))
+
+    def test_min_max(self):
+        timestamps, values = min_max(self.timestamps, self.values, 20)
+
+        self.assertLessEqual(len(timestamps), 20)
+        self.assertEqual(sorted(timestamps), timestamps)
+        self.assertIn(10.0, values)
+        self.assertIn(min(self.values), values)
+
+    def test_downsample_method(self):
+        self.assertEqual(
+            min_max(self.timestamps, self.values, 20),
+            downsample(self.timestamps, self.values, 20, "minmax"),
+        )
+        with self.assertRaises(ValueError):
+            downsample(self.timestamps, self.values, 20, "average")
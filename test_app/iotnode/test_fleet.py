@@ -0,0 +1,133 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from .fake_node import FakeNode
+from .fleet import FleetClient, PerMachine
+from .memo_cache import ConverterCaches
+from .psvalue import ProcessValueFormatter
+from .sample_data import VALID_READ_DATA
+from .status import Status, StatusIndicator
+
+
+class FleetClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.nodes = {
+            "machine{}".format(idx): FakeNode(dict(VALID_READ_DATA, pid=idx))
+            for idx in range(3)
+        }
+        self.machines = []
+        self.config = mock.Mock()
+        self.config.get_poll_period.return_value = 0.01
+        self.config.machines.get_machines.side_effect = lambda: list(self.machines)
+        self.fleet = FleetClient(self.config)
+        self.fleet.RETRY_PERIOD = 0.01
+        self.samples = []
+        self.fleet.register_callback(
+            lambda name, data, timestamp: self.samples.append((name, data["pid"]))
+        )
+
+    @staticmethod
+    def run_until_complete(corotine):
+        return asyncio.get_event_loop().run_until_complete(corotine)
+
+    @staticmethod
+    async def wait_until(condition, timeout=2):
+        for _ in range(int(timeout / 0.01)):
+            if condition():
+                return True
+            await asyncio.sleep(0.01)
+        return False
+
+    def run_scenario(self, scenario):
+        async def main():
+            for name, node in self.nodes.items():
+                await node.start()
+                self.machines.append({"name": name, "ip": node.host, "port": node.port})
+            try:
+                await scenario()
+            finally:
+                await self.fleet.close()
+                for node in self.nodes.values():
+                    await node.stop()
+
+        self.run_until_complete(main())
+
+    def names_polled(self):
+        return {name for name, _ in self.samples}
+
+    def test_samples_tagged_with_machine(self):
+        async def scenario():
+            await self.fleet.sync()
+            self.assertTrue(await self.wait_until(lambda: len(self.names_polled()) == 3))
+            self.assertEqual(["machine0", "machine1", "machine2"], self.fleet.machines())
+
+        self.run_scenario(scenario)
+
+        for name, pid in self.samples:
+            self.assertEqual("machine{}".format(pid), name)
+
+    def test_shared_session(self):
+        async def scenario():
+            await self.fleet.sync()
+            self.assertTrue(await self.wait_until(lambda: len(self.names_polled()) == 3))
+            sessions = {node.client._session for node in self.fleet._nodes.values()}
+            self.assertEqual({self.fleet._session}, sessions)
+
+        self.run_scenario(scenario)
+
+    def test_unreachable_node(self):
+        async def scenario():
+            await self.nodes["machine1"].stop()
+            await self.fleet.sync()
+            self.assertTrue(await self.wait_until(lambda: len(self.samples) >= 10))
+            self.assertFalse(self.fleet.is_connected("machine1"))
+
+        self.run_scenario(scenario)
+
+        self.assertEqual({"machine0", "machine2"}, self.names_polled())
+
+    def test_sync_removed_machine(self):
+        async def scenario():
+            await self.fleet.sync()
+            self.assertTrue(await self.wait_until(lambda: len(self.names_polled()) == 3))
+            del self.machines[0]
+            await self.fleet.sync()
+            self.samples.clear()
+            self.assertTrue(await self.wait_until(lambda: len(self.samples) >= 10))
+            self.assertEqual(["machine1", "machine2"], self.fleet.machines())
+
+        self.run_scenario(scenario)
+
+        self.assertEqual({"machine1", "machine2"}, self.names_polled())
+
+    def test_invalid_read_data_skipped(self):
+        self.nodes["machine2"].read_data["cur"] = "30"
+
+        async def scenario():
+            await self.fleet.sync()
+            self.assertTrue(await self.wait_until(lambda: len(self.samples) >= 10))
+
+        self.run_scenario(scenario)
+
+        self.assertEqual({"machine0", "machine1"}, self.names_polled())
+
+    def test_per_machine_objects(self):
+        caches = ConverterCaches()
+        formatters = PerMachine(lambda: ProcessValueFormatter(caches), "process_data")
+        statuses = PerMachine(lambda: StatusIndicator(lambda: 0.01), "collect_data")
+        self.fleet.register_callback(formatters)
+        self.fleet.register_callback(statuses)
+
+        async def scenario():
+            await self.fleet.sync()
+            self.assertTrue(await self.wait_until(lambda: len(self.samples) >= 30))
+
+        self.run_scenario(scenario)
+
+        self.assertEqual(["machine0", "machine1", "machine2"], sorted(formatters.names()))
+        for idx in range(3):
+            name = "machine{}".format(idx)
+            self.assertEqual(str(idx), formatters.get(name).data["pid"])
+            self.assertEqual(Status.GOOD, statuses.get(name).get_connection_status())
+        self.assertEqual(3, caches.stats()["_no_conv"]["misses"])
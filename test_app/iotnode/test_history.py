@@ -0,0 +1,122 @@
+import math
+import unittest
+
+from .history import ProcessHistory
+from .sample_data import VALID_READ_DATA
+
+
+class ProcessHistoryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.now = 100.0
+        self.history = ProcessHistory(capacity=5, keys=("av", "cur"), clock=lambda: self.now)
+
+    def append(self, timestamps, key="av"):
+        for timestamp in timestamps:
+            self.history.append({key: int(timestamp)}, timestamp)
+
+    def test_append(self):
+        self.history.append({"av": 120, "cur": 50}, 1.0)
+
+        timestamps, values = self.history.series("cur")
+
+        self.assertEqual([1.0], list(timestamps))
+        self.assertEqual([50.0], list(values))
+        self.assertEqual(1, len(self.history))
+
+    def test_oldest_overwritten(self):
+        self.append(range(1, 8))
+
+        timestamps, values = self.history.series("av")
+
+        self.assertEqual(5, len(self.history))
+        self.assertEqual([3, 4, 5, 6, 7], list(timestamps))
+        self.assertEqual([3, 4, 5, 6, 7], list(values))
+
+    def test_series_range(self):
+        self.append(range(1, 8))
+
+        timestamps, values = self.history.series("av", start=4, end=6)
+
+        self.assertEqual([4, 5, 6], list(timestamps))
+        self.assertEqual([4, 5, 6], list(values))
+        self.assertEqual([], list(self.history.series("av", start=8)[0]))
+        self.assertEqual([], list(self.history.series("av", start=6, end=5)[0]))
+
+    def test_missing_value_nan(self):
+        self.history.append({"av": 120}, 1.0)
+
+        _, values = self.history.series("cur")
+
+        self.assertTrue(math.isnan(values[0]))
+
+    def test_window(self):
+        self.append([96, 97, 98, 99, 100])
+
+        timestamps, _ = self.history.window("av", 2)
+
+        self.assertEqual([98, 99, 100], list(timestamps))
+
+    def test_stats(self):
+        self.append([97, 98, 99, 100])
+        self.history.append({}, 100.5)
+
+        self.assertEqual(
+            {"count": 3, "min": 98.0, "max": 100.0, "mean": 99.0},
+            self.history.stats("av", seconds=2.5),
+        )
+        self.assertEqual(4, self.history.stats("av")["count"])
+
+    def test_stats_no_value(self):
+        stats = self.history.stats("av", seconds=10)
+
+        self.assertEqual(0, stats["count"])
+        self.assertTrue(math.isnan(stats["mean"]))
+
+    def test_clock_going_back(self):
+        self.append([10, 5])
+
+        timestamps, _ = self.history.series("av")
+
+        self.assertEqual([10, 10], list(timestamps))
+
+    def test_unknown_key(self):
+        with self.assertRaises(KeyError):
+            self.history.series("pid")
+
+    def test_clear(self):
+        self.append([1, 2])
+        self.history.clear()
+
+        self.assertEqual(0, len(self.history))
+        self.assertEqual([], list(self.history.series("av")[1]))
+
+    def test_default_keys(self):
+        history = ProcessHistory(capacity=2)
+
+        history.append(VALID_READ_DATA, 1.0)
+
+        self.assertEqual(ProcessHistory.KEYS, history.keys())
+        for key in history.keys():
+            # Kept in single precision
+            self.assertAlmostEqual(VALID_READ_DATA[key], history.series(key)[1][0], places=6)
+
+    def test_invalid_capacity(self):
+        with self.assertRaises(ValueError):
+            ProcessHistory(capacity=0)
+
+    def test_trend(self):
+        history = ProcessHistory(capacity=1000, keys=("av",))
+        for idx in range(1000):
+            history.append({"av": idx % 50} if idx % 7 else {}, float(idx))
+
+        timestamps, values = history.trend("av", 100, start=100.0, end=899.0)
+
+        self.assertEqual(100, len(timestamps))
+        self.assertEqual(100.0, timestamps[0])
+        self.assertEqual(899.0, timestamps[-1])
+        self.assertFalse(any(math.isnan(value) for value in values))
+
+    def test_trend_few_samples(self):
+        self.append([1, 2, 3])
+
+        self.assertEqual(([1, 2, 3], [1, 2, 3]), self.history.trend("av", 100))
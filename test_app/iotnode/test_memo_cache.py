@@ -0,0 +1,79 @@
+import unittest
+
+from .memo_cache import ConverterCaches, MemoCache
+
+
+class MemoCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = MemoCache(maxsize=2)
+
+    def test_get_and_put(self):
+        self.assertIsNone(self.cache.get(1))
+        self.cache.put(1, "one")
+
+        self.assertEqual("one", self.cache.get(1))
+        self.assertEqual("-", self.cache.get(2, "-"))
+        self.assertEqual(
+            {"size": 1, "hits": 1, "misses": 2, "evictions": 0, "hit_rate": 1 / 3},
+            self.cache.stats(),
+        )
+
+    def test_least_recently_used_evicted(self):
+        self.cache.put(1, "one")
+        self.cache.put(2, "two")
+        self.cache.get(1)
+
+        self.cache.put(3, "three")
+
+        self.assertEqual(2, len(self.cache))
+        self.assertEqual("one", self.cache.get(1))
+        self.assertIsNone(self.cache.get(2))
+        self.assertEqual("three", self.cache.get(3))
+        self.assertEqual(1, self.cache.evictions)
+
+    def test_none_result_cached(self):
+        self.cache.put(1, None)
+
+        self.assertIsNone(self.cache.get(1, "-"))
+
+    def test_no_size(self):
+        cache = MemoCache(maxsize=0)
+        cache.put(1, "one")
+
+        self.assertEqual(0, len(cache))
+        self.assertIsNone(cache.get(1))
+
+    def test_hit_rate_no_lookup(self):
+        self.assertEqual(0.0, self.cache.hit_rate)
+
+    def test_clear(self):
+        self.cache.put(1, "one")
+        self.cache.clear()
+
+        self.assertIsNone(self.cache.get(1))
+
+
+class ConverterCachesTestCase(unittest.TestCase):
+    def test_cache_per_converter(self):
+        caches = ConverterCaches(maxsize=4)
+
+        self.assertIs(caches.cache(str), caches.cache(str))
+        self.assertIsNot(caches.cache(str), caches.cache(repr))
+
+    def test_stats_by_converter_name(self):
+        caches = ConverterCaches()
+        caches.cache(str).put(1, "1")
+        caches.cache(str).get(1)
+
+        stats = caches.stats()
+
+        self.assertEqual({"str"}, set(stats))
+        self.assertEqual(1, stats["str"]["hits"])
+
+    def test_clear(self):
+        caches = ConverterCaches()
+        caches.cache(str).put(1, "1")
+
+        caches.clear()
+
+        self.assertEqual(0, len(caches.cache(str)))
@@ -0,0 +1,69 @@
+import unittest
+
+from .param_cache import ParamCache
+
+
+class ParamCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.cache = ParamCache(
+            {"live": 1.0, "config": 60.0, "never": 0},
+            {"live": [(100, 199)], "never": [(300, 300)]},
+            "config",
+            clock=lambda: self.now,
+        )
+        self.cache.select_machine("ws://10.0.0.1:9000")
+
+    def test_param_class(self):
+        self.assertEqual("live", self.cache.param_class(150))
+        self.assertEqual("never", self.cache.param_class(300))
+        self.assertEqual("config", self.cache.param_class(200))
+
+    def test_get_hits_and_misses(self):
+        self.cache.put([(1, 10), (2, 20)])
+
+        values, missing = self.cache.get([1, 2, 3])
+
+        self.assertEqual({1: 10, 2: 20}, values)
+        self.assertEqual([3], missing)
+        self.assertEqual({"hits": 2, "misses": 1}, self.cache.stats())
+
+    def test_ttl_per_class(self):
+        self.cache.put([(1, 10), (150, 1), (300, 3)])
+        self.now = 1.0
+
+        values, missing = self.cache.get([1, 150, 300])
+
+        self.assertEqual({1: 10}, values)
+        self.assertEqual([150, 300], missing)
+
+        self.now = 60.0
+        self.assertEqual([1], self.cache.get([1])[1])
+
+    def test_invalidate(self):
+        self.cache.put([(1, 10), (2, 20)])
+
+        self.cache.invalidate([1])
+
+        self.assertEqual(({2: 20}, [1]), self.cache.get([1, 2]))
+
+    def test_per_machine(self):
+        self.cache.put([(1, 10)])
+        self.cache.select_machine("ws://10.0.0.2:9000")
+        self.assertEqual([1], self.cache.get([1])[1])
+        self.cache.put([(1, 11)])
+
+        self.cache.select_machine("ws://10.0.0.1:9000")
+
+        self.assertEqual({1: 10}, self.cache.get([1])[0])
+
+    def test_flush(self):
+        self.cache.put([(1, 10)])
+        self.cache.select_machine("ws://10.0.0.2:9000")
+        self.cache.put([(1, 11)])
+
+        self.cache.flush()
+
+        self.assertEqual([1], self.cache.get([1])[1])
+        self.cache.select_machine("ws://10.0.0.1:9000")
+        self.assertEqual({1: 10}, self.cache.get([1])[0])
@@ -0,0 +1,99 @@
+import asyncio
+import unittest
+
+from jsonrpc_base import ProtocolError
+
+from .param_reads import ParamReadCoalescer
+
+
+class ParamReadCoalescerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.requests = []
+        self.error = None
+        self.node_params = {pid: pid * 10 for pid in range(100)}
+        self.reads = ParamReadCoalescer(self.send, window=0.01, get_chunk_size=lambda: 4)
+
+    async def send(self, param_ids):
+        self.requests.append(list(param_ids))
+        await asyncio.sleep(0.01)
+        if self.error:
+            raise self.error
+        return [[pid, self.node_params[pid]] for pid in param_ids if pid in self.node_params]
+
+    @staticmethod
+    def run_until_complete(corotine):
+        return asyncio.get_event_loop().run_until_complete(corotine)
+
+    def gather(self, *reads):
+        async def main():
+            return await asyncio.gather(*reads, return_exceptions=True)
+
+        return self.run_until_complete(main())
+
+    def test_read(self):
+        res = self.gather(self.reads.read([3, 1, 2]))
+
+        self.assertEqual([[[3, 30], [1, 10], [2, 20]]], res)
+        self.assertEqual([[3, 1, 2]], self.requests)
+
+    def test_identical_reads_coalesced(self):
+        res = self.gather(*[self.reads.read([1, 2]) for _ in range(5)])
+
+        self.assertEqual([[[1, 10], [2, 20]]] * 5, res)
+        self.assertEqual(1, len(self.requests))
+        self.assertEqual(8, self.reads.coalesced)
+
+    def test_reads_batched_in_chunks(self):
+        res = self.gather(
+            self.reads.read([1, 2]), self.reads.read([2, 3, 4]), self.reads.read([5, 6])
+        )
+
+        self.assertEqual([[1, 10], [2, 20]], res[0])
+        self.assertEqual([[2, 20], [3, 30], [4, 40]], res[1])
+        self.assertEqual([[1, 2, 3, 4], [5, 6]], self.requests)
+
+    def test_unbatched_read_joins_in_flight(self):
+        async def main():
+            first = asyncio.ensure_future(self.reads.read([1, 2, 3], batch=False))
+            await asyncio.sleep(0)
+            second = await self.reads.read([2, 3, 4, 5], batch=False)
+            return await first, second
+
+        first, second = self.run_until_complete(main())
+
+        self.assertEqual([[1, 10], [2, 20], [3, 30]], first)
+        self.assertEqual([[2, 20], [3, 30], [4, 40], [5, 50]], second)
+        self.assertEqual([[1, 2, 3], [4, 5]], self.requests)
+
+    def test_later_read_sends_again(self):
+        self.gather(self.reads.read([1]))
+        self.node_params[1] = 11
+
+        res = self.gather(self.reads.read([1]))
+
+        self.assertEqual([[[1, 11]]], res)
+        self.assertEqual(2, len(self.requests))
+
+    def test_error_raised_to_all_reads(self):
+        self.error = ProtocolError("failed")
+
+        res = self.gather(self.reads.read([1]), self.reads.read([1, 2]))
+
+        self.assertIs(self.error, res[0])
+        self.assertIs(self.error, res[1])
+        self.assertEqual({}, self.reads._in_flight)
+
+    def test_missing_params_skipped(self):
+        res = self.gather(self.reads.read([1, 200, 2]))
+
+        self.assertEqual([[[1, 10], [2, 20]]], res)
+
+    def test_cancelled_read_keeps_others(self):
+        async def main():
+            first = asyncio.ensure_future(self.reads.read([1], batch=False))
+            second = asyncio.ensure_future(self.reads.read([1], batch=False))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        self.assertEqual([[1, 10]], self.run_until_complete(main()))
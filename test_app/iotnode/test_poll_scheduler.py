@@ -0,0 +1,103 @@
+import asyncio
+import unittest
+
+from .poll_scheduler import PollScheduler
+
+
+class PollSchedulerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.now = 100.0
+        self.period = 0.5
+        self.sleeps = []
+        self.scheduler = PollScheduler(
+            lambda: self.period, clock=lambda: self.now, sleep=self.sleep
+        )
+
+    async def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+    @staticmethod
+    def run_until_complete(corotine):
+        return asyncio.get_event_loop().run_until_complete(corotine)
+
+    def poll(self, request_time):
+        """Waits for the deadline, and runs a request taking request_time."""
+        self.run_until_complete(self.scheduler.wait())
+        wakeup = self.now
+        self.now += request_time
+        return wakeup
+
+    def test_no_drift(self):
+        wakeups = [self.poll(0.1) for _ in range(5)]
+
+        self.assertEqual([100.5, 101.0, 101.5, 102.0, 102.5], wakeups)
+        self.assertAlmostEqual(0.5, self.scheduler.interval)
+        self.assertEqual(0, self.scheduler.overruns)
+
+    def test_overrun_skips_deadline(self):
+        wakeups = [self.poll(0.1), self.poll(0.7), self.poll(0.1), self.poll(0.1)]
+
+        self.assertEqual([100.5, 101.0, 102.0, 102.5], wakeups)
+        self.assertEqual(1, self.scheduler.overruns)
+        self.assertAlmostEqual(0.5, self.scheduler.interval)
+
+    def test_long_overrun_skips_deadlines(self):
+        self.poll(1.6)
+        wakeup = self.poll(0)
+
+        self.assertEqual(102.5, wakeup)
+        self.assertEqual(3, self.scheduler.overruns)
+        self.assertAlmostEqual((1 - 0.9 ** 3) * 0.9, self.scheduler.overrun_rate)
+
+    def test_overrun_rate_is_skipped_part(self):
+        # 3 of every 4 deadlines are skipped
+        for _ in range(100):
+            self.poll(1.6)
+
+        self.assertEqual(297, self.scheduler.overruns)
+        self.assertGreater(self.scheduler.overrun_rate, 0.5)
+        self.assertLessEqual(self.scheduler.overrun_rate, 1)
+
+        for _ in range(100):
+            self.poll(1000)
+
+        self.assertLessEqual(self.scheduler.overrun_rate, 1)
+
+    def test_lateness(self):
+        async def late_sleep(delay):
+            self.now += delay + 0.05
+
+        self.scheduler._sleep = late_sleep
+
+        self.poll(0)
+        wakeup = self.poll(0)
+
+        self.assertAlmostEqual(101.05, wakeup)
+        self.assertAlmostEqual(0.05, self.scheduler.lateness)
+        self.assertAlmostEqual(0.05, self.scheduler.max_lateness)
+
+    def test_period_change(self):
+        self.poll(0)
+        self.period = 1.0
+
+        self.assertEqual(101.5, self.poll(0))
+
+    def test_reset(self):
+        self.poll(0.7)
+        self.poll(0)
+
+        self.scheduler.reset()
+
+        self.assertEqual(
+            {
+                "samples": 0,
+                "overruns": 0,
+                "interval": 0.0,
+                "lateness": 0.0,
+                "max_lateness": 0.0,
+                "overrun_rate": 0.0,
+            },
+            self.scheduler.metrics(),
+        )
+        self.assertEqual(self.now + 0.5, self.poll(0))
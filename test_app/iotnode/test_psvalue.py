@@ -1,7 +1,9 @@
 import unittest
 
+from .memo_cache import ConverterCaches
 from .psvalue import ProcessValueFormatter
-from .psvalue import ENUM_MAP, GAS
+from .psvalue import ENUM_MAP, GAS, SCREEN_KEYS
+from .sample_data import VALID_READ_DATA
 
 
 class ProcessValueTestCase(unittest.TestCase):
@@ -215,3 +217,205 @@ class ProcessValueTestCase(unittest.TestCase):
         self.ps_value.process_data(data)
         result = self.ps_value.get_fault_code(data)
         self.assertEqual(expected, result)
+
+    def test_process_delta_same_as_process_data(self):
+        samples = [
+            VALID_READ_DATA,
+            dict(VALID_READ_DATA, cur=50, pg=1, sf=5, av=120),
+            dict(VALID_READ_DATA, cur=50, pg=1, sf=5, fr_dev_dmc=7, dccm=99),
+            dict(VALID_READ_DATA, fccm=[4096, 1], vs=3, dss=0),
+        ]
+        expected = ProcessValueFormatter()
+        last = {}
+
+        for seq, sample in enumerate(samples, 1):
+            delta = {key: val for key, val in sample.items() if last.get(key) != val}
+            last = sample
+            expected.process_data(sample)
+            self.ps_value.process_delta(delta, seq)
+
+            self.assertEqual(expected.data, self.ps_value.data)
+
+    @staticmethod
+    def get_counting_formatter():
+        """Returns a formatter recording the process values formatted."""
+        formatted = []
+
+        def count(key, formatter):
+            def formatter_called(values):
+                formatted.append(key)
+                return formatter(values)
+
+            formatter_called.__name__ = key
+            return formatter_called
+
+        class CountingFormatter(ProcessValueFormatter):
+            FORMATTERS = {
+                key: count(key, formatter)
+                for key, formatter in ProcessValueFormatter.FORMATTERS.items()
+            }
+
+        return CountingFormatter(), formatted
+
+    def test_process_delta_formats_changed_keys(self):
+        ps_value, formatted = self.get_counting_formatter()
+        ps_value.process_delta(VALID_READ_DATA, 1)
+        dict(ps_value.data)
+        formatted.clear()
+
+        ps_value.process_delta({"cur": 50, "fr_min_ccm": 4}, 2)
+        dict(ps_value.data)
+
+        self.assertEqual(["cur", "fr_ccm", "kw", "pf", "sgf"], sorted(formatted))
+
+    def test_process_data_formats_changed_keys(self):
+        ps_value, formatted = self.get_counting_formatter()
+        ps_value.process_data(VALID_READ_DATA)
+        dict(ps_value.data)
+        formatted.clear()
+
+        ps_value.process_data(dict(VALID_READ_DATA, cur=50, fr_min_ccm=4))
+        dict(ps_value.data)
+
+        self.assertEqual(["cur", "fr_ccm", "kw", "pf", "sgf"], sorted(formatted))
+
+    def test_process_data_no_change(self):
+        self.ps_value.process_data(VALID_READ_DATA)
+        data = self.ps_value.data
+
+        self.ps_value.process_data(dict(VALID_READ_DATA))
+
+        self.assertIs(data, self.ps_value.data)
+
+    def test_process_data_removed_key_default(self):
+        self.ps_value.process_data({"av": 120, "cur": 50})
+        dict(self.ps_value.data)
+
+        self.ps_value.process_data({"cur": 50})
+
+        self.assertEqual("-", self.ps_value.data["av"])
+        self.assertEqual("-", self.ps_value.data["kw"])
+        self.assertEqual("50 A", self.ps_value.data["cur"])
+
+    def test_process_data_value_type_change(self):
+        self.ps_value.process_data({"pid": 1, "ps": 1})
+        self.ps_value.data["pid"]
+
+        self.ps_value.process_data({"pid": True, "ps": 2})
+
+        self.assertEqual("True", self.ps_value.data["pid"])
+
+    def test_process_data_sample_not_mutated(self):
+        sample = dict(VALID_READ_DATA)
+        self.ps_value.process_data(sample)
+        self.ps_value.data["cur"]
+        sample["cur"] = 50
+
+        self.ps_value.process_data(sample)
+
+        self.assertEqual("50 A", self.ps_value.data["cur"])
+
+    def test_view_formats_its_keys(self):
+        ps_value, formatted = self.get_counting_formatter()
+        ps_value.process_data(VALID_READ_DATA)
+
+        view = ps_value.view(["cur", "kw"])
+
+        self.assertEqual(["cur", "kw"], list(view))
+        self.assertEqual([], formatted)
+        self.assertEqual("{} A".format(VALID_READ_DATA["cur"]), view["cur"])
+        self.assertEqual(["cur"], formatted)
+        self.assertNotIn("pid", view)
+        self.assertEqual("-", view.get("pid", "-"))
+
+    def test_view_values_memoized(self):
+        ps_value, formatted = self.get_counting_formatter()
+        ps_value.process_data(VALID_READ_DATA)
+        dict(ps_value.view(["cur", "pid"]))
+        formatted.clear()
+
+        ps_value.process_data(dict(VALID_READ_DATA, pid=VALID_READ_DATA["pid"] + 1))
+        view = ps_value.view(["cur", "pid"])
+        dict(view)
+        dict(view)
+
+        self.assertEqual(["pid"], formatted)
+        self.assertIs(view, ps_value.view(["cur", "pid"]))
+
+    def test_view_keeps_its_sample(self):
+        self.ps_value.process_data({"cur": 50})
+        view = self.ps_value.view(["cur"])
+
+        self.ps_value.process_data({"cur": 70})
+
+        self.assertEqual("50 A", view["cur"])
+        self.assertEqual("70 A", self.ps_value.view(["cur"])["cur"])
+
+    def test_view_unknown_key(self):
+        with self.assertRaises(KeyError):
+            self.ps_value.view(["unknown"])
+
+    def test_screen_view(self):
+        self.ps_value.process_data(VALID_READ_DATA)
+
+        self.assertEqual(["fccm"], list(self.ps_value.screen_view("home_screen")))
+        self.assertEqual(
+            set(SCREEN_KEYS["cutting_screen"]),
+            set(self.ps_value.screen_view("cutting_screen")),
+        )
+        self.assertEqual(
+            set(self.ps_value.data), set(self.ps_value.screen_view("system_info_screen"))
+        )
+
+    def test_process_delta_no_change(self):
+        self.ps_value.process_delta(VALID_READ_DATA, 1)
+        data = self.ps_value.data
+
+        self.ps_value.process_delta({"unknown": 1}, 2)
+
+        self.assertIs(data, self.ps_value.data)
+
+    def test_repeated_values_not_formatted(self):
+        ps_value, formatted = self.get_counting_formatter()
+        ps_value.process_data({"cur": 50})
+        ps_value.data["cur"]
+        ps_value.process_data({"cur": 70})
+        ps_value.data["cur"]
+        formatted.clear()
+
+        ps_value.process_data({"cur": 50})
+
+        self.assertEqual("50 A", ps_value.data["cur"])
+        self.assertEqual([], formatted)
+        self.assertEqual(1, ps_value.get_cache_stats()["cur"]["hits"])
+
+    def test_caches_shared(self):
+        caches = ConverterCaches()
+        first = ProcessValueFormatter(caches)
+        second = ProcessValueFormatter(caches)
+        first.process_data(VALID_READ_DATA)
+        dict(first.data)
+        misses = {name: stats["misses"] for name, stats in caches.stats().items()}
+
+        second.process_data(VALID_READ_DATA)
+
+        self.assertEqual(dict(first.data), dict(second.data))
+        stats = caches.stats()
+        self.assertEqual(misses, {name: stats["misses"] for name, stats in stats.items()})
+        self.assertEqual(1, stats["_enum_conv_dccm"]["hits"])
+
+    def test_unhashable_value_not_cached(self):
+        self.ps_value.process_data({"pid": {"a": 1}})
+
+        self.assertEqual("{'a': 1}", self.ps_value.data["pid"])
+        self.assertEqual(0, self.ps_value.get_cache_stats()["_no_conv"]["size"])
+
+    def test_value_type_cached_apart(self):
+        self.ps_value.process_data({"pid": 1})
+        self.ps_value.data["pid"]
+        self.ps_value.process_data({"pid": 2})
+        self.ps_value.data["pid"]
+
+        self.ps_value.process_data({"pid": True})
+
+        self.assertEqual("True", self.ps_value.data["pid"])
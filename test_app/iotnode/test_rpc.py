@@ -1,63 +1,21 @@
 from collections import namedtuple
 import copy
 import asyncio
+import functools
 from os import name
 
 import unittest
 from unittest import mock
 from jsonrpc_base import ProtocolError, TransportError
 
+from .backoff import Backoff
+from .chunk_size import ChunkSizeController
+from .fake_node import FakeNode
 from .rpc import IotNodeInterface
+from .sample_data import VALID_READ_DATA
+from .status import Status, StatusIndicator
 
 
-VALID_READ_DATA = {
-    "pid": 112,
-    "otm": 1,
-    "po": 0,
-    "ecc": 0,
-    "ps": 1,
-    "pe": 0,
-    "mms": 0,
-    "pref": 1,
-    "dccm": 0,
-    "ddmc": 0,
-    "ddpc": 0,
-    "ds": 0,
-    "fccm": [4112, 1],
-    "fdmc": [8192, 1],
-    "fdpc": [12288, 1],
-    "lccm": [4112, 2],
-    "ldmc": [8192, 2],
-    "ldpc": [12288, 2],
-    "av": 10,
-    "ptr": 20,
-    "vs": 240,
-    "app": 300,
-    "asgp": 300,
-    "ashf": 300,
-    "cmip": 300,
-    "pip": 300,
-    "sip": 300,
-    "sihp": 300,
-    "fv": 0.1,
-    "dss": 61680,
-    "pm": 0,
-    "hl": 240,
-    "ah": 2,
-    "cur": 30,
-    "pg": 1,
-    "sf": 1,
-    "fr_maj_ccm": 0,
-    "fr_min_ccm": 0,
-    "fr_dev_ccm": 0,
-    "fr_maj_dmc": 1,
-    "fr_min_dmc": 1,
-    "fr_dev_dmc": 1,
-    "fr_maj_dpc": 2,
-    "fr_min_dpc": 2,
-    "fr_dev_dpc": 2,
-}
-
 VALID_NETWORKS = [
     {
         "ssid": "NetGear 2.4G",
@@ -554,3 +512,794 @@ class IoTNodeInterfaceTestCase(unittest.TestCase):
 
         self.assertTrue(res.valid)
         self.assertEqual("", res.reason)
+
+
+class ParamRequestTestCase(unittest.TestCase):
+    """Connected interface, with the param requests mocked."""
+
+    def setUp(self):
+        patcher = mock.patch("iotnode.rpc.Server")
+        self.addCleanup(patcher.stop)
+        self.ws_client = patcher.start().return_value
+        self.ws_client.connected = True
+        self.ws_client._url = "ws://127.0.0.1:9000"
+        self.ws_client.set_params = AsyncMock()
+        self.ws_client.get_params = AsyncMock()
+
+        self.send_event_cb = mock.Mock()
+        self.config = mock.Mock()
+        self.config.get_chunk_size.return_value = IotNodeInterface.CHUNK_SIZE
+        self.config.get_machine_ip_and_port.return_value = "127.0.0.1", "9000"
+        self.rpc = IotNodeInterface(self.config, self.send_event_cb)
+        self.rpc._ws_client = self.ws_client
+
+    @staticmethod
+    def run_until_complete(corotine):
+        return asyncio.get_event_loop().run_until_complete(corotine)
+
+
+class ParamShadowTestCase(ParamRequestTestCase):
+    def sent_pairs(self):
+        pairs = []
+        for call in self.ws_client.set_params.call_args_list:
+            pairs.extend(call.kwargs["pv_list"])
+        return [pair for pair in pairs if pair[0] not in self.rpc.lock_unlock_param_ids]
+
+    def test_set_params_fills_shadow(self):
+        data = [(6400, 1), (6401, 2)]
+
+        self.run_until_complete(self.rpc.set_params(data, differential=True))
+
+        self.assertEqual(data, self.sent_pairs())
+        self.assertEqual([], self.rpc.diff_params(data))
+
+    def test_differential_download_sends_changed_pairs(self):
+        self.run_until_complete(self.rpc.set_params([(6400, 1), (6401, 2)]))
+        self.ws_client.set_params.reset_mock()
+
+        self.run_until_complete(
+            self.rpc.set_params([(6400, 1), (6401, 3), (6402, 4)], differential=True))
+
+        self.assertEqual([(6401, 3), (6402, 4)], self.sent_pairs())
+        self.send_event_cb.assert_called_with("sent_param_list")
+
+    def test_differential_download_without_changes(self):
+        self.run_until_complete(self.rpc.set_params([(6400, 1)]))
+        self.ws_client.set_params.reset_mock()
+
+        self.run_until_complete(self.rpc.set_params([(6400, 1)], differential=True))
+
+        self.assertFalse(self.ws_client.set_params.called)
+        self.send_event_cb.assert_called_with("sent_param_list")
+
+    def test_get_params_fills_shadow(self):
+        self.ws_client.get_params.return_value = [[6400, 5]]
+
+        self.rpc.get_param_list_start([6400])
+        self.run_until_complete(asyncio.sleep(0.01))
+
+        self.assertEqual([(6400, 6)], self.rpc.diff_params([(6400, 5), (6400, 6)]))
+
+    def test_verify_invalidates_changed_shadow(self):
+        self.run_until_complete(self.rpc.set_params([(6400, 1), (6401, 2)]))
+        self.ws_client.set_params.reset_mock()
+        self.ws_client.get_params.return_value = [[6400, 1], [6401, 7]]
+
+        self.run_until_complete(
+            self.rpc.set_params([(6400, 1), (6401, 2)], differential=True, verify=True))
+
+        self.ws_client.get_params.assert_called_once_with(pid=[6400, 6401])
+        self.assertEqual([(6400, 1), (6401, 2)], self.sent_pairs())
+
+    def test_verify_keeps_matching_shadow(self):
+        self.run_until_complete(self.rpc.set_params([(6400, 1), (6401, 2)]))
+        self.ws_client.set_params.reset_mock()
+        self.ws_client.get_params.return_value = [[6400, 1], [6401, 2]]
+
+        self.run_until_complete(
+            self.rpc.set_params([(6400, 1), (6401, 3)], differential=True, verify=True))
+
+        self.assertEqual([(6401, 3)], self.sent_pairs())
+
+    def test_reconnect_invalidates_shadow(self):
+        self.run_until_complete(self.rpc.set_params([(6400, 1)]))
+        self.ws_client.ws_connect = AsyncMock()
+        self.ws_client.close = AsyncMock()
+
+        with mock.patch("iotnode.rpc.aiohttp.ClientSession"):
+            self.run_until_complete(self.rpc._init_and_connect_client())
+
+        self.assertEqual([(6400, 1)], self.rpc.diff_params([(6400, 1)]))
+
+
+class ParamReadCoalescingTestCase(ParamRequestTestCase):
+    def test_concurrent_reads_coalesced(self):
+        self.ws_client.get_params.side_effect = lambda pid: [[p, 1] for p in pid]
+
+        async def main():
+            return await asyncio.gather(
+                self.rpc.read_params([6400, 6401]),
+                self.rpc.read_params([6401]),
+                self.rpc._get_params_chunk([6400, 6401]),
+            )
+
+        res = self.run_until_complete(main())
+
+        self.assertEqual([[[6400, 1], [6401, 1]], [[6401, 1]], [[6400, 1], [6401, 1]]], res)
+        self.ws_client.get_params.assert_called_once_with(pid=[6400, 6401])
+
+    def test_read_params_without_client(self):
+        self.rpc._ws_client = None
+
+        with self.assertRaises(TransportError):
+            self.run_until_complete(self.rpc.read_params([6400]))
+
+
+class ParamCacheTestCase(ParamRequestTestCase):
+    def get_service_data(self, param_ids):
+        self.rpc.get_params_start(param_ids)
+        self.run_until_complete(asyncio.sleep(0.05))
+        return self.send_event_cb.call_args.kwargs["value"]
+
+    def test_get_params_cached(self):
+        self.ws_client.get_params.side_effect = lambda pid: [[p, 1] for p in pid]
+
+        self.get_service_data([11904, 7808])
+        values = self.get_service_data([11904, 7808])
+
+        self.assertEqual({11904: 1, 7808: 1}, values)
+        self.assertEqual(1, self.ws_client.get_params.call_count)
+        self.assertEqual({"hits": 2, "misses": 2}, self.rpc.get_param_cache_stats())
+
+    def test_get_params_cache_invalidated_by_set_params(self):
+        self.ws_client.get_params.side_effect = lambda pid: [[p, 1] for p in pid]
+        self.get_service_data([11904, 11905])
+
+        self.run_until_complete(self.rpc.set_params([(11904, 2)], locked=False))
+        self.get_service_data([11904, 11905])
+
+        self.ws_client.get_params.assert_called_with(pid=[11904])
+
+    def test_get_params_during_set_params_not_cached(self):
+        node_params = {11904: 1}
+        reads = []
+
+        async def get_params(pid):
+            reads.append(pid)
+            return [[p, node_params[p]] for p in pid]
+
+        async def set_params(pv_list):
+            # A read is answered before the write is applied
+            self.rpc.get_params_start([11904])
+            await asyncio.sleep(0.05)
+            node_params.update(pv_list)
+
+        self.ws_client.get_params = get_params
+        self.ws_client.set_params = set_params
+
+        self.run_until_complete(self.rpc.set_params([(11904, 2)], locked=False))
+        self.send_event_cb.assert_any_call("got_service_data", value={11904: 1})
+        values = self.get_service_data([11904])
+
+        self.assertEqual({11904: 2}, values)
+        self.assertEqual([[11904], [11904]], reads)
+
+    def test_get_params_cache_flushed_on_reconnect(self):
+        self.ws_client.get_params.side_effect = lambda pid: [[p, 1] for p in pid]
+        self.ws_client.ws_connect = AsyncMock()
+        self.ws_client.close = AsyncMock()
+        self.get_service_data([11904])
+
+        with mock.patch("iotnode.rpc.aiohttp.ClientSession"):
+            self.run_until_complete(self.rpc._init_and_connect_client())
+        self.get_service_data([11904])
+
+        self.assertEqual(2, self.ws_client.get_params.call_count)
+
+
+class CompareParamListTestCase(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("iotnode.rpc.Server")
+        self.addCleanup(patcher.stop)
+        self.ws_client = patcher.start().return_value
+        self.ws_client.connected = True
+        self.ws_client._url = "ws://127.0.0.1:9000"
+        self.ws_client.get_params = AsyncMock(side_effect=self.get_params)
+        self.node_params = {pid: pid for pid in range(6400, 6470)}
+
+        self.send_event_cb = mock.Mock()
+        self.config = mock.Mock()
+        self.config.get_chunk_size.return_value = IotNodeInterface.CHUNK_SIZE
+        self.config.get_machine_ip_and_port.return_value = "127.0.0.1", "9000"
+        self.rpc = IotNodeInterface(self.config, self.send_event_cb)
+        self.rpc._ws_client = self.ws_client
+
+    def get_params(self, pid):
+        return [[i, self.node_params[i]] for i in pid]
+
+    @staticmethod
+    def run_until_complete(corotine):
+        return asyncio.get_event_loop().run_until_complete(corotine)
+
+    def progress_events(self):
+        return [
+            call.args[1] for call in self.send_event_cb.call_args_list
+            if call.args[0] == "cutchart_compare_progress"
+        ]
+
+    def test_compare_sends_progress_per_chunk(self):
+        param_ids = list(self.node_params)
+        expected = dict(self.node_params)
+        expected[6445] = 0
+
+        comparator = self.run_until_complete(
+            self.rpc.compare_param_list(param_ids, expected))
+
+        self.assertEqual(
+            [
+                {"received": 30, "total": 70, "mismatched": 0},
+                {"received": 60, "total": 70, "mismatched": 1},
+                {"received": 70, "total": 70, "mismatched": 1},
+            ],
+            self.progress_events())
+        self.assertEqual({6445: (0, 6445)}, comparator.mismatches)
+
+    def test_params_differ_stops_early(self):
+        expected = dict(self.node_params)
+        expected[6401] = 0
+        self.rpc.PIPELINE_WINDOW = 1
+
+        differs = self.run_until_complete(
+            self.rpc.params_differ(list(self.node_params), expected))
+
+        self.assertTrue(differs)
+        self.assertEqual(1, self.ws_client.get_params.call_count)
+
+    def test_params_not_differ(self):
+        differs = self.run_until_complete(
+            self.rpc.params_differ(list(self.node_params), dict(self.node_params)))
+
+        self.assertFalse(differs)
+        self.assertEqual(3, self.ws_client.get_params.call_count)
+
+    def test_compare_start_sends_obtained(self):
+        self.rpc.compare_param_list_start([6400, 6401], {6400: 6400})
+        self.run_until_complete(asyncio.sleep(0.01))
+
+        self.send_event_cb.assert_called_with("got_param_list", {6400: 6400, 6401: 6401})
+
+
+class TransferChunksTestCase(unittest.TestCase):
+    def setUp(self):
+        self.config = mock.Mock()
+        self.config.get_chunk_size.return_value = 2
+        self.send_event_cb = mock.Mock()
+        self.rpc = IotNodeInterface(self.config, self.send_event_cb)
+        # Chunk size is only decreased
+        self.rpc._chunk_sizer = ChunkSizeController(2, increase=0)
+        self.rpc._learned_chunk_size = 2
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.failures = {}
+        self.requests = []
+
+    async def request(self, chunk):
+        self.requests.append(chunk)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # Later chunks are answered first
+        await asyncio.sleep(0.001 * (10 - chunk[0]))
+        self.in_flight -= 1
+        if self.failures.get(chunk[0], 0):
+            self.failures[chunk[0]] -= 1
+            raise TransportError("timeout")
+        return [i * 10 for i in chunk]
+
+    @staticmethod
+    def run_until_complete(corotine):
+        return asyncio.get_event_loop().run_until_complete(corotine)
+
+    def test_replies_in_order(self):
+        replies = self.run_until_complete(
+            self.rpc._transfer_chunks(
+                self.request, list(range(10)), self.rpc._merge_get_replies))
+
+        self.assertEqual(
+            [[0, 10], [20, 30], [40, 50], [60, 70], [80, 90]], replies)
+        self.assertEqual(self.rpc.PIPELINE_WINDOW, self.max_in_flight)
+
+    def test_window(self):
+        self.rpc.PIPELINE_WINDOW = 2
+
+        self.run_until_complete(self.rpc._transfer_chunks(
+            self.request, list(range(10)), self.rpc._merge_get_replies))
+
+        self.assertEqual(2, self.max_in_flight)
+
+    def test_failed_chunk_retried(self):
+        self.failures[4] = self.rpc.CHUNK_RETRIES
+
+        replies = self.run_until_complete(
+            self.rpc._transfer_chunks(
+                self.request, list(range(10)), self.rpc._merge_get_replies))
+
+        self.assertEqual([i * 10 for i in range(10)], sum(replies, []))
+        self.assertIn([4], self.requests)
+        self.assertIn([5], self.requests)
+        self.send_event_cb.assert_called_with("chunk_size_learned", 1)
+
+    def test_failed_chunk_after_retries(self):
+        # The chunk fails, and is retried split in single items
+        self.failures[4] = 1 + self.rpc.CHUNK_RETRIES + 1
+
+        with self.assertRaises(TransportError):
+            self.run_until_complete(
+                self.rpc._transfer_chunks(
+                    self.request, list(range(10)), self.rpc._merge_get_replies))
+
+    def test_stop_transfer(self):
+        self.rpc.PIPELINE_WINDOW = 1
+        replies = []
+
+        def on_chunk(reply):
+            replies.append(reply)
+            return True
+
+        self.run_until_complete(
+            self.rpc._transfer_chunks(
+                self.request, list(range(10)), self.rpc._merge_get_replies, on_chunk))
+
+        self.assertEqual([[0, 10]], replies)
+        self.assertEqual([[0, 1]], self.requests)
+
+
+class AdaptiveChunkSizeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.config = mock.Mock()
+        self.config.get_chunk_size.return_value = 4
+        self.send_event_cb = mock.Mock()
+        self.rpc = IotNodeInterface(self.config, self.send_event_cb)
+        self.rpc.PIPELINE_WINDOW = 1
+        self.max_payload = None
+        self.invalid_item = None
+        self.requests = []
+
+    async def request(self, chunk):
+        self.requests.append(chunk)
+        if self.max_payload is not None and len(chunk) > self.max_payload:
+            raise ProtocolError("Payload too large")
+        if self.invalid_item in chunk:
+            raise ProtocolError(-32602, "Invalid param id", {})
+        return list(chunk)
+
+    @staticmethod
+    def run_until_complete(corotine):
+        return asyncio.get_event_loop().run_until_complete(corotine)
+
+    def test_chunk_size_grows_on_fast_replies(self):
+        replies = self.run_until_complete(
+            self.rpc._transfer_chunks(
+                self.request, list(range(100)), self.rpc._merge_get_replies))
+
+        self.assertEqual(list(range(100)), sum(replies, []))
+        self.assertEqual([4, 9, 14, 19, 24], [len(chunk) for chunk in self.requests[:5]])
+        self.assertEqual(39, self.rpc._chunk_sizer.size)
+        # The grown size is only reported at the end of a download
+        self.assertFalse(self.send_event_cb.called)
+
+    def test_chunk_size_reported_after_download(self):
+        self.rpc._ws_client = mock.Mock()
+        self.rpc._ws_client.set_params = AsyncMock()
+        self.rpc._validate_reinit_else_send_error = AsyncMock(return_value=True)
+
+        self.run_until_complete(self.rpc.set_params(
+            [(pid, 0) for pid in range(6400, 6500)], locked=False))
+
+        self.assertEqual(
+            [mock.call("chunk_size_learned", 39), mock.call("sent_param_list")],
+            self.send_event_cb.call_args_list)
+
+    def test_chunk_size_restored_from_config(self):
+        self.config.get_chunk_size.return_value = 20
+        self.rpc.MAX_CHUNK_SIZE = 20
+
+        self.run_until_complete(self.rpc._transfer_chunks(
+            self.request, list(range(40)), self.rpc._merge_get_replies))
+
+        self.config.get_chunk_size.assert_called_with(IotNodeInterface.CHUNK_SIZE)
+        self.assertEqual([20, 20], [len(chunk) for chunk in self.requests])
+        self.assertFalse(self.send_event_cb.called)
+
+    def test_payload_error_splits_chunk(self):
+        self.config.get_chunk_size.return_value = 16
+        self.max_payload = 5
+
+        replies = self.run_until_complete(
+            self.rpc._transfer_chunks(
+                self.request, list(range(20)), self.rpc._merge_get_replies))
+
+        self.assertEqual(list(range(20)), sum(replies, []))
+        self.assertLess(self.rpc._chunk_sizer.size, 16)
+        self.assertEqual([], [chunk for chunk in self.requests[-3:] if len(chunk) > 5])
+
+    def test_payload_error_merges_split_replies(self):
+        self.config.get_chunk_size.return_value = 8
+        self.max_payload = 4
+        merged = []
+
+        def merge(replies):
+            merged.append(replies)
+            return "merged"
+
+        replies = self.run_until_complete(
+            self.rpc._transfer_chunks(self.request, list(range(8)), merge))
+
+        self.assertEqual(["merged"], replies)
+        self.assertEqual([[[0, 1, 2, 3], [4, 5, 6, 7]]], merged)
+
+    def test_set_params_split_chunk(self):
+        self.config.get_chunk_size.return_value = 8
+        self.max_payload = 4
+
+        replies = self.run_until_complete(self.rpc._transfer_chunks(
+            self.request, list(range(8)), self.rpc._merge_set_replies))
+
+        self.assertEqual([None], replies)
+
+    def test_payload_error_single_item(self):
+        self.max_payload = 0
+
+        with self.assertRaises(ProtocolError):
+            self.run_until_complete(self.rpc._transfer_chunks(
+                self.request, [1, 2], self.rpc._merge_get_replies))
+        self.send_event_cb.assert_called_with("chunk_size_learned", 1)
+
+    def test_invalid_item_not_split(self):
+        self.config.get_chunk_size.return_value = 20
+        self.invalid_item = 50
+
+        with self.assertRaises(ProtocolError):
+            self.run_until_complete(self.rpc._transfer_chunks(
+                self.request, list(range(100)), self.rpc._merge_get_replies))
+
+        self.assertEqual(1, len([chunk for chunk in self.requests if 50 in chunk]))
+        self.assertEqual(IotNodeInterface.MAX_CHUNK_SIZE, self.rpc._chunk_sizer._max_size)
+        self.assertEqual(20, self.rpc._learned_chunk_size)
+        self.assertFalse(self.send_event_cb.called)
+
+
+class PushModeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.node = FakeNode(VALID_READ_DATA)
+        self.send_event_cb = mock.Mock()
+        self.config = mock.Mock()
+        self.config.get_poll_period.return_value = 0.01
+        self.rpc = IotNodeInterface(self.config, self.send_event_cb)
+        self.rpc.PUSH_HEARTBEAT = 0.05
+        self.rpc.run = mock.Mock(return_value=True)
+        self.cb = mock.Mock()
+        self.rpc.register_callback(self.cb)
+        self.rpc.enable_push_mode(["cur", "av"])
+
+    @staticmethod
+    def run_until_complete(corotine):
+        return asyncio.get_event_loop().run_until_complete(corotine)
+
+    @staticmethod
+    async def wait_until(condition, timeout=2):
+        for _ in range(int(timeout / 0.01)):
+            if condition():
+                return True
+            await asyncio.sleep(0.01)
+        return False
+
+    def run_scenario(self, scenario):
+        async def main():
+            await self.node.start()
+            self.config.get_machine_ip_and_port.return_value = (
+                self.node.host,
+                str(self.node.port),
+            )
+            await self.rpc._init_and_connect_client()
+            task = asyncio.ensure_future(self.rpc.read_data())
+            try:
+                await scenario()
+            finally:
+                self.rpc.run.return_value = False
+                await task
+                await self.rpc.close()
+                await self.node.stop()
+
+        self.run_until_complete(main())
+
+    def last_read_data(self):
+        return self.cb.call_args[0][0]
+
+    def test_pushed_values_merged(self):
+        async def scenario():
+            self.assertTrue(await self.wait_until(lambda: self.cb.called))
+            await self.node.update({"cur": 31, "vs": 120})
+            self.assertTrue(
+                await self.wait_until(lambda: self.last_read_data()["cur"] == 31)
+            )
+
+        self.run_scenario(scenario)
+
+        data = self.last_read_data()
+        self.assertEqual(set(VALID_READ_DATA), set(data))
+        # vs is not subscribed
+        self.assertEqual(VALID_READ_DATA["vs"], data["vs"])
+        self.assertEqual(1, self.node.requests["subscribe"])
+        self.assertEqual(1, self.node.requests["read_data"])
+
+    def test_heartbeat(self):
+        async def scenario():
+            self.assertTrue(await self.wait_until(lambda: self.cb.call_count >= 3))
+
+        self.run_scenario(scenario)
+
+        self.assertEqual(VALID_READ_DATA, self.last_read_data())
+        self.assertEqual(1, self.node.requests["read_data"])
+
+    def test_status_good_without_value_changes(self):
+        status = StatusIndicator(
+            self.config.get_poll_period, self.rpc.get_poll_metrics, self.rpc.is_push_alive
+        )
+        self.rpc.register_callback(status.collect_data)
+
+        async def scenario():
+            self.assertTrue(await self.wait_until(lambda: self.cb.called))
+            for _ in range(5):
+                await asyncio.sleep(0.06)
+                self.assertEqual(Status.GOOD, status.get_connection_status())
+
+        self.run_scenario(scenario)
+
+    def test_invalid_pushed_values_ignored(self):
+        async def scenario():
+            self.assertTrue(await self.wait_until(lambda: self.cb.called))
+            await self.node.update({"cur": "31"})
+            await asyncio.sleep(0.02)
+
+        self.run_scenario(scenario)
+
+        self.assertEqual(VALID_READ_DATA["cur"], self.last_read_data()["cur"])
+
+    def test_paused(self):
+        async def scenario():
+            self.assertTrue(await self.wait_until(lambda: self.cb.called))
+            self.rpc.pause_read_data(True)
+            self.cb.reset_mock()
+            await self.node.update({"cur": 31})
+            await asyncio.sleep(0.1)
+
+        self.run_scenario(scenario)
+
+        self.assertFalse(self.cb.called)
+        self.assertEqual(31, self.rpc._push_data["cur"])
+
+    def test_fallback_to_polling(self):
+        self.node.push = False
+
+        async def scenario():
+            self.assertTrue(await self.wait_until(lambda: self.cb.call_count >= 3))
+
+        self.run_scenario(scenario)
+
+        self.assertFalse(self.rpc._push_supported)
+        self.assertEqual(VALID_READ_DATA, self.last_read_data())
+        self.assertGreaterEqual(self.node.requests["read_data"], 3)
+        self.assertGreaterEqual(self.rpc.get_poll_metrics()["samples"], 3)
+
+    def test_disable_push_mode(self):
+        async def scenario():
+            self.assertTrue(await self.wait_until(lambda: self.cb.called))
+            self.rpc.disable_push_mode()
+            self.assertTrue(
+                await self.wait_until(lambda: self.node.requests["read_data"] >= 3)
+            )
+
+        self.run_scenario(scenario)
+
+        self.assertTrue(self.rpc._push_supported)
+        self.assertEqual(1, self.node.requests["unsubscribe"])
+
+    def test_disable_push_mode_stops_notifications(self):
+        async def scenario():
+            self.assertTrue(await self.wait_until(lambda: self.cb.called))
+            self.rpc.disable_push_mode()
+            self.assertTrue(
+                await self.wait_until(lambda: "unsubscribe" in self.node.requests)
+            )
+            self.assertEqual([], self.node._subscriptions)
+            self.assertIsNone(self.rpc._push_data)
+
+        self.run_scenario(scenario)
+
+    def test_stale_pushed_data_closes(self):
+        async def scenario():
+            self.assertTrue(await self.wait_until(lambda: self.cb.called))
+            self.rpc.PUSH_HEARTBEAT = 1
+            self.rpc._last_push -= 2
+            self.assertTrue(await self.wait_until(lambda: self.rpc._ws_client is None))
+
+        self.run_scenario(scenario)
+
+
+class DeltaCallbackTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rpc = IotNodeInterface(mock.Mock(), mock.Mock())
+        self.cb = mock.Mock()
+        self.delta_cb = mock.Mock()
+        self.rpc.register_callback(self.cb)
+        self.rpc.register_delta_callback(self.delta_cb)
+
+    def test_first_delta_is_full(self):
+        self.rpc._process_read_data(VALID_READ_DATA)
+
+        delta, seq, _ = self.delta_cb.call_args.args
+        self.assertEqual(VALID_READ_DATA, delta)
+        self.assertEqual(1, seq)
+
+    def test_changed_values(self):
+        self.rpc._process_read_data(VALID_READ_DATA)
+        data = dict(VALID_READ_DATA, cur=31, fccm=[4112, 2])
+
+        self.rpc._process_read_data(data)
+
+        delta, seq, _ = self.delta_cb.call_args.args
+        self.assertEqual({"cur": 31, "fccm": [4112, 2]}, delta)
+        self.assertEqual(2, seq)
+        self.cb.assert_called_with(data, mock.ANY)
+
+    def test_no_change(self):
+        self.rpc._process_read_data(VALID_READ_DATA)
+        self.rpc._process_read_data(dict(VALID_READ_DATA))
+        self.rpc._process_read_data(dict(VALID_READ_DATA, cur=31))
+
+        self.assertEqual(2, self.delta_cb.call_count)
+        self.assertEqual(3, self.delta_cb.call_args.args[1])
+        self.assertEqual(3, self.cb.call_count)
+
+    def test_type_change(self):
+        self.rpc._process_read_data(dict(VALID_READ_DATA, fv=1))
+        self.rpc._process_read_data(dict(VALID_READ_DATA, fv=1.0))
+
+        delta, seq, _ = self.delta_cb.call_args.args
+        self.assertEqual({"fv": 1.0}, delta)
+        self.assertIs(float, type(delta["fv"]))
+        self.assertEqual(2, seq)
+
+        self.rpc._trigger_cbs(dict(VALID_READ_DATA, fv=1.0, otm=True))
+
+        delta, _, _ = self.delta_cb.call_args.args
+        self.assertEqual({"otm": True}, delta)
+        self.assertIs(True, delta["otm"])
+
+    def test_invalid_data_skipped(self):
+        self.rpc._process_read_data(VALID_READ_DATA)
+        self.rpc._process_read_data(dict(VALID_READ_DATA, cur="31"))
+
+        self.assertEqual(1, self.delta_cb.call_count)
+
+    def test_registering_resends_full(self):
+        self.rpc._process_read_data(VALID_READ_DATA)
+        other_cb = mock.Mock()
+        self.rpc.register_delta_callback(other_cb)
+
+        self.rpc._process_read_data(dict(VALID_READ_DATA))
+
+        other_cb.assert_called_once_with(VALID_READ_DATA, 2, mock.ANY)
+
+
+class ReconnectTestCase(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("iotnode.rpc.Server")
+        self.addCleanup(patcher.stop)
+        self.mk_server = patcher.start()
+        self.ws_client = self.mk_server.return_value
+        self.ws_client.connected = False
+        self.ws_client._url = "ws://127.0.0.1:9000"
+        self.ws_client.ws_connect = AsyncMock(side_effect=TransportError("refused"))
+        self.ws_client.close = AsyncMock()
+
+        patcher = mock.patch("iotnode.rpc.aiohttp.ClientSession")
+        self.addCleanup(patcher.stop)
+        self.mk_session = patcher.start()
+        self.mk_session.return_value.closed = False
+
+        self.send_event_cb = mock.Mock()
+        self.config = mock.Mock()
+        self.config.get_machine_ip_and_port.return_value = "127.0.0.1", "9000"
+        self.rpc = IotNodeInterface(self.config, self.send_event_cb)
+        self.rpc._circuit._failure_threshold = 4
+        self.rpc._circuit._clock = lambda: 1000.0
+        self.rpc._sleep_reconnect = AsyncMock()
+        self.rpc.read_data = AsyncMock()
+
+    @staticmethod
+    def run_until_complete(corotine):
+        return asyncio.get_event_loop().run_until_complete(corotine)
+
+    def try_connect(self, attempts):
+        self.rpc.run = mock.Mock(side_effect=[True] * attempts + [False])
+        backoff = functools.partial(Backoff, rand=lambda: 1.0)
+        with mock.patch("iotnode.rpc.Backoff", backoff):
+            self.run_until_complete(self.rpc.try_connect(1))
+
+    def delays(self):
+        return [call.args[0] for call in self.rpc._sleep_reconnect.call_args_list]
+
+    def connect_after(self, failures, failures_after=0):
+        results = [TransportError("refused")] * failures + [None]
+        results += [TransportError("refused")] * failures_after
+
+        async def ws_connect():
+            result = results.pop(0)
+            if result:
+                raise result
+            self.ws_client.connected = True
+
+        self.ws_client.ws_connect = ws_connect
+        self.ws_client.ping = AsyncMock()
+        self.ws_client.set_params = AsyncMock()
+        self.ws_client.get_version = AsyncMock(return_value=1)
+
+        def disconnect():
+            self.ws_client.connected = False
+
+        self.rpc.read_data = AsyncMock(side_effect=disconnect)
+
+    def test_backoff_delays(self):
+        self.try_connect(3)
+
+        self.assertEqual([1, 2, 4], self.delays())
+        self.assertEqual("closed", self.rpc.get_circuit_state())
+
+    def test_circuit_opens(self):
+        self.try_connect(5)
+
+        self.assertEqual([1, 2, 4, 120, 120], self.delays())
+        self.assertEqual("open", self.rpc.get_circuit_state())
+        self.send_event_cb.assert_called_once_with("circuit_open")
+
+    def test_backoff_reset_when_connected(self):
+        self.connect_after(2, 1)
+
+        self.try_connect(4)
+
+        self.assertEqual([1, 2, 1], self.delays())
+        self.send_event_cb.assert_any_call("got_version", value=1)
+
+    def test_circuit_closed_when_connected(self):
+        self.rpc._circuit._failures = 3
+        self.rpc._circuit.on_failure()
+        self.rpc._circuit._opened_at -= self.rpc.CIRCUIT_OPEN_PERIOD
+        self.connect_after(0)
+
+        self.try_connect(1)
+
+        self.assertEqual("closed", self.rpc.get_circuit_state())
+        self.send_event_cb.assert_any_call("circuit_closed")
+
+    def test_session_kept_across_reconnects(self):
+        self.try_connect(3)
+
+        self.assertEqual(3, self.mk_server.call_count)
+        self.mk_session.assert_called_once()
+        for call in self.mk_server.call_args_list:
+            self.assertIs(self.mk_session.return_value, call.kwargs["session"])
+
+    def test_try_connect_start_resets_circuit(self):
+        self.try_connect(4)
+        self.send_event_cb.reset_mock()
+        self.rpc._try_conn_task = mock.Mock()
+        self.rpc._try_conn_task.cancelled.return_value = False
+        self.rpc._close = AsyncMock()
+
+        self.rpc.try_connect_start(1)
+        self.run_until_complete(asyncio.sleep(0))
+
+        self.assertEqual("closed", self.rpc.get_circuit_state())
+        self.send_event_cb.assert_called_once_with("circuit_closed")
+
@@ -0,0 +1,136 @@
+import copy
+import json
+import os
+import random
+import unittest
+
+import jsonschema
+
+from .configuration import Configuration, Machines
+from .rpc import IotNodeInterface
+from .sample_data import VALID_READ_DATA
+from .schema_compiler import CompiledValidator, UnsupportedSchema, compile_schema
+
+
+VALID_NETWORKS = [
+    {
+        "ssid": "shop",
+        "encrypt_type": "wpa2/psk",
+        "rssi": -40,
+        "bssid": "00:11:22:33:44:55",
+        "channel": 6,
+        "hidden": 0,
+        "current": 1,
+    },
+    {
+        "ssid": "office",
+        "encrypt_type": "open",
+        "rssi": -80,
+        "bssid": "00:11:22:33:44:66",
+        "channel": 11,
+        "hidden": 1,
+        "current": 0,
+    },
+]
+
+# Values replacing the valid ones, covering the types and bounds
+BAD_VALUES = [None, True, 1.5, 2.0, -101, 70000, "", "x" * 30, "10.6 m", [], [1, "a"], {}]
+
+
+def get_valid_config():
+    fname = os.path.join(os.path.dirname(__file__), "test_config.json")
+    with open(fname) as f:
+        return json.load(f)
+
+
+def mutations(instance, rand, count):
+    """Yields copies of the instance with one nested value replaced,
+    removed or added."""
+    for _ in range(count):
+        mutated = copy.deepcopy(instance)
+        parent, key = None, None
+        node = mutated
+        while isinstance(node, (dict, list)) and node and rand.random() < 0.7:
+            parent = node
+            key = rand.choice(list(node)) if isinstance(node, dict) else rand.randrange(len(node))
+            node = node[key]
+        action = rand.random()
+        if parent is None:
+            mutated = rand.choice(BAD_VALUES)
+        elif isinstance(parent, dict) and action < 0.2:
+            del parent[key]
+        elif isinstance(parent, dict) and action < 0.3:
+            parent["extra"] = 1
+        else:
+            parent[key] = copy.deepcopy(rand.choice(BAD_VALUES))
+        yield mutated
+
+
+class SchemaCompilerTestCase(unittest.TestCase):
+    def assert_same_errors(self, schema, valid, format_checker=None):
+        validator = jsonschema.Draft7Validator(schema, format_checker=format_checker)
+        check = compile_schema(schema, format_checker)
+        self.assertIsNone(check(valid))
+
+        rand = random.Random(0)
+        n_invalid = 0
+        for instance in mutations(valid, rand, 500):
+            error = next(validator.iter_errors(instance), None)
+            expected = None if error is None else tuple(error.absolute_path)
+            self.assertEqual(expected, check(instance), instance)
+            n_invalid += error is not None
+        self.assertGreater(n_invalid, 100)
+
+    def test_read_data(self):
+        self.assert_same_errors(IotNodeInterface.READ_DATA_SCHEMA, VALID_READ_DATA)
+
+    def test_networks(self):
+        self.assert_same_errors(IotNodeInterface.NETWORKS_SCHEMA, VALID_NETWORKS)
+
+    def test_configuration(self):
+        self.assert_same_errors(
+            Configuration.SCHEMA_v6, get_valid_config(), jsonschema.FormatChecker()
+        )
+
+    def test_machine(self):
+        machine = get_valid_config()["machines"][0]
+        machine["ip"] = "fe80::1"
+        self.assert_same_errors(Machines.SCHEMA_v6, machine, jsonschema.FormatChecker())
+
+    def test_format_not_checked_without_checker(self):
+        check = compile_schema(Machines.SCHEMA_v1)
+
+        self.assertIsNone(check({"name": "machine", "ip": "host", "port": 1}))
+
+    def test_unsupported_keyword(self):
+        with self.assertRaises(UnsupportedSchema):
+            compile_schema({"type": "string", "pattern": "^a"})
+
+
+class CompiledValidatorTestCase(unittest.TestCase):
+    def test_validate_valid(self):
+        validator = CompiledValidator(IotNodeInterface.READ_DATA_SCHEMA)
+
+        self.assertTrue(validator.compiled)
+        validator.validate(VALID_READ_DATA)
+        self.assertTrue(validator.is_valid(VALID_READ_DATA))
+
+    def test_validate_invalid_raises_jsonschema_error(self):
+        validator = CompiledValidator(IotNodeInterface.READ_DATA_SCHEMA)
+        data = dict(VALID_READ_DATA, fccm=[4112, "1"])
+
+        with self.assertRaises(jsonschema.exceptions.ValidationError) as ctx:
+            validator.validate(data)
+
+        self.assertEqual(["fccm", 1], list(ctx.exception.absolute_path))
+        self.assertIn("is not of type 'integer'", ctx.exception.message)
+        self.assertEqual(("fccm", 1), validator.error_path(data))
+
+    def test_unsupported_schema_uses_jsonschema(self):
+        validator = CompiledValidator({"type": "string", "pattern": "^a"})
+
+        self.assertFalse(validator.compiled)
+        validator.validate("abc")
+        self.assertEqual((), validator.error_path("b"))
+        with self.assertRaises(jsonschema.exceptions.ValidationError):
+            validator.validate("b")
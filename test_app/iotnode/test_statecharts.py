@@ -1,5 +1,7 @@
 import os
 import copy
+import csv
+import tempfile
 import unittest
 import platform
 
@@ -13,6 +15,8 @@ from . import configuration
 from . import cut_chart
 from . import maintenance_menu
 from . import presenter
+from .cut_chart_fetcher import CutChartParam
+from .cut_chart_registry import CutChartRegistry, CutChartRegistryError
 from .netparams import NetworkParams
 from .configuration import UnitType
 
@@ -50,7 +54,7 @@ def service_feature_screen(it, config):
 
 SAMPLE_MACHINE_1 = {"name": "sample_1", "ip": "192.168.4.1", "port": 5000, "hose_length": "23 m", "torch_style": "21"}
 SAMPLE_MACHINE_2 = {"name": "sample_2", "ip": "192.168.4.1", "port": 5000, "hose_length": "23 m", "torch_style": "21"}
-CUTCHART_FNAME = "cutchart.csv"
+CUTCHART_FNAME = "cutchart.csv.gz"
 MAINTENANCE_FNAME = "maintenance.csv"
 
 class IoTNodeStatechartTests(unittest.TestCase):
@@ -95,6 +99,7 @@ class IoTNodeStatechartTests(unittest.TestCase):
         self.it.context["LSM_FNAME"] = self.lsm
         self.it.context["LMH_FNAME"] = self.lmh
         self.it.context["UnitType"] = UnitType
+        self.it.context["CutChartRegistryError"] = CutChartRegistryError
         self.it.context["is_android"] = platform.system != "Darwin"
 
     def test_home_screen(self):
@@ -104,13 +109,14 @@ class IoTNodeStatechartTests(unittest.TestCase):
         self.config.curr_machine = ""
         self.config.get_poll_period = Mock(return_value=1)
         self.config.get_current_unit_type = Mock(return_value=UnitType.METRIC)
-        self.psvalue.data = None
+        self.psvalue.screen_view.return_value = None
         self.ui.get_app_version.return_value = "0.1.0"
         self.psvalue.get_fault_code.return_value = ("", "")
         val = {"status": 0, "machines": ["sample_1", "sample_2"], "curr_machine": "","data":None, "app_version": "0.1.0", "fault_code": ""}
 
         steps = self.it.execute()
         self.ui.switch.assert_called_with("home_screen", val)
+        self.psvalue.screen_view.assert_called_with("home_screen")
         self.assertTrue(testing.state_is_entered(steps, "home"))
 
     def test_home_screen_back(self):
@@ -390,6 +396,109 @@ class IoTNodeStatechartTests(unittest.TestCase):
         steps = self.it.queue("back_button_pressed").execute()
         self.assertTrue(testing.state_is_entered(steps, "home"))
 
+    def test_process_setup_input_screen_cutchart_ready(self):
+        process_setup_input_screen(self.it, self.config)
+        steps = self.it.queue("cutchart_ready").execute()
+        self.ui.switch.assert_called_with("process_setup_input_screen", {"cutchart_ready": True})
+        self.assertTrue(testing.state_is_entered(steps, "cutchart_loaded"))
+
+    def test_process_setup_input_screen_cutchart_error(self):
+        process_setup_input_screen(self.it, self.config)
+        self.ui.switch.reset_mock()
+        steps = self.it.queue("cutchart_error", value="No such file").execute()
+        self.ui.show_popup.assert_called_with("Error!", "Error loading cutchart: No such file")
+        self.assertFalse(self.ui.switch.called)
+        self.assertTrue(testing.state_is_entered(steps, "cutchart_failed"))
+        self.assertFalse(self.it.context["cutchart_ready"])
+
+    def test_process_setup_input_screen_after_cutchart_error(self):
+        home_screen(self.it, self.config)
+        self.config.get_current_unit_type = Mock(return_value=UnitType.METRIC)
+        self.it.queue("cutchart_error", value="No such file").execute()
+        self.it.queue("process_setup_button_pressed").execute()
+        val = {"cutchart": self.cutchart, "use_metric": True, "cutchart_ready": False}
+        self.ui.switch.assert_called_with("process_setup_input_screen", val)
+        self.ui.show_popup.assert_called_with("Error!", "Error loading cutchart: No such file")
+
+    def test_got_version_selects_cutchart(self):
+        registry = Mock()
+        self.it.context["cutchart_registry"] = registry
+        self.it.execute()
+        self.it.queue("got_version", value=3).execute()
+        registry.select.assert_called_once_with(3)
+        self.assertIs(self.it.context["cutchart"], registry.select.return_value)
+
+    def test_got_version_unsupported(self):
+        registry = CutChartRegistry()
+        registry.register(self.cutchart_file, 5)
+        self.it.context["cutchart_registry"] = registry
+        self.it.execute()
+        steps = self.it.queue("got_version", value=3).execute()
+        self.assertIn("error", [step.event.name for step in steps if step.event])
+        self.assertIs(self.it.context["cutchart"], self.cutchart)
+
+    def test_got_version_selects_download_params(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        registry = CutChartRegistry()
+        for min_version, speed in ((0, "100"), (5, "120")):
+            filename = os.path.join(tmp_dir.name, "cutchart_{}.csv".format(min_version))
+            with open(filename, "w", newline="") as fp:
+                csv.writer(fp).writerows([
+                    ["h", "Rev", "", "QP3", str(min_version), "0", "EOL"],
+                    ["h", "ParamID"] + [""] * 33 + ["6400", "6401", "EOL"],
+                    ["C", "10000", "10006"] + [""] * 32 + [speed, "2", "EOL"],
+                    ["M", "10006", ""] + [""] * 32 + ["3", "", "EOL"],
+                ])
+            registry.register(filename, min_version)
+        self.it.context["cutchart_registry"] = registry
+
+        params = []
+        for version in (0, 5):
+            self.it.queue("got_version", value=version)
+            process_setup_input_screen(self.it, self.config)
+            _, screen_data = self.ui.switch.call_args[0]
+            self.assertIs(screen_data["cutchart"], registry.active)
+            cutchart = CutChartParam(screen_data["cutchart"])
+            cutting, marking = cutchart.get_cutting_marking_params("10000")
+            params.append(cutchart.get_param_id_val_pair(cutting, marking))
+            self.it.queue("back_button_pressed").execute()
+        for cutchart in registry._resident.values():
+            cutchart.close()
+
+        self.assertEqual(params[0][:2], ((6400, 100), (6401, 2)))
+        self.assertEqual(params[1][:2], ((6400, 120), (6401, 2)))
+
+    def test_chunk_size_learned(self):
+        self.config.save = Mock()
+        self.it.execute()
+        self.it.queue("chunk_size_learned", value=60).execute()
+        self.assertEqual(60, self.config.get_chunk_size(30))
+        self.config.save.assert_called_once_with(self.conf_file)
+
+    def test_circuit_open_and_closed(self):
+        self.it.execute()
+        self.it.queue("circuit_open").execute()
+        self.assertIn("rpc_circuit_open", self.it.configuration)
+        self.it.queue("circuit_closed").execute()
+        self.assertIn("rpc_started", self.it.configuration)
+
+    def test_circuit_open_app_resumed(self):
+        self.it.execute()
+        self.it.queue("circuit_open").execute()
+        self.rpc.try_connect_start.reset_mock()
+        self.it.queue("app_resumed").execute()
+        self.rpc.try_connect_start.assert_called_once_with(retry_period=3)
+        self.assertIn("rpc_started", self.it.configuration)
+
+    def test_process_setup_input_screen_after_cutchart_ready(self):
+        home_screen(self.it, self.config)
+        self.config.get_current_unit_type = Mock(return_value=UnitType.METRIC)
+        self.it.queue("cutchart_ready").execute()
+        self.it.queue("process_setup_button_pressed").execute()
+        val = {"cutchart": self.cutchart, "use_metric": True, "cutchart_ready": True}
+        self.ui.switch.assert_called_with("process_setup_input_screen", val)
+
     def test_process_setup_input_screen_ok(self):
         data = []
 
@@ -498,6 +607,16 @@ class IoTNodeStatechartTests(unittest.TestCase):
         steps = self.it.queue("retry_button_pressed").execute()
         self.assertTrue(testing.state_is_entered(steps, "cutchart_export"))
 
+    def test_cutchart_export_screen_download(self):
+        data = [(6400, 1)]
+
+        process_setup_input_screen(self.it, self.config)
+        self.it.queue("submit_button_pressed", value=data).execute()
+        self.it.queue("consumable_button_pressed", value=data).execute()
+        self.it.queue("download_button_pressed", value=data).execute()
+        self.it.queue("download", value=data).execute()
+        self.rpc.set_params_start.assert_called_with(data, differential=True, verify=True)
+
     def test_cutchart_export_screen_sent_param_list(self):
         data = []
 
@@ -615,6 +734,26 @@ class IoTNodeStatechartTests(unittest.TestCase):
         self.it.queue("got_param_list", value=data).execute()
         self.ui.switch.assert_called_with(*called_args)
 
+    def test_cutchart_compare_screen_compare_param_list(self):
+        param_ids = [6400]
+        expected = {6400: 1}
+
+        service_menu_screen(self.it, self.config)
+        self.it.queue("service_button_pressed").execute()
+        self.it.queue("cutchart_verify_button_pressed").execute()
+        self.it.queue("compare_param_list", value=(param_ids, expected)).execute()
+        self.rpc.compare_param_list_start.assert_called_with(param_ids, expected)
+
+    def test_cutchart_compare_screen_progress(self):
+        progress = {"received": 30, "total": 60, "mismatched": 2}
+        called_args = ("cutchart_verify_loading_screen", {"compare_progress": progress})
+
+        service_menu_screen(self.it, self.config)
+        self.it.queue("service_button_pressed").execute()
+        self.it.queue("cutchart_verify_button_pressed").execute()
+        self.it.queue("cutchart_compare_progress", value=progress).execute()
+        self.ui.switch.assert_called_with(*called_args)
+
     def test_cutchart_compare_screen_got_process_id(self):
         data = []
         called_args = ("cutchart_verify_loading_screen", {"process_id": data})
@@ -47,3 +47,37 @@ class StatusIndicatorTestCase(unittest.TestCase):
         out = self.status_ind.get_connection_status()
 
         self.assertEqual(Status.FAULTY, out)
+
+    def test_connection_status_faulty_on_overruns(self):
+        poll_metrics_cb = mock.Mock(return_value={"overrun_rate": 0.6})
+        self.status_ind = StatusIndicator(self.get_poll_period_cb, poll_metrics_cb)
+        now = time.time()
+
+        for _ in range(5):
+            self.status_ind.collect_data(None, now)
+
+        out = self.status_ind.get_connection_status()
+
+        self.assertEqual(Status.FAULTY, out)
+        self.assertEqual({"overrun_rate": 0.6}, self.status_ind.get_poll_metrics())
+
+    def test_poll_metrics_not_available(self):
+        self.assertEqual({}, self.status_ind.get_poll_metrics())
+
+    def test_connection_status_push_alive(self):
+        push_alive_cb = mock.Mock(return_value=True)
+        self.status_ind = StatusIndicator(self.get_poll_period_cb, None, push_alive_cb)
+
+        self.assertEqual(Status.GOOD, self.status_ind.get_connection_status())
+
+        push_alive_cb.return_value = False
+        self.assertEqual(Status.NOT_CONNECTED, self.status_ind.get_connection_status())
+
+    def test_connection_status_polled_in_push_mode(self):
+        push_alive_cb = mock.Mock(return_value=None)
+        self.status_ind = StatusIndicator(self.get_poll_period_cb, None, push_alive_cb)
+
+        for _ in range(3):
+            self.status_ind.collect_data(None, time.time())
+
+        self.assertEqual(Status.FAULTY, self.status_ind.get_connection_status())
@@ -542,6 +542,9 @@ class ProcessSetupInputScreen(Screen):
     thickness_list = ListProperty()
     amperage_list = ListProperty()
     use_metric = BooleanProperty()
+    cutchart_ready = BooleanProperty(False)
+    # Cutchart revision of the connected node
+    cutchart = ObjectProperty(None, allownone=True)
 
     def __init__(self, **kw):
         self.toggle = False
@@ -551,16 +554,15 @@ class ProcessSetupInputScreen(Screen):
                                     "material": "Select Material",
                                     "gas": "Select Gas",
                                     "amperage": "Select Amperage"}
+        # Cutchart is loaded in the background, fetcher is created once ready
         self.fetcher = None
         self.filter_input_parmas = {}
-        self.init_fetcher()
         super().__init__(**kw)
 
         self.previous_param = None
-        self.previous_rows = None
 
     def init_fetcher(self):
-        self.fetcher = CutchartFetchInputParam(self.use_metric)
+        self.fetcher = CutchartFetchInputParam(self.use_metric, self.cutchart)
         # When user selects a parameter call its filter method.
         self.filter_input_parmas = {"gas": self.fetcher.gas_selected,
                                     "material": self.fetcher.material_selected,
@@ -569,10 +571,20 @@ class ProcessSetupInputScreen(Screen):
                                     "amperage": self.fetcher.amperage_selected}
         self.render_input_values()
 
+    def on_cutchart_ready(self, *args):
+        if self.cutchart_ready and self.fetcher is None:
+            self.init_fetcher()
+
+    def on_cutchart(self, *args):
+        # Another revision is selected, the selection lists are reloaded
+        if self.fetcher is not None:
+            self.init_fetcher()
+
     def on_use_metric(self, *args):
-        self.reset_all_input()
+        if self.fetcher is None:
+            return
         self.fetcher.is_metric = self.use_metric
-        self.init_fetcher()
+        self.reset_all_input()
 
     def param_selected(self, selected_value: str, selected_param: str):
         """This method will get called when the user select a dropdown.
@@ -585,12 +597,14 @@ class ProcessSetupInputScreen(Screen):
         if selected_value in self.id_and_default_text.values():
             return
 
+        if self.fetcher is None:
+            return
+
         # Check whether previous selected param is selected
         if self.previous_param == selected_param:
-            self.fetcher.rows = self.previous_rows
+            self.fetcher.undo_selection()
         else:
             self.previous_param = selected_param
-            self.previous_rows = self.fetcher.rows
 
         self.filter_input_parmas[selected_param](selected_value)
         self.render_input_values(selected_param)
@@ -627,10 +641,13 @@ class ProcessSetupInputScreen(Screen):
             self.ids[key].text = val
         self.ids.submit_button.disabled = True
         self.previous_param = None
-        self.init_fetcher()
+        if self.fetcher is None:
+            return
+        self.fetcher.reset()
+        self.render_input_values()
 
     def get_param_list(self):
-        obj = CutChartParam()
+        obj = CutChartParam(self.cutchart)
         param_list = obj.get_cutting_marking_params(
             self.fetcher.rows[0].process_id)
         return param_list
@@ -662,6 +679,7 @@ class ProcessSetupTHCScreen(Screen):
     param_list = ListProperty()
     param_id_val_pair = ListProperty()
     use_metric = BooleanProperty()
+    cutchart = ObjectProperty(None, allownone=True)
 
     def on_is_cutting(self, instance:"ProcessSetupTHCScreen",is_cutting:bool):
             self.update()
@@ -712,7 +730,7 @@ class ProcessSetupTHCScreen(Screen):
 
     def get_param_list(self):
         self.param_id_val_pair.clear()
-        obj = CutChartParam()
+        obj = CutChartParam(self.cutchart)
         cutting, marking = self.param_list
         param_pair = obj.get_param_id_val_pair(cutting, marking)
         self.param_id_val_pair.extend(param_pair)
@@ -729,6 +747,7 @@ class ProcessSetupConsumablesScreen(Screen):
                              "ShieldCup": 17}
     param_list = ListProperty()
     param_id_val_pair = ListProperty()
+    cutchart = ObjectProperty(None, allownone=True)
 
     def on_torch_style(self, *args):
         if self.param_list:
@@ -757,7 +776,7 @@ class ProcessSetupConsumablesScreen(Screen):
 
     def get_param_list(self):
         self.param_id_val_pair.clear()
-        obj = CutChartParam()
+        obj = CutChartParam(self.cutchart)
         cutting, marking = self.param_list
         param_pair = obj.get_param_id_val_pair(cutting, marking)
         self.param_id_val_pair.extend(param_pair)
@@ -816,6 +835,8 @@ class CutchartVerifyLoadingScreen(Screen):
     process_id = NumericProperty()
     param_id_list = ListProperty()
     param_id_val_dict = DictProperty()
+    compare_progress = DictProperty()
+    cutchart = ObjectProperty(None, allownone=True)
     app = None
 
     def on_enter(self, *args):
@@ -824,6 +845,7 @@ class CutchartVerifyLoadingScreen(Screen):
 
     def on_leave(self, *args):
         self.process_id = -1
+        self.compare_progress = {}
         return super().on_leave(*args)
 
     def progress_run(self, *args):
@@ -847,7 +869,7 @@ class CutchartVerifyLoadingScreen(Screen):
         if self.process_id == -1:
             return
 
-        cutchart = CutChartParam()
+        cutchart = CutChartParam(self.cutchart)
 
         try:
             self.param_id_val_dict = cutchart.get_cutting_marking_param_with_param_id(
@@ -858,7 +880,19 @@ class CutchartVerifyLoadingScreen(Screen):
 
         cutting, marking = cutchart.get_param_ids(need_filter=True)
         self.param_id_list = (*cutting, *marking)
-        self.app.send_event("get_param_list", self.param_id_list)
+        self.app.send_event(
+            "compare_param_list", (self.param_id_list, dict(self.param_id_val_dict)))
+
+    def on_compare_progress(self, *args):
+        if not self.compare_progress:
+            return
+        # Progress is known, stop the estimated progress
+        Clock.unschedule(self.increment_progressbar)
+        received = self.compare_progress["received"]
+        total = self.compare_progress["total"]
+        self.ids.pb.value = 100 * received / total if total else 100
+        self.display_text = "Compared {}/{}, {} mismatched".format(
+            received, total, self.compare_progress["mismatched"])
 
     def on_obtained(self, *args):
         if self.obtained:
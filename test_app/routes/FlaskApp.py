@@ -2,9 +2,12 @@ from routes import flask_app
 from sismic.interpreter import Interpreter
 from iotnode.presenter import MachineState
 from iotnode.psvalue import ProcessValueFormatter
+from iotnode.history import ProcessHistory
+from iotnode.downsample import LTTB, METHODS
 from iotnode.status import StatusIndicator
 from iotnode.rpc import IotNodeInterface
-from iotnode.cut_chart import CutChart
+from iotnode.cut_chart_registry import CutChartRegistry, CutChartRegistryError
+from iotnode.cut_chart_fetcher import CutchartPrefetcher, get_cutchart_path
 from iotnode.discover import MachineDiscover
 from iotnode.configuration import Configuration, ConfigLoadError, UnitType
 from iotnode.maintenance import MaintenanceScheduler, MaintenanceLoadError
@@ -13,6 +16,7 @@ from typing import Callable
 
 import platform
 import os.path
+import time
 from flask import request, redirect, render_template, jsonify
 import platform
 from typing import Dict, Any
@@ -26,6 +30,11 @@ from tools import (
     get_android_python_activity,
 )
 
+# Points of the trends sent to the web view: default, least and most
+TREND_POINTS = 300
+TREND_MIN_POINTS = 3
+TREND_MAX_POINTS = 2000
+
 
 def debug_method(prefix: str = f"{'#'*20}", func: Callable = None):
     if not func:
@@ -62,7 +71,9 @@ class IOTNodeFlaskApp:
     CONF_FNAME = "config.json"
     LSM_FNAME = "last_selected_machine"
     LMH_FNAME = "last_maintenanced_arc_hours.json"
-    CUTCHART_FNAME = "cutchart.csv"
+    # Cutchart file for each node protocol version, used from the given
+    # version till the next one
+    CUTCHART_FNAMES = {0: os.path.basename(get_cutchart_path())}
     MAINTENANCE_LINK_FNAME = "maintenance_link.csv"
     BASE_PATH = "../iotnode"
     """
@@ -90,14 +101,15 @@ class IOTNodeFlaskApp:
         self.last_maintenanced_hrs_fname = os.path.join(
             self.BASE_PATH, self.LMH_FNAME
         )
-        self.cutchart_file = os.path.join(self.dir_path, self.CUTCHART_FNAME)
+        self.cutchart_dir = os.path.dirname(get_cutchart_path())
         self._reverse = False
         self._event_history = []
         self._version = version
+        # Set before the clients, they send events from background tasks
+        self.interperter = sismic_interperter
         self._setup_config()
         self._setup_client()
         self._setup_maintenance()
-        self.interperter = sismic_interperter
         self._setup_interpreter()
         self.init_flask_server()
        
@@ -140,13 +152,31 @@ class IOTNodeFlaskApp:
     def _setup_client(self):
         self.rpc = IotNodeInterface(self.config, self.send_event)
         self.psvalue = ProcessValueFormatter()
-        self.cutchart = CutChart(self.cutchart_file)
-        self.status = StatusIndicator(self.config.get_poll_period)
+        self.history = ProcessHistory()
+        self.cutchart_registry = CutChartRegistry()
+        for min_version, fname in self.CUTCHART_FNAMES.items():
+            self.cutchart_registry.register(
+                os.path.join(self.cutchart_dir, fname), min_version
+            )
+        # The cutchart is loaded in the background, till the node version
+        # selects its revision
+        self.cutchart = self.cutchart_registry.select(0)
+        self.cutchart_prefetcher = CutchartPrefetcher(
+            self.send_event, cutchart=self.cutchart
+        )
+        self.cutchart_prefetcher.start()
+        self.status = StatusIndicator(
+            self.config.get_poll_period,
+            self.rpc.get_poll_metrics,
+            self.rpc.is_push_alive,
+        )
         self.machine_discover = MachineDiscover(self.send_event)
 
         # Register callbacks
-        self.rpc.register_callback(self.psvalue.process_data)
+        self.rpc.register_delta_callback(self.psvalue.process_delta)
         self.rpc.register_callback(self.status.collect_data)
+        self.rpc.register_callback(self.history.append)
+        flask_app.config["PROCESS_HISTORY"] = self.history
 
     def _setup_config(self):
         self.config = Configuration()
@@ -169,6 +199,8 @@ class IOTNodeFlaskApp:
         context["ui"] = self
         context["machine_state"] = MachineState()
         context["cutchart"] = self.cutchart
+        context["cutchart_prefetcher"] = self.cutchart_prefetcher
+        context["cutchart_registry"] = self.cutchart_registry
         context["machine_discover"] = self.machine_discover
         context["maintenance_scheduler"] = self.maintenance_scheduler
         context["config"] = self.config
@@ -180,6 +212,7 @@ class IOTNodeFlaskApp:
         context["LSM_FNAME"] = self.last_selected_machine_fname
         context["LMH_FNAME"] = self.last_maintenanced_hrs_fname
         context["UnitType"] = UnitType
+        context["CutChartRegistryError"] = CutChartRegistryError
         context["is_android"] = platform.system() != "Darwin"
 
     def switch(self, name: str, request_data: Dict[str, Any] = None):
@@ -233,6 +266,33 @@ class IOTNodeFlaskApp:
         activity.loadUrl(args["url"])
         return ("", 204)
 
+    @flask_app.route("/trend/<key>")
+    def trend(key):
+        """Returns the trend of a numeric read data key, downsampled.
+
+        Query args: start and end timestamps, or seconds before now, in
+        seconds, points, the largest number of points, and method, lttb or
+        minmax.
+        """
+        history = flask_app.config.get("PROCESS_HISTORY")
+        if history is None or key not in history.keys():
+            return jsonify({"error": "No trend for {}".format(key)}), 404
+
+        args = request.args
+        start = args.get("start", type=float)
+        end = args.get("end", type=float)
+        seconds = args.get("seconds", type=float)
+        if seconds is not None:
+            start = time.time() - seconds
+        points = args.get("points", default=TREND_POINTS, type=int)
+        points = max(TREND_MIN_POINTS, min(points, TREND_MAX_POINTS))
+        method = args.get("method", default=LTTB)
+        if method not in METHODS:
+            return jsonify({"error": "Unknown method: {}".format(method)}), 400
+
+        timestamps, values = history.trend(key, points, start, end, method)
+        return jsonify({"key": key, "timestamps": timestamps, "values": values})
+
     @flask_app.route("/homescreen")
     def home_screen():
         print(request.json)
@@ -62,7 +62,7 @@ class IOTNodeFlaskApp:
     CONF_FNAME = "config.json"
     LSM_FNAME = "last_selected_machine"
     LMH_FNAME = "last_maintenanced_arc_hours.json"
-    CUTCHART_FNAME = "cutchart.csv"
+    CUTCHART_FNAME = "cutchart.csv.gz"
     MAINTENANCE_LINK_FNAME = "maintenance_link.csv"
     BASE_PATH = "../iotnode"
     """
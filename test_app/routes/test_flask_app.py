@@ -0,0 +1,87 @@
+"""
+Test case file for the flask app routes
+"""
+import unittest
+from unittest import mock
+
+from iotnode.history import ProcessHistory
+from routes import flask_app
+from routes import FlaskApp
+
+
+class TrendRouteTestCase(unittest.TestCase):
+    SAMPLES = 3000
+
+    def setUp(self):
+        self.history = ProcessHistory(capacity=self.SAMPLES, keys=("av", "cur"))
+        for second in range(self.SAMPLES):
+            self.history.append({"av": second % 7, "cur": 30}, 1000.0 + second)
+        patcher = mock.patch.dict(flask_app.config, {"PROCESS_HISTORY": self.history})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = flask_app.test_client()
+
+    def get_trend(self, key, **args):
+        return self.client.get("/trend/{}".format(key), query_string=args)
+
+    def test_trend(self):
+        response = self.get_trend("av", points=10)
+
+        self.assertEqual(200, response.status_code)
+        data = response.get_json()
+        self.assertEqual("av", data["key"])
+        self.assertEqual(10, len(data["timestamps"]))
+        self.assertEqual(10, len(data["values"]))
+        self.assertEqual(1000.0, data["timestamps"][0])
+        self.assertEqual(3999.0, data["timestamps"][-1])
+
+    def test_default_points(self):
+        data = self.get_trend("cur").get_json()
+
+        self.assertEqual(FlaskApp.TREND_POINTS, len(data["values"]))
+        self.assertEqual({30.0}, set(data["values"]))
+
+    def test_minmax(self):
+        response = self.get_trend("av", points=10, method="minmax")
+
+        self.assertEqual(200, response.status_code)
+        data = response.get_json()
+        self.assertLessEqual(len(data["values"]), 10)
+        self.assertEqual(0.0, min(data["values"]))
+        self.assertEqual(6.0, max(data["values"]))
+
+    def test_unknown_key(self):
+        response = self.get_trend("vs")
+
+        self.assertEqual(404, response.status_code)
+        self.assertIn("error", response.get_json())
+
+    def test_no_history(self):
+        del flask_app.config["PROCESS_HISTORY"]
+
+        self.assertEqual(404, self.get_trend("av").status_code)
+
+    def test_unknown_method(self):
+        response = self.get_trend("av", method="mean")
+
+        self.assertEqual(400, response.status_code)
+        self.assertIn("error", response.get_json())
+
+    def test_points_clamped(self):
+        data = self.get_trend("av", points=1).get_json()
+        self.assertEqual(FlaskApp.TREND_MIN_POINTS, len(data["values"]))
+
+        data = self.get_trend("av", points=5000).get_json()
+        self.assertEqual(FlaskApp.TREND_MAX_POINTS, len(data["values"]))
+
+    def test_start_end(self):
+        data = self.get_trend("av", start=1010, end=1019).get_json()
+
+        self.assertEqual([1010.0 + i for i in range(10)], data["timestamps"])
+
+    def test_seconds_overrides_start(self):
+        with mock.patch.object(FlaskApp, "time") as mk_time:
+            mk_time.time.return_value = 4000.0
+            data = self.get_trend("av", start=1000, seconds=10).get_json()
+
+        self.assertEqual([3990.0 + i for i in range(10)], data["timestamps"])